@@ -0,0 +1,194 @@
+import atexit
+import json
+import logging
+import os
+
+from extraction import PARSER_VERSION
+from models import StudentSchedule
+from parse_cache import COHORT_CACHE_DIR_NAME, COHORT_MAX_ENTRIES, COHORT_MAX_MB, ParseCache
+
+logger = logging.getLogger(__name__)
+
+
+def get_icon_path():
+    possible_paths = [
+        "calendar_icon.ico",
+        "calendar_icon.png",
+        os.path.join(os.path.dirname(__file__), "calendar_icon.ico"),
+        os.path.join(os.path.dirname(__file__), "resources", "calendar_icon.ico"),
+    ]
+    for path in possible_paths:
+        if os.path.exists(path):
+            return path
+    return ""
+
+
+def get_config_dir():
+    if os.name == 'nt':
+        config_dir = os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), 'ScheduleManager')
+    else:
+        config_dir = os.path.expanduser('~/.config/schedulemanager')
+    os.makedirs(config_dir, exist_ok=True)
+    return config_dir
+
+
+_parse_cache = None
+_cohort_cache = None
+
+
+# What cached parses depend on: the parser itself and the learned layout templates
+def parse_cache_version():
+    from layout_templates import templates_fingerprint
+    return f"{PARSER_VERSION}:{templates_fingerprint()}"
+
+
+# Drops the open parse caches so the next use reopens them under the current version,
+# after a template was learned
+def reset_parse_caches():
+    global _parse_cache, _cohort_cache
+    for cache in (_parse_cache, _cohort_cache):
+        if cache is not None:
+            cache.flush()
+    _parse_cache = _cohort_cache = None
+
+
+# The GUI's parse cache; recency from cache hits is written out at exit
+def get_parse_cache():
+    global _parse_cache
+    if _parse_cache is None:
+        _parse_cache = ParseCache(get_config_dir(), parse_cache_version(), encode=StudentSchedule.to_dict,
+                                  decode=StudentSchedule.from_dict)
+        atexit.register(_parse_cache.flush)
+    return _parse_cache
+
+
+# The parse cache of the folder commands, with room for a whole cohort. Its index is only
+# written when a load finishes (callers flush()) and at exit. Limits come from config.json
+# "cohort_cache": {"max_entries": 10000, "max_mb": 512}
+def get_cohort_cache():
+    global _cohort_cache
+    if _cohort_cache is None:
+        settings = load_config().get("cohort_cache")
+        settings = settings if isinstance(settings, dict) else {}
+        try:
+            max_entries = max(1, int(settings.get("max_entries", COHORT_MAX_ENTRIES)))
+            max_bytes = int(float(settings.get("max_mb", COHORT_MAX_MB)) * 1024 * 1024)
+        except (TypeError, ValueError):
+            logger.warning("Ignoring invalid cohort_cache settings in config.json")
+            max_entries, max_bytes = COHORT_MAX_ENTRIES, COHORT_MAX_MB * 1024 * 1024
+        _cohort_cache = ParseCache(get_config_dir(), parse_cache_version(), max_entries, max_bytes,
+                                   encode=StudentSchedule.to_dict, decode=StudentSchedule.from_dict,
+                                   dir_name=COHORT_CACHE_DIR_NAME, autosave=False)
+        atexit.register(_cohort_cache.flush)
+    return _cohort_cache
+
+
+_schedule_store = None
+
+
+# The local SQLite store of every parsed schedule, opened on first use
+def get_schedule_store():
+    global _schedule_store
+    if _schedule_store is None:
+        from schedule_store import STORE_FILE, ScheduleStore
+        _schedule_store = ScheduleStore(os.path.join(get_config_dir(), STORE_FILE))
+    return _schedule_store
+
+
+_search_index = None
+
+
+# The course search index, loaded from the config directory on first use
+def get_search_index():
+    global _search_index
+    if _search_index is None:
+        from search_index import INDEX_FILE, SearchIndex
+        _search_index = SearchIndex.load(os.path.join(get_config_dir(), INDEX_FILE))
+    return _search_index
+
+
+# Writes the search index back if anything was added since it was loaded
+def save_search_index():
+    if _search_index is not None and _search_index.dirty:
+        try:
+            _search_index.save()
+        except (IOError, OSError, TypeError, ValueError):
+            logger.exception("Could not save the search index")
+
+
+# Adds a freshly parsed schedule to the store and the search index; a store failure never
+# fails the load
+def store_schedule(pdf_path, schedule):
+    import sqlite3
+    try:
+        get_schedule_store().save_schedule(pdf_path, schedule)
+    except sqlite3.Error:
+        logger.exception("Could not save schedule to the schedule store")
+    get_search_index().add_schedule(pdf_path, schedule)
+
+
+def load_config():
+    config_file = os.path.join(get_config_dir(), "config.json")
+    if os.path.exists(config_file):
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config_data = json.load(f)
+            if isinstance(config_data, dict):
+                return config_data
+        except (json.JSONDecodeError, IOError, OSError):
+            logger.exception("Error loading configuration")
+    return {}
+
+
+# Merges values into config.json, keeping the settings they don't touch
+def update_config(**values):
+    config_file = os.path.join(get_config_dir(), "config.json")
+    config_data = load_config()
+    config_data.update(values)
+    config_data["version"] = "1.0.0"
+    try:
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump(config_data, f, indent=2)
+        logger.info("Configuration saved successfully")
+    except (IOError, OSError, TypeError, ValueError):
+        logger.exception("Failed to save configuration")
+
+
+def save_last_pdf_path(file_path):
+    update_config(last_pdf_path=file_path)
+
+
+def load_last_pdf_path():
+    path = load_config().get("last_pdf_path", "")
+    if path and os.path.exists(path):
+        logger.info(f"Loaded last PDF path: {path}")
+        return path
+    return ""
+
+
+# Whether watch mode is on and the extra directory it watches ("" for none)
+def load_watch_settings():
+    config_data = load_config()
+    return bool(config_data.get("watch_enabled", False)), config_data.get("watch_dir", "")
+
+
+def save_watch_settings(enabled, directory):
+    update_config(watch_enabled=enabled, watch_dir=directory)
+
+
+# Limits of the recently viewed schedules kept in memory and how many files next to the
+# open one are parsed ahead, from config.json "recent_schedules":
+# {"max_entries": 12, "max_mb": 16, "prefetch": 2}
+def load_recent_settings():
+    from recent_schedules import DEFAULT_MAX_ENTRIES, DEFAULT_MAX_MB, DEFAULT_PREFETCH
+
+    settings = load_config().get("recent_schedules")
+    settings = settings if isinstance(settings, dict) else {}
+    try:
+        max_entries = int(settings.get("max_entries", DEFAULT_MAX_ENTRIES))
+        max_bytes = int(float(settings.get("max_mb", DEFAULT_MAX_MB)) * 1024 * 1024)
+        prefetch = int(settings.get("prefetch", DEFAULT_PREFETCH))
+    except (TypeError, ValueError):
+        logger.warning("Ignoring invalid recent_schedules settings in config.json")
+        max_entries, max_bytes, prefetch = DEFAULT_MAX_ENTRIES, DEFAULT_MAX_MB * 1024 * 1024, DEFAULT_PREFETCH
+    return max_entries, max_bytes, prefetch
@@ -0,0 +1,115 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+from batch import iter_pdf_files, load_schedules
+from extraction import default_workers
+from models import DAYS, PERIOD_COUNT, PERIOD_LABELS
+
+logger = logging.getLogger(__name__)
+
+_PERIOD_BITS = np.arange(PERIOD_COUNT, dtype=np.uint16)
+
+
+# Busy slots of many schedules as one bool array, students x days x periods.
+# Each schedule contributes its five per-day occupancy bitmasks, unpacked in one shot.
+def pack_busy(schedules):
+    masks = np.array([schedule.occupancy().occupied for schedule in schedules], dtype=np.uint16)
+    masks = masks.reshape(len(schedules), len(DAYS))
+    return (masks[:, :, None] >> _PERIOD_BITS & 1).astype(bool)
+
+
+# Students x days x start periods: free for `length` consecutive periods from each start
+def free_windows(busy, length=1):
+    free = ~busy
+    starts = PERIOD_COUNT - length + 1
+    if starts <= 0:
+        return free[:, :, :0]
+    window = free[:, :, :starts].copy()
+    for offset in range(1, length):
+        window &= free[:, :, offset:offset + starts]
+    return window
+
+
+# Slots where at least min_free students (all of them by default) are free for `length`
+# consecutive periods, as (day, first period, free count) with the most free first, then
+# earliest in the week
+def common_free_slots(busy, min_free=None, length=1):
+    min_free = busy.shape[0] if min_free is None else min_free
+    counts = free_windows(busy, length).sum(axis=0)
+    days, starts = np.nonzero(counts >= min_free)
+    free = counts[days, starts]
+    order = np.lexsort((starts, days, -free))
+    return [(int(days[i]), int(starts[i]) + 1, int(free[i])) for i in order]
+
+
+# Indexes of the students who are not free for the whole window
+def busy_students(busy, day, period, length=1):
+    return np.nonzero(busy[:, day, period - 1:period - 1 + length].any(axis=1))[0].tolist()
+
+
+def slot_label(day, period, length=1):
+    last = period + length - 1
+    periods = f"period {period}" if length == 1 else f"periods {period}-{last}"
+    return f"{DAYS[day]} {PERIOD_LABELS[period - 1]} ({periods})"
+
+
+def student_label(path, schedule):
+    return schedule.student_name or schedule.student_id or os.path.basename(path)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='schedule.py free',
+                                     description='Find time slots when students are free together.')
+    parser.add_argument('paths', nargs='+', help='schedule PDFs or directories of them')
+    parser.add_argument('--min-free', type=int,
+                        help='slots where at least this many students are free (default: all of them)')
+    parser.add_argument('--length', type=int, default=1, help='consecutive periods needed (default: 1)')
+    parser.add_argument('--top', type=int, default=20, help='number of slots to list')
+    parser.add_argument('--show-busy', action='store_true', help='name the students who are busy in each slot')
+    parser.add_argument('--workers', type=int, default=default_workers(), help='parallel worker processes')
+    parser.add_argument('--recursive', action='store_true', help='also scan subdirectories')
+    return parser
+
+
+def availability_main(argv):
+    args = build_parser().parse_args(argv)
+    if not 1 <= args.length <= PERIOD_COUNT:
+        print(f"--length must be 1 to {PERIOD_COUNT} periods", file=sys.stderr)
+        return 2
+    pdf_paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            pdf_paths.extend(iter_pdf_files(path, args.recursive))
+        elif os.path.isfile(path):
+            pdf_paths.append(path)
+        else:
+            print(f"Not found: {path}", file=sys.stderr)
+            return 2
+
+    start = time.perf_counter()
+    paths, schedules, failures = load_schedules(pdf_paths, args.workers)
+    loaded = time.perf_counter()
+    for path, error in failures:
+        print(f"FAIL {path}: {error}", file=sys.stderr)
+    if not schedules:
+        print("No schedules loaded", file=sys.stderr)
+        return 1
+
+    busy = pack_busy(schedules)
+    slots = common_free_slots(busy, args.min_free, args.length)
+    done = time.perf_counter()
+    print(f"Loaded {len(schedules)} schedules in {loaded - start:.2f} s, "
+          f"found {len(slots)} slots in {(done - loaded) * 1000:.1f} ms", file=sys.stderr)
+    logger.info(f"Free time search over {len(schedules)} schedules found {len(slots)} slots")
+
+    for day, period, free in slots[:args.top]:
+        print(f"{slot_label(day, period, args.length)}: {free}/{len(schedules)} free")
+        if args.show_busy and free < len(schedules):
+            names = [student_label(paths[i], schedules[i]) for i in busy_students(busy, day, period, args.length)]
+            print(f"    busy: {', '.join(names)}")
+    return 1 if failures else 0
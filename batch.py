@@ -0,0 +1,224 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from app_config import get_cohort_cache
+from extraction import EXTRACTION_MODES, default_workers, extract_from_pdf, process_pool
+from models import StudentSchedule
+
+logger = logging.getLogger(__name__)
+
+CSV_FIELDS = [
+    'file', 'student_id', 'student_name', 'advisor', 'department', 'major', 'semester',
+    'code', 'name', 'credits', 'ct', 'section', 'seq', 'activity',
+    'sun', 'mon', 'tue', 'wed', 'thu', 'building', 'room', 'staff'
+]
+
+
+# Walks a directory for schedule PDFs without listing it all up front
+def iter_pdf_files(directory, recursive=False):
+    with os.scandir(directory) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.is_dir() and recursive:
+                yield from iter_pdf_files(entry.path, recursive)
+            elif entry.is_file() and entry.name.lower().endswith('.pdf'):
+                yield entry.path
+
+
+# The PDFs named on a command line as (pdf_path, root): files found in a directory come
+# with that directory, files named directly with None
+def iter_input_pdfs(paths, recursive=False):
+    for path in paths:
+        if os.path.isdir(path):
+            for pdf_path in iter_pdf_files(path, recursive):
+                yield pdf_path, path
+        else:
+            yield path, None
+
+
+# Output file names of a command writing one file per PDF. A PDF's subfolder below the
+# directory it was found in is mirrored under out_dir, so x.pdf in two subfolders gets two
+# outputs. Inputs that would still share a file (the same name from two directories, say)
+# are refused: target() raises ValueError for the second one.
+class OutputPaths:
+    def __init__(self, out_dir, ext):
+        self.out_dir = out_dir
+        self.ext = ext
+        self.taken = {}
+
+    def target(self, pdf_path, root=None):
+        relative = os.path.relpath(pdf_path, root) if root is not None else os.path.basename(pdf_path)
+        path = os.path.join(self.out_dir, os.path.splitext(relative)[0] + self.ext)
+        first = self.taken.setdefault(os.path.normcase(os.path.abspath(path)), pdf_path)
+        if first != pdf_path:
+            raise ValueError(f"{path} is already written for {first}")
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        return path
+
+
+# One JSON-friendly record per student, including any clashing time slots
+def result_to_record(pdf_path, schedule):
+    record = {'file': pdf_path}
+    record.update(schedule.to_dict())
+    record['conflicts'] = schedule.conflicts()
+    return record
+
+
+def record_to_csv_rows(record):
+    student = record['student']
+    for course in record['courses']:
+        row = {
+            'file': record['file'],
+            'student_id': student['id'],
+            'student_name': student['name'],
+            'advisor': student['advisor'],
+            'department': student['department'],
+            'major': student['major'],
+            'semester': student['semester'],
+        }
+        row.update({k: v for k, v in course.items() if k != 'periods'})
+        row.update({day: ','.join(str(p) for p in periods) for day, periods in course['periods'].items()})
+        yield row
+
+
+# Process pool entry point: parses one file and times it
+def parse_file(pdf_path, mode='anchored'):
+    start = time.perf_counter()
+    try:
+        result = extract_from_pdf(pdf_path, mode=mode)
+        error = None if result else "no schedule data found"
+    except Exception as exc:  # a worker must report every failure instead of dying
+        result = None
+        error = f"{type(exc).__name__}: {exc}"
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    record = result_to_record(pdf_path, result) if result else None
+    return pdf_path, record, error, elapsed_ms
+
+
+# Calls func(*args) for every args tuple of jobs on a process pool with a bounded number of
+# jobs in flight, yielding results as they complete so memory stays flat for huge
+# directories. With one worker everything runs in this process, initializer included.
+def run_pool(func, jobs, workers, initializer=None):
+    if workers <= 1:
+        if initializer is not None:
+            initializer()
+        for args in jobs:
+            yield func(*args)
+        return
+
+    max_in_flight = workers * 4
+    with process_pool(workers, initializer) as executor:
+        pending = set()
+        for args in jobs:
+            pending.add(executor.submit(func, *args))
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in wait(pending).done:
+            yield future.result()
+
+
+# Runs parse_file over the paths, see run_pool
+def parse_files(paths, workers, mode='anchored'):
+    return run_pool(parse_file, ((path, mode) for path in paths), workers)
+
+
+# Loads each PDF from the cohort parse cache, parsing the misses on a process pool.
+# Returns (paths, schedules, failures) with failures as (path, error) pairs.
+def load_schedules(pdf_paths, workers=1):
+    cache = get_cohort_cache()
+    loaded = {}
+    misses = []
+    for path in pdf_paths:
+        cached = cache.get(path)
+        if cached is None:
+            misses.append(path)
+        else:
+            loaded[path] = cached
+
+    failures = []
+    for path, record, error, _ in parse_files(misses, workers):
+        if error:
+            failures.append((path, error))
+            continue
+        schedule = StudentSchedule.from_dict(record)
+        cache.put(path, schedule)
+        loaded[path] = schedule
+    cache.flush()
+
+    paths = [path for path in pdf_paths if path in loaded]
+    return paths, [loaded[path] for path in paths], failures
+
+
+class RecordWriter:
+    def __init__(self, out_path, fmt):
+        self.fmt = fmt
+        self.file = open(out_path, 'w', encoding='utf-8', newline='')
+        if fmt == 'csv':
+            self.csv_writer = csv.DictWriter(self.file, fieldnames=CSV_FIELDS)
+            self.csv_writer.writeheader()
+
+    def write(self, record):
+        if self.fmt == 'csv':
+            self.csv_writer.writerows(record_to_csv_rows(record))
+        else:
+            self.file.write(json.dumps(record, ensure_ascii=False))
+            self.file.write('\n')
+
+    def close(self):
+        self.file.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='schedule.py batch',
+                                     description='Parse a directory of schedule PDFs without the GUI.')
+    parser.add_argument('directory', help='directory containing schedule PDFs')
+    parser.add_argument('--out', default='results.jsonl', help='output file (.jsonl or .csv)')
+    parser.add_argument('--format', choices=['jsonl', 'csv'],
+                        help='output format, defaults to the --out extension')
+    parser.add_argument('--workers', type=int, default=default_workers(), help='parallel worker processes')
+    parser.add_argument('--mode', choices=EXTRACTION_MODES, default='anchored',
+                        help='table extraction mode (default: anchored)')
+    parser.add_argument('--recursive', action='store_true', help='also scan subdirectories')
+    parser.add_argument('--quiet', action='store_true', help='only report failures and the summary')
+    return parser
+
+
+def batch_main(argv):
+    args = build_parser().parse_args(argv)
+    if not os.path.isdir(args.directory):
+        print(f"Not a directory: {args.directory}", file=sys.stderr)
+        return 2
+    fmt = args.format or ('csv' if args.out.lower().endswith('.csv') else 'jsonl')
+
+    parsed = 0
+    failures = []
+    start = time.perf_counter()
+    writer = RecordWriter(args.out, fmt)
+    try:
+        for pdf_path, record, error, elapsed_ms in parse_files(iter_pdf_files(args.directory, args.recursive),
+                                                               args.workers, args.mode):
+            if error:
+                failures.append((pdf_path, error))
+                print(f"FAIL {pdf_path} ({elapsed_ms:.1f} ms): {error}", file=sys.stderr)
+                continue
+            writer.write(record)
+            parsed += 1
+            if not args.quiet:
+                print(f"ok   {pdf_path} ({elapsed_ms:.1f} ms, {len(record['courses'])} courses)", file=sys.stderr)
+    finally:
+        writer.close()
+
+    total = time.perf_counter() - start
+    count = parsed + len(failures)
+    rate = count / total if total > 0 else 0.0
+    print(f"Parsed {parsed} of {count} files in {total:.2f} s ({rate:.1f} files/s), "
+          f"{len(failures)} failed, output written to {args.out}", file=sys.stderr)
+    logger.info(f"Batch run finished: {parsed} parsed, {len(failures)} failed")
+    return 1 if failures else 0
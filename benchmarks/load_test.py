@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from models import DAY_KEYS, PERIOD_COUNT  # noqa: E402
+from synthetic_pdf import generate_courses, write_schedule_pdf  # noqa: E402
+
+COURSES_PER_STUDENT = 6
+# Share of requests per endpoint
+MIX = [('student', 0.6), ('course', 0.25), ('slot', 0.15)]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def get_json(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return json.loads(response.read())
+
+
+# Stand-in corpus of synthetic registrar PDFs, one student per seed
+def write_corpus(directory, students):
+    codes = set()
+    for seed in range(students):
+        write_schedule_pdf(os.path.join(directory, f'student_{seed:05d}.pdf'), courses=COURSES_PER_STUDENT, seed=seed)
+        codes.update(row[0] for row in generate_courses(COURSES_PER_STUDENT, seed))
+    return sorted(codes)
+
+
+# Starts 'schedule.py serve' with its own config directory, so the run neither reads nor
+# evicts the real parse cache
+def start_server(directory, home, port, workers):
+    env = dict(os.environ, HOME=home, APPDATA=home)
+    command = [sys.executable, os.path.join(REPO_DIR, 'schedule.py'), 'serve', '--dir', directory,
+               '--port', str(port), '--rescan', '0']
+    if workers:
+        command += ['--workers', str(workers)]
+    return subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_loaded(url, timeout):
+    deadline = time.monotonic() + timeout
+    status = None
+    while time.monotonic() < deadline:
+        try:
+            status = get_json(url + '/status')
+            if status['files'] and not status['pending']:
+                return status
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"Service did not finish loading within {timeout} s (last status: {status})")
+
+
+def request_targets(students, codes, count, seed=0):
+    rng = random.Random(seed)
+    kinds = [kind for kind, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    targets = []
+    for kind in rng.choices(kinds, weights, k=count):
+        if kind == 'student':
+            target = f"/students/{rng.choice(students)}"
+        elif kind == 'course':
+            target = f"/courses/{rng.choice(codes).replace(' ', '%20')}"
+        else:
+            target = f"/slots/{rng.choice(DAY_KEYS)}/{rng.randint(1, PERIOD_COUNT)}"
+        targets.append((kind, target))
+    return targets
+
+
+# One keep-alive connection sending requests back to back until the deadline
+async def client(host, port, targets, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        i = 0
+        while time.perf_counter() < deadline:
+            kind, target = targets[i % len(targets)]
+            i += 1
+            start = time.perf_counter()
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode('latin-1'))
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            if status == 200:
+                latencies[kind].append(time.perf_counter() - start)
+            else:
+                errors.append((target, status))
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, targets, concurrency, duration):
+    latencies = {kind: [] for kind, _ in MIX}
+    errors = []
+    start = time.perf_counter()
+    deadline = start + duration
+    step = max(1, len(targets) // concurrency)
+    await asyncio.gather(*(client(host, port, targets[i * step:] + targets[:i * step], deadline, latencies, errors)
+                           for i in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def latency_summary(values):
+    return {
+        'requests': len(values),
+        'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+        'max_ms': round(max(values, default=0.0) * 1000, 3),
+        'mean_ms': round(statistics.fmean(values) * 1000, 3) if values else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the local schedule service.')
+    parser.add_argument('--students', type=int, default=200, help='synthetic PDFs in the stand-in corpus')
+    parser.add_argument('--url', help='test an already running service instead, e.g. http://127.0.0.1:8765')
+    parser.add_argument('--concurrency', type=int, default=32, help='concurrent keep-alive connections')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds of load')
+    parser.add_argument('--workers', type=int, help='parse workers of the started service')
+    parser.add_argument('--load-timeout', type=float, default=600.0, help='seconds to wait for the corpus to load')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        codes = None
+        if args.url:
+            url = args.url.rstrip('/')
+        else:
+            corpus = os.path.join(tmp, 'corpus')
+            os.makedirs(corpus)
+            codes = write_corpus(corpus, args.students)
+            port = free_port()
+            url = f'http://127.0.0.1:{port}'
+            server = start_server(corpus, os.path.join(tmp, 'home'), port, args.workers)
+        try:
+            start = time.perf_counter()
+            status = wait_until_loaded(url, args.load_timeout)
+            load_s = time.perf_counter() - start
+            print(f"Service ready: {status['loaded']} schedules loaded, {len(status['failed'])} failed "
+                  f"({load_s:.1f} s)", file=sys.stderr)
+
+            students = [s['id'] for s in get_json(url + '/students')['students'] if s['id']]
+            if codes is None:
+                codes = sorted({c['code'] for s in students[:50]
+                                for c in get_json(f"{url}/students/{s}")['courses']})
+            if not students or not codes:
+                print("The service has no students to query", file=sys.stderr)
+                return 1
+            host, _, port = url.split('://', 1)[1].partition(':')
+            targets = request_targets(students, codes, 10000)
+            latencies, errors, elapsed = asyncio.run(run_load(host, int(port or 80), targets, args.concurrency,
+                                                              args.duration))
+            cache = get_json(url + '/status')['response_cache']
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+    every = [value for values in latencies.values() for value in values]
+    result = {
+        'students': len(students),
+        'concurrency': args.concurrency,
+        'duration_s': round(elapsed, 3),
+        'requests_per_s': round(len(every) / elapsed, 1),
+        'errors': len(errors),
+        'all': latency_summary(every),
+        'endpoints': {kind: latency_summary(values) for kind, values in latencies.items()},
+        'response_cache': cache,
+    }
+    print(json.dumps(result, indent=2))
+    print(f"{result['requests_per_s']} requests/s, p99 {result['all']['p99_ms']} ms over {len(every)} requests, "
+          f"{len(errors)} errors", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
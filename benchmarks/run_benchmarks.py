@@ -0,0 +1,337 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from extraction import EXTRACTION_MODES, PARSER_VERSION, extract_from_pdf  # noqa: E402
+from models import Course, StudentSchedule  # noqa: E402
+from synthetic_pdf import generate_courses, generate_offerings, write_schedule_pdf  # noqa: E402
+
+DEFAULT_CASES = ['12x1', '60x4', '300x20']
+# Slowest the planner may take on any of the separate-lab problems before the run fails
+PLANNER_BUDGET_MS = 1000
+PLANNER_SEEDS = 10
+
+
+def parse_case(text):
+    courses, _, pages = text.partition('x')
+    return int(courses), int(pages) if pages else None
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def page_count(pdf_path):
+    import pdfplumber
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def time_calls(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def bench_parse(pdf_path, pages, repeat, workers, mode):
+    timings, schedule = time_calls(lambda: extract_from_pdf(pdf_path, workers=workers, mode=mode), repeat)
+    median = statistics.median(timings)
+    rows = len(schedule.courses) if schedule else 0
+    return {
+        'workers': workers,
+        'mode': mode,
+        'median_s': round(median, 5),
+        'best_s': round(min(timings), 5),
+        'pages_per_s': round(pages / median, 2),
+        'rows_per_s': round(rows / median, 2),
+    }, schedule
+
+
+# Time to get the column edges and student info off an already parsed first page: a
+# template lookup for 'anchored' on a known layout, the header search for 'located'
+def bench_first_page(pdf_path, repeat, mode):
+    import pdfplumber
+    from extraction import read_first_page
+
+    timings = []
+    for _ in range(repeat):
+        # a fresh page each time, pdfplumber caches the text it extracts
+        with pdfplumber.open(pdf_path) as pdf:
+            page = pdf.pages[0]
+            page.chars, page.edges
+            timings.extend(time_calls(lambda: read_first_page(page, mode), 1)[0])
+    return round(statistics.median(timings) * 1000, 3)
+
+
+# The synthetic PDFs aren't the registrar's, so their layout is learned as a template
+# (for this process only) to let 'anchored' take the template path like real files do
+def register_synthetic_template(pdf_path):
+    import pdfplumber
+    from layout_templates import learn_template, match_template, register_template
+
+    with pdfplumber.open(pdf_path) as pdf:
+        if match_template(pdf.pages[0]) is None:
+            register_template(learn_template(pdf.pages[0], 'synthetic'))
+
+
+# Peak Python heap during one parse; a separate run so tracing doesn't skew the timings
+def bench_memory(pdf_path, mode):
+    tracemalloc.start()
+    try:
+        extract_from_pdf(pdf_path, mode=mode)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / (1024 * 1024), 3)
+
+
+# Packing a cohort's occupancy and ranking the common free slots, straight from generated
+# course rows so the numbers don't include any PDF parsing
+def bench_free_time(students, repeat):
+    from availability import common_free_slots, pack_busy
+
+    schedules = [StudentSchedule(student_id=str(i), courses=[Course.from_row(row) for row in generate_courses(6, i)])
+                 for i in range(students)]
+    pack, busy = time_calls(lambda: pack_busy(schedules), repeat)
+    query, slots = time_calls(lambda: common_free_slots(busy, min_free=students * 3 // 4, length=2), repeat)
+    return {
+        'students': students,
+        'pack_ms_median': round(statistics.median(pack) * 1000, 3),
+        'query_ms_median': round(statistics.median(query) * 1000, 3),
+        'slots': len(slots),
+    }
+
+
+# Room utilization over the same kind of generated cohort: deduplicating sections and
+# aggregating them into rooms x days x periods, then the per room summary
+def bench_utilization(students, repeat):
+    from utilization import RoomUsage
+
+    schedules = [StudentSchedule(student_id=str(i), courses=[Course.from_row(row) for row in generate_courses(6, i)])
+                 for i in range(students)]
+    aggregate, usage = time_calls(lambda: RoomUsage.from_schedules(schedules), repeat)
+    summary, _ = time_calls(usage.room_summary, repeat)
+    return {
+        'students': students,
+        'rooms': len(usage.rooms),
+        'aggregate_ms_median': round(statistics.median(aggregate) * 1000, 3),
+        'summary_ms_median': round(statistics.median(summary) * 1000, 3),
+    }
+
+
+# Search index over the cohort's course rows: building it, a save/load round trip and
+# the median latency of a few typical queries (exact code, prefix, typo, two fields)
+def bench_search(students, repeat):
+    from search_index import SearchIndex
+
+    schedules = [StudentSchedule(student_id=str(i), student_name=f'STUDENT {i}',
+                                 courses=[Course.from_row(row) for row in generate_courses(8, i)])
+                 for i in range(students)]
+
+    def build():
+        index = SearchIndex()
+        for i, schedule in enumerate(schedules):
+            index.add_schedule(f'student_{i}.pdf', schedule)
+        return index
+
+    building, index = time_calls(build, 1)
+    queries = ['cs 210', 'programming', 'algoritms', 'staff:zain room:mit']
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'search_index.json')
+        saving, _ = time_calls(lambda: index.save(path), 1)
+        loading, index = time_calls(lambda: SearchIndex.load(path), repeat)
+    return {
+        'students': students,
+        'rows': len(index),
+        'build_s': round(building[0], 3),
+        'save_s': round(saving[0], 3),
+        'load_s_median': round(statistics.median(loading), 3),
+        'query_ms_median': {query: round(statistics.median(time_calls(lambda: index.search(query), repeat)[0]) * 1000,
+                                         3) for query in queries},
+    }
+
+
+# Section planning from generated offerings, per ranking preset: labs in the lecture's own
+# section, then as separately numbered lab sections the planner has to pair. The separate-lab
+# case is also run once per preset on PLANNER_SEEDS differently generated offerings, as the
+# search time varies a lot with the sections drawn.
+def bench_planner(repeat, courses=8, sections=10):
+    from planner import PRESETS, Preferences, plan_schedules
+
+    result = {'courses': courses, 'sections': sections}
+    for separate_labs in (False, True):
+        offerings = [Course.from_row(row) for row in generate_offerings(courses, sections, 0, separate_labs)]
+        codes = sorted({course.code for course in offerings})
+        result['separate_labs_ms' if separate_labs else 'ms'] = {
+            name: round(statistics.median(time_calls(
+                lambda: plan_schedules(offerings, codes, Preferences.preset(name)), repeat)[0]) * 1000, 3)
+            for name in PRESETS}
+
+    timings = []
+    for seed in range(PLANNER_SEEDS):
+        offerings = [Course.from_row(row) for row in generate_offerings(courses, sections, seed, True)]
+        codes = sorted({course.code for course in offerings})
+        for name in PRESETS:
+            timings += time_calls(lambda: plan_schedules(offerings, codes, Preferences.preset(name)), 1)[0]
+    result['separate_labs_seeds'] = {'seeds': PLANNER_SEEDS, 'median_ms': round(statistics.median(timings) * 1000, 3),
+                                     'max_ms': round(max(timings) * 1000, 3)}
+    return result
+
+
+# Diffing two versions of the cohort where every tenth student had a room change and every
+# twentieth a course moved: the whole comparison, and the course by course diff alone
+def bench_diff(students, repeat):
+    from schedule_diff import compare_sides, diff_schedules
+
+    old, new = {}, {}
+    for i in range(students):
+        rows = generate_courses(8, i)
+        old[f'student_{i}.pdf'] = StudentSchedule(student_id=str(i), courses=[Course.from_row(row) for row in rows])
+        courses = [Course.from_row(row) for row in rows]
+        if i % 10 == 0:
+            courses[0].room = 'MOVED'
+        if i % 20 == 0:
+            courses[1].day_masks = courses[1].day_masks[1:] + courses[1].day_masks[:1]
+        new[f'student_{i}.pdf'] = StudentSchedule(student_id=str(i), courses=courses)
+    comparing, (diffs, _, _) = time_calls(lambda: compare_sides(old, new), repeat)
+    pair = diffs[0].new_file
+    single, _ = time_calls(lambda: diff_schedules(old[pair], new[pair]), repeat)
+    return {
+        'students': students,
+        'changed': len(diffs),
+        'compare_ms_median': round(statistics.median(comparing) * 1000, 3),
+        'diff_one_ms_median': round(statistics.median(single) * 1000, 3),
+    }
+
+
+class RenderBench:
+    def __init__(self):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PySide6.QtWidgets import QApplication
+        from gui import MainWindow
+        self.app = QApplication.instance() or QApplication([])
+        self.window = MainWindow()
+        self.window.resize(1000, 900)
+        self.window.show()
+        self.app.processEvents()
+
+    def run(self, schedule, repeat):
+        populate, paint = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            self.window.update_labels(schedule)
+            self.window.populate_schedule(schedule)
+            populated = time.perf_counter()
+            self.window.table.viewport().grab()
+            painted = time.perf_counter()
+            populate.append(populated - start)
+            paint.append(painted - populated)
+        return {
+            'populate_ms_median': round(statistics.median(populate) * 1000, 3),
+            'paint_ms_median': round(statistics.median(paint) * 1000, 3),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark schedule extraction and rendering.')
+    parser.add_argument('--case', action='append', dest='cases',
+                        help='COURSESxPAGES synthetic document, may be repeated (default: %s)' % ' '.join(DEFAULT_CASES))
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per measurement')
+    parser.add_argument('--workers', type=int, default=1, help='also time the process pool path with this many workers')
+    parser.add_argument('--mode', action='append', dest='modes', choices=EXTRACTION_MODES,
+                        help='extraction mode to time, may be repeated (default: all modes)')
+    parser.add_argument('--cohort', type=int, default=1000,
+                        help='students in the free time and room utilization benchmarks, 0 to skip')
+    parser.add_argument('--no-render', action='store_true', help='skip the offscreen Qt rendering benchmark')
+    parser.add_argument('--out', default='benchmark_results.jsonl', help='JSON lines file to append the run to')
+    args = parser.parse_args(argv)
+
+    modes = args.modes or list(EXTRACTION_MODES)
+    render = None if args.no_render else RenderBench()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for case in args.cases or DEFAULT_CASES:
+            courses, pages = parse_case(case)
+            pdf_path = os.path.join(tmp, f'synthetic_{case}.pdf')
+            rows = write_schedule_pdf(pdf_path, courses=courses, pages=pages)
+            actual_pages = page_count(pdf_path)
+            if 'anchored' in modes:
+                register_synthetic_template(pdf_path)
+
+            parse = []
+            schedule = None
+            for mode in modes:
+                serial, result = bench_parse(pdf_path, actual_pages, args.repeat, 1, mode)
+                parse.append(serial)
+                schedule = schedule or result
+                if args.workers > 1:
+                    parse.append(bench_parse(pdf_path, actual_pages, args.repeat, args.workers, mode)[0])
+            entry = {
+                'case': case,
+                'courses': courses,
+                'pages': actual_pages,
+                'file_bytes': os.path.getsize(pdf_path),
+                'rows_expected': len(rows),
+                'rows_extracted': len(schedule.courses) if schedule else 0,
+                'parse': parse,
+                'first_page_ms': {mode: bench_first_page(pdf_path, args.repeat, mode) for mode in modes},
+                'peak_heap_mb': bench_memory(pdf_path, modes[0]),
+            }
+            if render is not None and schedule:
+                entry['render'] = render.run(schedule, args.repeat)
+            results.append(entry)
+            print(json.dumps(entry), file=sys.stderr)
+
+    record = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'parser_version': PARSER_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'cases': results,
+    }
+    if args.cohort:
+        record['free_time'] = bench_free_time(args.cohort, args.repeat)
+        print(json.dumps(record['free_time']), file=sys.stderr)
+        record['utilization'] = bench_utilization(args.cohort, args.repeat)
+        print(json.dumps(record['utilization']), file=sys.stderr)
+        record['search'] = bench_search(args.cohort, args.repeat)
+        print(json.dumps(record['search']), file=sys.stderr)
+        record['diff'] = bench_diff(args.cohort, args.repeat)
+        print(json.dumps(record['diff']), file=sys.stderr)
+    record['planner'] = bench_planner(args.repeat)
+    print(json.dumps(record['planner']), file=sys.stderr)
+    with open(args.out, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+    print(f"Results appended to {args.out}", file=sys.stderr)
+    slowest = record['planner']['separate_labs_seeds']['max_ms']
+    if slowest > PLANNER_BUDGET_MS:
+        print(f"Planner took {slowest:.0f} ms on separate lab sections, over the {PLANNER_BUDGET_MS} ms budget",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
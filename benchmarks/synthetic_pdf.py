@@ -0,0 +1,189 @@
+import random
+
+# Writes synthetic registrar schedule PDFs for the benchmarks. The page geometry, the two
+# header rows and the student info block follow the real registrar export that
+# extract_from_pdf is written against, without needing any PDF library.
+
+PAGE_WIDTH = 842
+PAGE_HEIGHT = 595
+FONT_SIZE = 7
+
+# Cell x boundaries of the 15 schedule columns, Course Code .. Staff
+COLUMN_EDGES = [20, 70, 240, 270, 300, 336, 373, 433, 469, 505, 542, 578, 614, 689, 747, 822]
+SUBHEADERS = ['Sec', 'Seq', 'Activity', 'Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Building', 'Room', 'Staff']
+
+FIRST_TABLE_TOP = 125
+TABLE_TOP = 40
+HEADER_HEIGHTS = (12, 21)
+ROW_HEIGHT = 24
+TABLE_BOTTOM = 560
+
+DEPARTMENTS = ['CS', 'MATH', 'PHYS', 'ENGL', 'CHEM', 'IAS', 'PE', 'STAT', 'BIO', 'EE']
+TOPICS = ['Programming', 'Calculus', 'Physics', 'Writing', 'Chemistry', 'Statistics', 'Algorithms',
+          'Data Structures', 'Networks', 'Databases', 'Microprocessors', 'Linear Algebra', 'Biology']
+LEVELS = ['I', 'II', 'III', 'Foundations', 'Lab']
+ACTIVITIES = ['Theoretical', 'Practical', 'Tutorial']
+BUILDINGS = ['MIT First Floor', 'Wing 6 - First Floor', 'Wing 1 - Ground Floor', 'ELI Third Floor', 'FIELD-GYM']
+STAFF = ['ABDULLAH', 'SHAFEEQUE', 'MUJABAR', 'SALEH', 'LATIF', 'AHMAD', 'ZAIN', 'DHAFER']
+
+
+def rows_per_page(first_page):
+    top = (FIRST_TABLE_TOP if first_page else TABLE_TOP) + sum(HEADER_HEIGHTS)
+    return (TABLE_BOTTOM - top) // ROW_HEIGHT
+
+
+# Random but reproducible course rows in the 15 column registrar order
+def generate_courses(count, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        dept = rng.choice(DEPARTMENTS)
+        days = [''] * 5
+        start = rng.randint(1, 13)
+        length = rng.randint(1, 3)
+        periods = ','.join(str(p) for p in range(start, min(start + length, 16)))
+        for day in rng.sample(range(5), rng.randint(1, 3)):
+            days[day] = periods
+        rows.append([
+            f"{dept} {100 + i % 400}",
+            f"{rng.choice(TOPICS)} {rng.choice(LEVELS)}",
+            str(rng.randint(1, 4)), str(rng.randint(1, 4)), str(rng.randint(1, 40)), str(rng.randint(1, 1500)),
+            rng.choice(ACTIVITIES), *days,
+            rng.choice(BUILDINGS), f"{rng.choice('ABCM')}{rng.randint(100, 699)}", rng.choice(STAFF),
+        ])
+    return rows
+
+
+# An offerings list for the planner: `sections` sections of every course with a lecture on
+# two days, every other course also with a two period lab. The lab is a row of the same
+# section, or with separate_labs one of as many lab sections numbered from 51.
+def generate_offerings(courses, sections, seed=0, separate_labs=False):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(courses):
+        code = f"{DEPARTMENTS[i % len(DEPARTMENTS)]} {101 + i}"
+        name = f"{rng.choice(TOPICS)} {rng.choice(LEVELS)}"
+        kinds = [('Theoretical', 2, 1, 0)]
+        if i % 2:
+            kinds.append(('Practical', 1, 2, 50 if separate_labs else 0))
+        for activity, meetings, length, first_section in kinds:
+            for section in range(1, sections + 1):
+                days = [''] * 5
+                start = rng.randint(1, 14 - length)
+                for day in rng.sample(range(5), meetings):
+                    days[day] = ','.join(str(p) for p in range(start, start + length))
+                rows.append([
+                    code, name, '3' if activity == 'Theoretical' else '', str(length), str(first_section + section),
+                    str(rng.randint(1, 1500)), activity, *days,
+                    rng.choice(BUILDINGS), f"{rng.choice('ABCM')}{rng.randint(100, 699)}", rng.choice(STAFF),
+                ])
+    return rows
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+class _Page:
+    def __init__(self):
+        self.ops = ['0.5 w']
+
+    def text(self, x, top, text, size=FONT_SIZE):
+        if text:
+            y = PAGE_HEIGHT - top - size
+            self.ops.append(f"BT /F1 {size} Tf {x:.2f} {y:.2f} Td ({_escape(text)}) Tj ET")
+
+    def cell(self, x0, top, x1, bottom, text=""):
+        self.ops.append(f"{x0:.2f} {PAGE_HEIGHT - bottom:.2f} {x1 - x0:.2f} {bottom - top:.2f} re S")
+        self.text(x0 + 2, top + 3, text)
+
+    def row(self, top, height, cells):
+        for col, text in enumerate(cells):
+            self.cell(COLUMN_EDGES[col], top, COLUMN_EDGES[col + 1], top + height, text)
+
+    def header(self, top):
+        first, second = HEADER_HEIGHTS
+        for col, text in enumerate(['Course Code', 'Course Name', 'CR', 'CT']):
+            self.cell(COLUMN_EDGES[col], top, COLUMN_EDGES[col + 1], top + first + second, text)
+        self.cell(COLUMN_EDGES[4], top, COLUMN_EDGES[-1], top + first, 'Details')
+        for col, text in enumerate(SUBHEADERS, start=4):
+            self.cell(COLUMN_EDGES[col], top + first, COLUMN_EDGES[col + 1], top + first + second, text)
+        return top + first + second
+
+    def content(self):
+        return '\n'.join(self.ops).encode('latin-1', 'replace')
+
+
+def _student_block(page, student):
+    lines = [
+        (('Student Name :', student['name']), ('Department :', student['department']),
+         ('Classification :', 'Regular')),
+        (('Student ID :', student['id']), ('Major :', student['major']), ('Stream :', 'Science')),
+        (('Advisor Name :', ''), ('Semester :', student['semester'])),
+    ]
+    for line, top in zip(lines, (54, 74, 93)):
+        for (label, value), x in zip(line, (36, 348, 611)):
+            page.text(x, top, label, size=10)
+            page.text(x + 100, top, value, size=10)
+
+
+def _write_pdf(path, contents):
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    page_ids = []
+    for content in contents:
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >> "
+                       b"/Contents %d 0 R >>" % (PAGE_WIDTH, PAGE_HEIGHT, content_id))
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    kids = b' '.join(b"%d 0 R" % pid for pid in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+# Writes a schedule PDF with the given course count. With pages set, the rows are spread
+# over that many pages (capped by what fits on a page); otherwise pages fill up in order.
+# Returns the generated course rows.
+def write_schedule_pdf(path, courses=12, pages=None, seed=0, student=None):
+    rows = generate_courses(courses, seed)
+    student = student or {'name': f'STUDENT {seed}', 'id': f'{4200000000 + seed}', 'department': 'Computer Science',
+                          'major': 'Computer Science', 'semester': '431'}
+
+    chunks = []
+    remaining = list(rows)
+    page_count = pages or 1
+    while remaining or not chunks:
+        capacity = rows_per_page(not chunks)
+        if pages:
+            capacity = min(capacity, max(1, -(-len(remaining) // max(1, page_count - len(chunks)))))
+        chunks.append(remaining[:capacity])
+        remaining = remaining[capacity:]
+
+    contents = []
+    for number, chunk in enumerate(chunks):
+        page = _Page()
+        if number == 0:
+            _student_block(page, student)
+        top = page.header(FIRST_TABLE_TOP if number == 0 else TABLE_TOP)
+        for row in chunk:
+            page.row(top, ROW_HEIGHT, row)
+            top += ROW_HEIGHT
+        if number == len(chunks) - 1:
+            total = ['Total', '', str(sum(int(r[2]) for r in rows)), str(sum(int(r[3]) for r in rows))] + [''] * 11
+            page.row(top, ROW_HEIGHT, total)
+        contents.append(page.content())
+    _write_pdf(path, contents)
+    return rows
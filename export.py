@@ -0,0 +1,356 @@
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+
+from extraction import EXTRACTION_MODES, default_workers, extract_from_pdf
+from models import DAYS, DEFAULT_PERIOD_TIMES, PERIOD_COUNT
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('ics', 'csv')
+DEFAULT_TERM_WEEKS = 16
+PRODID = '-//Schedule Manager//Schedule Export//EN'
+
+CSV_FIELDS = [
+    'student_id', 'student_name', 'code', 'name', 'section', 'seq', 'activity',
+    'day', 'start', 'end', 'periods', 'building', 'room', 'staff'
+]
+
+
+# Clock times of the periods and the weeks the classes repeat for. period_times holds a
+# ((hour, minute), (hour, minute)) start and end per period; term_start is the first day
+# of teaching, classes before it in that week start the week after.
+@dataclass(slots=True)
+class CalendarSettings:
+    period_times: tuple
+    term_start: date
+    weeks: int = DEFAULT_TERM_WEEKS
+
+
+def parse_clock(text):
+    hour, _, minute = str(text).strip().partition(':')
+    if not (hour.isdigit() and minute.isdigit() and int(hour) < 24 and int(minute) < 60):
+        raise ValueError(f"Not a HH:MM time: {text!r}")
+    return int(hour), int(minute)
+
+
+# A period table as PERIOD_COUNT (start, end) pairs of 'HH:MM' strings
+def parse_period_times(pairs):
+    pairs = list(pairs)
+    if len(pairs) != PERIOD_COUNT:
+        raise ValueError(f"Expected {PERIOD_COUNT} periods, got {len(pairs)}")
+    times = []
+    for period, pair in enumerate(pairs, start=1):
+        if len(pair) != 2:
+            raise ValueError(f"Period {period} needs a start and an end time")
+        start, end = parse_clock(pair[0]), parse_clock(pair[1])
+        if end <= start:
+            raise ValueError(f"Period {period} ends before it starts")
+        times.append((start, end))
+    return tuple(times)
+
+
+# Period table from a .json file (a list of [start, end] pairs) or a CSV file of
+# start,end lines, then config.json "period_times", then DEFAULT_PERIOD_TIMES
+def load_period_times(path=None):
+    if path:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            if path.lower().endswith('.json'):
+                pairs = json.load(f)
+            else:
+                pairs = [row for row in csv.reader(f) if row and not row[0].lstrip().startswith('#')]
+        return parse_period_times(pairs)
+
+    from app_config import load_config
+    configured = load_config().get('period_times')
+    if configured:
+        try:
+            return parse_period_times(configured)
+        except (TypeError, ValueError):
+            logger.exception("Ignoring invalid period_times in config.json")
+    return parse_period_times(DEFAULT_PERIOD_TIMES)
+
+
+# Settings from config.json ("term_start": "2026-09-06", "term_weeks": 16), with any
+# explicit values taking precedence; without a term start the current week is used
+def calendar_settings(periods_path=None, term_start=None, weeks=None):
+    from app_config import load_config
+
+    config = load_config()
+    if term_start is None and config.get('term_start'):
+        try:
+            term_start = date.fromisoformat(config['term_start'])
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring invalid term_start in config.json: {config['term_start']!r}")
+    if term_start is None:
+        today = date.today()
+        term_start = today - timedelta(days=(today.weekday() + 1) % 7)
+    if weeks is None:
+        weeks = config.get('term_weeks', DEFAULT_TERM_WEEKS)
+    return CalendarSettings(load_period_times(periods_path), term_start, int(weeks))
+
+
+# Runs of consecutive periods of a course as (day, first period, last period)
+def meeting_blocks(course):
+    for day, mask in enumerate(course.day_masks):
+        first = None
+        for period in range(1, PERIOD_COUNT + 2):
+            meets = period <= PERIOD_COUNT and mask >> (period - 1) & 1
+            if meets and first is None:
+                first = period
+            elif not meets and first is not None:
+                yield day, first, period - 1
+                first = None
+
+
+# Date of the first class on a day; DAYS starts on Sunday
+def first_meeting_date(term_start, day):
+    week_start = term_start - timedelta(days=(term_start.weekday() + 1) % 7)
+    meeting = week_start + timedelta(days=day)
+    return meeting if meeting >= term_start else meeting + timedelta(weeks=1)
+
+
+# Text of a PDF cell on one line; wrapped cells come with line breaks inside the value
+def _one_line(value):
+    return " ".join(str(value).split())
+
+
+def _ics_text(value):
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+# Content lines are folded at 75 octets, without splitting a UTF-8 sequence
+def _fold(line):
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line
+    parts = []
+    start, limit = 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        while end < len(data) and (data[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode('utf-8'))
+        start, limit = end, 74
+    return '\r\n '.join(parts)
+
+
+def _ics_time(moment):
+    return moment.strftime('%Y%m%dT%H%M%S')
+
+
+# The calendar of one schedule as unfolded content lines: a weekly VEVENT, repeated for
+# the term, for every run of consecutive periods of every course. Times are floating,
+# i.e. local wherever the calendar is opened.
+def ics_lines(schedule, settings, stamp=None):
+    stamp = stamp or datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    name = _one_line(schedule.student_name or schedule.student_id or "Schedule")
+    yield 'BEGIN:VCALENDAR'
+    yield 'VERSION:2.0'
+    yield f'PRODID:{PRODID}'
+    yield 'CALSCALE:GREGORIAN'
+    yield f'X-WR-CALNAME:{_ics_text(name)}'
+    for course in schedule.courses:
+        summary = _one_line(f"{course.code} {course.name}")
+        if course.activity:
+            summary += f" ({_one_line(course.activity)})"
+        location = _one_line(course.location)
+        details = []
+        if course.section:
+            details.append(f"Section {_one_line(course.section)}")
+        if course.staff:
+            details.append(f"Staff: {_one_line(course.staff)}")
+        for day, first, last in meeting_blocks(course):
+            meeting = first_meeting_date(settings.term_start, day)
+            start = datetime(meeting.year, meeting.month, meeting.day, *settings.period_times[first - 1][0])
+            end = datetime(meeting.year, meeting.month, meeting.day, *settings.period_times[last - 1][1])
+            key = '|'.join((schedule.student_id, course.code, course.section, course.seq, course.activity,
+                            str(day), str(first)))
+            yield 'BEGIN:VEVENT'
+            yield f'UID:{hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()}@schedulemanager'
+            yield f'DTSTAMP:{stamp}'
+            yield f'DTSTART:{_ics_time(start)}'
+            yield f'DTEND:{_ics_time(end)}'
+            yield f'RRULE:FREQ=WEEKLY;COUNT={settings.weeks}'
+            yield f'SUMMARY:{_ics_text(summary)}'
+            if location:
+                yield f'LOCATION:{_ics_text(location)}'
+            if details:
+                yield f'DESCRIPTION:{_ics_text(chr(10).join(details))}'
+            yield 'END:VEVENT'
+    yield 'END:VCALENDAR'
+
+
+# f must be opened with newline='' so the CRLF line endings iCalendar requires survive
+def write_ics(f, schedule, settings):
+    for line in ics_lines(schedule, settings):
+        f.write(_fold(line))
+        f.write('\r\n')
+
+
+# One row per run of consecutive periods, with the clock times from the period table
+def csv_rows(schedule, settings):
+    for course in schedule.courses:
+        for day, first, last in meeting_blocks(course):
+            start = settings.period_times[first - 1][0]
+            end = settings.period_times[last - 1][1]
+            yield {
+                'student_id': schedule.student_id, 'student_name': _one_line(schedule.student_name),
+                'code': course.code, 'name': _one_line(course.name), 'section': course.section, 'seq': course.seq,
+                'activity': _one_line(course.activity), 'day': DAYS[day],
+                'start': f"{start[0]:02d}:{start[1]:02d}", 'end': f"{end[0]:02d}:{end[1]:02d}",
+                'periods': f"{first}-{last}" if last > first else str(first),
+                'building': _one_line(course.building), 'room': _one_line(course.room),
+                'staff': _one_line(course.staff),
+            }
+
+
+def open_csv(path):
+    f = open(path, 'w', encoding='utf-8', newline='')
+    writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    return f, writer
+
+
+def export_schedule(path, schedule, settings):
+    if path.lower().endswith('.csv'):
+        f, writer = open_csv(path)
+        with f:
+            writer.writerows(csv_rows(schedule, settings))
+    else:
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            write_ics(f, schedule, settings)
+
+
+# Process pool entry point: parses one PDF unless its schedule came from the parse cache,
+# and writes its calendar when out_path is given. Returns the schedule so the caller can
+# cache it and stream CSV rows from it.
+def export_file(pdf_path, schedule, out_path, settings, mode='anchored'):
+    start = time.perf_counter()
+    parsed = schedule is None
+    error = None
+    try:
+        if parsed:
+            schedule = extract_from_pdf(pdf_path, mode=mode)
+            if not schedule:
+                error = "no schedule data found"
+        if schedule and out_path:
+            with open(out_path, 'w', encoding='utf-8', newline='') as f:
+                write_ics(f, schedule, settings)
+    except Exception as exc:  # a worker must report every failure instead of dying
+        schedule = None
+        error = f"{type(exc).__name__}: {exc}"
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return pdf_path, out_path, None if error else schedule, parsed, error, elapsed_ms
+
+
+# Runs export_file over (pdf_path, cached schedule, out_path) jobs on a process pool,
+# yielding results as they complete so memory stays flat for thousands of files
+def run_exports(jobs, settings, workers, mode='anchored'):
+    from batch import run_pool
+    return run_pool(export_file, ((pdf_path, schedule, out_path, settings, mode)
+                                  for pdf_path, schedule, out_path in jobs), workers)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='schedule.py export',
+                                     description='Export schedules as iCalendar files or CSV.')
+    parser.add_argument('paths', nargs='+', help='schedule PDFs or directories of them')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='ics',
+                        help='ics: one calendar per student; csv: one table of every class (default: ics)')
+    parser.add_argument('--out', help='ics: output directory, or a .ics file for a single PDF (default: calendars); '
+                                      'csv: output file (default: schedule_export.csv)')
+    parser.add_argument('--periods', help='period times as JSON [[start, end], ...] or CSV start,end lines')
+    parser.add_argument('--term-start', type=date.fromisoformat, help='first day of teaching, YYYY-MM-DD')
+    parser.add_argument('--weeks', type=int, help=f'weeks the classes repeat for (default: {DEFAULT_TERM_WEEKS})')
+    parser.add_argument('--workers', type=int, default=default_workers(), help='parallel worker processes')
+    parser.add_argument('--mode', choices=EXTRACTION_MODES, default='anchored',
+                        help='table extraction mode for PDFs that are not cached (default: anchored)')
+    parser.add_argument('--recursive', action='store_true', help='also scan subdirectories')
+    return parser
+
+
+# Jobs for run_exports; a PDF whose calendar would overwrite another one's is reported in
+# failures instead
+def _export_jobs(inputs, out_path, single_file, cache, failures):
+    from batch import OutputPaths
+
+    targets = OutputPaths(out_path, '.ics') if out_path is not None and not single_file else None
+    for pdf_path, root in inputs:
+        target = out_path if single_file else None
+        if targets is not None:
+            try:
+                target = targets.target(pdf_path, root)
+            except ValueError as e:
+                failures.append((pdf_path, str(e)))
+                print(f"FAIL {pdf_path}: {e}", file=sys.stderr)
+                continue
+        yield pdf_path, cache.get(pdf_path), target
+
+
+def export_main(argv):
+    from app_config import get_cohort_cache
+    from batch import iter_input_pdfs
+
+    args = build_parser().parse_args(argv)
+    try:
+        settings = calendar_settings(args.periods, args.term_start, args.weeks)
+    except (OSError, ValueError) as e:
+        print(f"Invalid period times: {e}", file=sys.stderr)
+        return 2
+
+    for path in args.paths:
+        if not os.path.exists(path):
+            print(f"Not found: {path}", file=sys.stderr)
+            return 2
+    # Directories are walked lazily, so thousands of PDFs are never listed up front
+    inputs = iter_input_pdfs(args.paths, args.recursive)
+
+    single_file = False
+    csv_file = csv_writer = None
+    if args.format == 'csv':
+        csv_file, csv_writer = open_csv(args.out or 'schedule_export.csv')
+        out_path = None
+    else:
+        out_path = args.out or 'calendars'
+        single_file = out_path.lower().endswith('.ics')
+        if single_file and (len(args.paths) != 1 or os.path.isdir(args.paths[0])):
+            print("A .ics --out needs exactly one PDF", file=sys.stderr)
+            return 2
+        if not single_file:
+            os.makedirs(out_path, exist_ok=True)
+
+    cache = get_cohort_cache()
+    exported = 0
+    failures = []
+    start = time.perf_counter()
+    try:
+        jobs = _export_jobs(inputs, out_path, single_file, cache, failures)
+        for pdf_path, target, schedule, parsed, error, _ in run_exports(jobs, settings, args.workers, args.mode):
+            if error:
+                failures.append((pdf_path, error))
+                print(f"FAIL {pdf_path}: {error}", file=sys.stderr)
+                continue
+            if parsed:
+                cache.put(pdf_path, schedule)
+            if csv_writer is not None:
+                csv_writer.writerows(csv_rows(schedule, settings))
+            exported += 1
+    finally:
+        cache.flush()
+        if csv_file is not None:
+            csv_file.close()
+
+    total = time.perf_counter() - start
+    print(f"Exported {exported} schedules in {total:.2f} s, {len(failures)} failed, "
+          f"output written to {args.out or out_path or 'schedule_export.csv'}", file=sys.stderr)
+    logger.info(f"Export finished: {exported} exported, {len(failures)} failed")
+    return 1 if failures else 0
@@ -0,0 +1,509 @@
+import hashlib
+import logging
+import math
+import os
+from bisect import bisect_right
+
+from instrumentation import span
+from models import Course, StudentSchedule
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever extract_from_pdf changes its output so cached results are invalidated
+PARSER_VERSION = 4
+
+# Files shorter than this are parsed serially: spawned workers import the PDF stack
+# afresh, which costs more than the pool saves on a short file
+PARALLEL_MIN_PAGES = 16
+
+# 'anchored' takes the column edges and student info positions from a known layout template
+# when the first page matches one, and otherwise locates the table from its header row;
+# 'located' always locates it; both cut every page's cells at explicit column edges.
+# 'generic' runs pdfplumber's table detection over whole pages.
+EXTRACTION_MODES = ('anchored', 'located', 'generic')
+
+# Header cell texts of the registrar table, matched exactly rather than as substrings
+HEADER_LABELS = {
+    'course code', 'course name', 'cr', 'ct', 'details', 'sec', 'seq', 'activity',
+    'sun', 'mon', 'tue', 'wed', 'thu', 'building', 'room', 'staff'
+}
+# One header word per column, left to right, used to find the column edges
+COLUMN_ANCHORS = ['Code', 'Name', 'CR', 'CT', 'Sec', 'Seq', 'Activity', 'Sun', 'Mon', 'Tue', 'Wed', 'Thu',
+                  'Building', 'Room', 'Staff']
+
+
+class ExtractionCancelled(Exception):
+    pass
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+# Worker processes are spawned, never forked: the GUI and the service start pools from
+# threads, and a forked child can inherit a lock another thread was holding (the log
+# listener's, Qt's) and hang on it
+def process_pool(max_workers, initializer=None):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    from log_config import worker_log_setup
+
+    return ProcessPoolExecutor(max_workers=max_workers, initializer=_start_worker,
+                               initargs=(worker_log_setup(), initializer),
+                               mp_context=multiprocessing.get_context('spawn'))
+
+
+# Start-up of a pool worker: log through the parent, then the pool's own initializer
+def _start_worker(log_setup, initializer):
+    if log_setup is not None:
+        from log_config import log_to_queue
+
+        log_to_queue(*log_setup)
+    if initializer is not None:
+        initializer()
+
+
+def _strip_label(text, label):
+    text = text.strip()
+    return text[len(label):].strip() if text.startswith(label) else text
+
+
+# Student info from the text of the first page
+def parse_student_info(text):
+    stu_id = ""
+    stu_name = ""
+    advisor = ""
+    department = ""
+    major = ""
+    semester = ""
+
+    for line in text.split('\n'):
+        line_clean = line.strip()
+
+        if 'Department :' in line_clean and 'Classification :' in line_clean:
+            stu_name = _strip_label(line_clean.split('Department :')[0], 'Student Name :')
+            department = line_clean.split('Department :')[1].split('Classification :')[0].strip()
+
+        elif 'Major :' in line_clean and 'Stream :' in line_clean:
+            stu_id = _strip_label(line_clean.split('Major :')[0], 'Student ID :')
+            major = line_clean.split('Major :')[1].split('Stream :')[0].strip()
+
+        elif 'Semester :' in line_clean:
+            advisor = _strip_label(line_clean.split('Semester :')[0], 'Advisor Name :')
+            semester = line_clean.split('Semester :')[1].strip()
+
+    return stu_id, stu_name, advisor, department, major, semester
+
+
+def is_header_row(row):
+    labels = {str(cell).strip().lower() for cell in row if cell}
+    return len(labels & HEADER_LABELS) >= 2
+
+
+# Course rows out of pdfplumber tables, each padded to the 15 registrar columns
+def collect_course_rows(tables, min_table_rows=3):
+    rows = []
+    for table in tables:
+        if not table or len(table) < min_table_rows:
+            continue
+
+        for row in table:
+            if not row or len(row) < 10:
+                continue
+
+            if is_header_row(row):
+                continue
+
+            if all(cell is None or str(cell).strip() == "" for cell in row):
+                continue
+
+            row_extended = list(row) + [""] * max(0, 15 - len(row))
+
+            code = str(row_extended[0] or "").strip()
+            if code and code.lower() != 'total':
+                rows.append([cell or "" for cell in row_extended[:15]])
+    return rows
+
+
+# Merges positions no more than tolerance apart into their mean, so a rule drawn as several
+# segments counts once; shared with the layout templates
+def cluster_positions(positions, tolerance=2):
+    clusters = []
+    for x in sorted(positions):
+        if clusters and x - clusters[-1][-1] <= tolerance:
+            clusters[-1].append(x)
+        else:
+            clusters.append([x])
+    return [sum(cluster) / len(cluster) for cluster in clusters]
+
+
+# Locates the schedule table once from the header row of the first page.
+# Returns (column_edges, header_top) or None when the page doesn't have the registrar header.
+# Each header word is matched to the nearest ruled vertical edge on its left.
+def locate_table_layout(page):
+    words = page.extract_words()
+    code = next((w for prev, w in zip(words, words[1:]) if prev['text'] == 'Course' and w['text'] == 'Code'), None)
+    if code is None:
+        return None
+    sec = next((w for w in words if w['text'] == 'Sec' and w['top'] >= code['top']), None)
+    if sec is None:
+        return None
+
+    band = [w for w in words if w['top'] >= code['top'] - 2 and w['bottom'] <= sec['bottom'] + 2]
+    anchors = []
+    for label in COLUMN_ANCHORS:
+        word = next((w for w in band if w['text'] == label), None)
+        if word is None:
+            return None
+        anchors.append(word)
+
+    header_top = max(0, code['top'] - 12)
+    header = page.crop((0, header_top, page.width, min(page.height, sec['bottom'] + 2)))
+    xs = cluster_positions(edge['x0'] for edge in header.vertical_edges)
+    edges = []
+    for word in anchors:
+        left = [x for x in xs if x <= word['x0']]
+        if not left:
+            return None
+        edges.append(left[-1])
+    right = [x for x in xs if x >= anchors[-1]['x1']]
+    if not right:
+        return None
+    edges.append(right[0])
+
+    if any(a >= b for a, b in zip(edges, edges[1:])):
+        return None
+    return edges, header_top
+
+
+# y positions of the rules crossing the Course Code column; every gap between two
+# consecutive rules is one table row
+def _row_boundaries(page, edges):
+    x = (edges[0] + edges[1]) / 2
+    return cluster_positions(edge['top'] for edge in page.horizontal_edges if edge['x0'] <= x <= edge['x1'])
+
+
+# Cuts the page's characters into the (row, column) grid given by the rules and the column
+# edges in one pass, rather than letting pdfplumber rescan every character for every cell.
+# A character belongs to the cell holding its midpoint, same as pdfplumber's own tables.
+def _grid_cells(page, edges, boundaries):
+    cells = {}
+    left, right = edges[0], edges[-1]
+    top, bottom = boundaries[0], boundaries[-1]
+    for char in page.chars:
+        h_mid = (char['x0'] + char['x1']) / 2
+        v_mid = (char['top'] + char['bottom']) / 2
+        if left <= h_mid < right and top <= v_mid < bottom:
+            key = (bisect_right(boundaries, v_mid) - 1, bisect_right(edges, h_mid) - 1)
+            cells.setdefault(key, []).append(char)
+    return cells
+
+
+# Course rows of a single page. With column edges the cells are cut straight at those edges
+# and the row rules, starting at the header row when the page repeats it and stopping at
+# the 'Total' row; without them the whole page goes through pdfplumber's table detection.
+def extract_page_rows(page, edges=None):
+    if edges is None:
+        return collect_course_rows(page.extract_tables() or [])
+
+    from pdfplumber.utils import extract_text
+
+    boundaries = _row_boundaries(page, edges)
+    if len(boundaries) < 2:
+        return []
+    cells = _grid_cells(page, edges, boundaries)
+    table = []
+    for r in range(len(boundaries) - 1):
+        row = [extract_text(cells[(r, c)]) if (r, c) in cells else "" for c in range(len(edges) - 1)]
+        if not row[0].strip() and row[1].strip().lower() == 'total':
+            break
+        if is_header_row(row):
+            table = []
+        table.append(row)
+    return collect_course_rows([table], min_table_rows=1)
+
+
+# Yields the course rows of pages [start, stop) one page at a time. pdfplumber keeps every
+# parsed page's layout objects until the PDF is closed, so each page is closed as soon as its
+# rows are out and memory stays flat however long the document is.
+def iter_page_rows(pdf, edges=None, start=0, stop=None, cancel_event=None, pdf_path=None):
+    debug = logger.isEnabledFor(logging.DEBUG)
+    for page in pdf.pages[start:stop]:
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExtractionCancelled(pdf_path)
+        try:
+            rows = extract_page_rows(page, edges)
+        finally:
+            page.close()
+        if debug:
+            logger.debug(f"Page {page.page_number}: {len(rows)} rows ({'anchored' if edges else 'generic'})")
+        yield rows
+
+
+# Column edges and student info from the first page, see extract_from_pdf for mode
+def read_first_page(first_page, mode='anchored'):
+    if mode == 'anchored':
+        from layout_templates import match_template
+
+        with span("extract.template") as fields:
+            template = match_template(first_page)
+            fields['template'] = template.name if template else None
+        if template is not None:
+            with span("extract.student_info", template=template.name):
+                return template.edges, template.read_student_info(first_page)
+
+    with span("extract.layout", mode=mode) as fields:
+        layout = locate_table_layout(first_page) if mode != 'generic' else None
+        fields['found'] = layout is not None
+
+    # Extracting the student info
+    with span("extract.student_info"):
+        if layout is None:
+            if mode != 'generic':
+                logger.info("Schedule table header not found, using generic table extraction")
+            edges = None
+            info_text = first_page.extract_text()
+        else:
+            edges, header_top = layout
+            info_text = first_page.crop((0, 0, first_page.width, header_top)).extract_text() if header_top else ""
+        return edges, parse_student_info(info_text or "")
+
+
+# Streams the course rows of a schedule PDF page by page without holding the document's
+# parsed pages, for exports too large to parse in one go. Rows are the 15 registrar cells.
+def iter_course_rows(pdf_path, mode='anchored', cancel_event=None):
+    import pdfplumber
+    with pdfplumber.open(pdf_path) as pdf:
+        if not pdf.pages:
+            return
+        edges, _ = read_first_page(pdf.pages[0], mode)
+        for rows in iter_page_rows(pdf, edges, cancel_event=cancel_event, pdf_path=pdf_path):
+            yield from rows
+
+
+# Process pool entry point: opens the PDF itself and returns the rows of pages [start, stop)
+def extract_page_range(pdf_path, start, stop, edges=None):
+    import pdfplumber
+    with pdfplumber.open(pdf_path) as pdf:
+        return list(iter_page_rows(pdf, edges, start, stop))
+
+
+def _extract_pages_serial(pdf, pdf_path, edges, progress_callback, cancel_event):
+    page_rows = []
+    total_pages = len(pdf.pages)
+    for i, rows in enumerate(iter_page_rows(pdf, edges, cancel_event=cancel_event, pdf_path=pdf_path)):
+        page_rows.append(rows)
+        if progress_callback is not None:
+            progress_callback(i + 1, total_pages)
+    return page_rows
+
+
+# Splits the document into one contiguous page range per worker and merges in page order
+def _extract_pages_parallel(pdf_path, total_pages, edges, workers, progress_callback, cancel_event):
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    chunk_size = math.ceil(total_pages / workers)
+    ranges = [(start, min(start + chunk_size, total_pages)) for start in range(0, total_pages, chunk_size)]
+    results = {}
+    pages_done = 0
+
+    executor = process_pool(len(ranges))
+    try:
+        pending = {executor.submit(extract_page_range, pdf_path, start, stop, edges): start for start, stop in ranges}
+        while pending:
+            done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            if cancel_event is not None and cancel_event.is_set():
+                raise ExtractionCancelled(pdf_path)
+            for future in done:
+                start = pending.pop(future)
+                results[start] = future.result()
+                pages_done += len(results[start])
+                if progress_callback is not None:
+                    progress_callback(pages_done, total_pages)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    page_rows = []
+    for start, _ in ranges:
+        page_rows.extend(results[start])
+    return page_rows
+
+
+def build_schedule(rows, student_info):
+    stu_id, stu_name, advisor, department, major, semester = student_info
+    return StudentSchedule(
+        student_id=stu_id, student_name=stu_name, advisor=advisor, department=department,
+        major=major, semester=semester, courses=[Course.from_row(row) for row in rows],
+    )
+
+
+# PDF extraction, returns a StudentSchedule or None
+# progress_callback(pages_done, total_pages) is called as pages complete; setting
+# cancel_event aborts the parse with ExtractionCancelled. With workers > 1 large files
+# are split across a process pool, small ones still take the serial path. mode is one of
+# EXTRACTION_MODES; 'anchored' falls back to 'located' for an unknown layout and both fall
+# back to 'generic' when the table header isn't found.
+# Every stage is timed as an 'extract.*' span, the whole parse as 'extract'.
+def extract_from_pdf(pdf_path, progress_callback=None, cancel_event=None, workers=1, mode='anchored'):
+    return extract_with_state(pdf_path, progress_callback, cancel_event, workers, mode, keep_state=False)[0]
+
+
+# extract_from_pdf that also returns the PageState extract_incremental needs to re-parse the
+# file later, as (schedule, state). The page digests are taken as the pages are read, so
+# watching a file costs no second parse.
+def extract_with_state(pdf_path, progress_callback=None, cancel_event=None, workers=1, mode='anchored',
+                       keep_state=True):
+    with span("extract", mode=mode) as fields:
+        schedule, state = _extract_schedule(pdf_path, progress_callback, cancel_event, workers, mode, keep_state)
+        fields['courses'] = len(schedule.courses) if schedule else 0
+        return schedule, state
+
+
+# The PDF stack is imported here rather than at module level so startup never pays for it
+def _extract_schedule(pdf_path, progress_callback, cancel_event, workers, mode, keep_state):
+    if not pdf_path or not os.path.exists(pdf_path):
+        logger.error(f"PDF file not found: {pdf_path}")
+        return None, None
+
+    with span("extract.import"):
+        import pdfplumber
+        from pdfminer.pdfparser import PDFSyntaxError
+        from pdfplumber.utils.exceptions import MalformedPDFException, PdfminerException
+        from concurrent.futures.process import BrokenProcessPool
+
+    try:
+        stat = file_stat(pdf_path)
+        with span("extract.open"):
+            pdf = pdfplumber.open(pdf_path)
+        with pdf:
+            total_pages = len(pdf.pages)
+            if total_pages == 0:
+                logger.error("PDF contains no pages")
+                return None, None
+
+            edges, student_info = read_first_page(pdf.pages[0], mode)
+            digests = [page_content_digest(page) for page in pdf.pages] if keep_state else None
+
+            parallel = workers > 1 and total_pages >= PARALLEL_MIN_PAGES
+            if not parallel:
+                with span("extract.tables", pages=total_pages, workers=1):
+                    page_rows = _extract_pages_serial(pdf, pdf_path, edges, progress_callback, cancel_event)
+
+        if parallel:
+            try:
+                with span("extract.tables", pages=total_pages, workers=min(workers, total_pages)):
+                    page_rows = _extract_pages_parallel(pdf_path, total_pages, edges, min(workers, total_pages),
+                                                        progress_callback, cancel_event)
+            except (BrokenProcessPool, OSError):
+                logger.exception("Process pool extraction failed, falling back to serial")
+                with span("extract.tables", pages=total_pages, workers=1), pdfplumber.open(pdf_path) as pdf:
+                    page_rows = _extract_pages_serial(pdf, pdf_path, edges, progress_callback, cancel_event)
+
+        rows = [row for rows_on_page in page_rows for row in rows_on_page]
+
+        # Validate & return data
+        if not rows and not student_info[1]:
+            logger.warning("No meaningful course data or student name found - PDF may not be a valid schedule")
+            return None, None
+
+        state = PageState(mode, digests, page_rows, edges, student_info, stat) if keep_state else None
+        return build_schedule(rows, student_info), state
+
+    except (PdfminerException, MalformedPDFException, PDFSyntaxError, IOError, OSError):
+        logger.exception("Error reading PDF")
+        return None, None
+
+
+# Digest of a page's content streams: a page whose digest is unchanged draws the same text
+# and rules, so its rows can be reused. Decoding the streams is a small fraction of laying
+# the page out, and pdfminer keeps the decoded data for when the page is parsed after all.
+def page_content_digest(page):
+    from pdfminer.pdftypes import resolve1
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(page.page_obj.mediabox).encode())
+    for stream in page.page_obj.contents:
+        data = resolve1(stream).get_data()
+        digest.update(len(data).to_bytes(8, 'little'))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+# Size and modification time of a file, None if it can't be read
+def file_stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+# Per page results of one parse of a file, kept by extract_incremental for the next one.
+# stat is the file's file_stat from before it was read.
+class PageState:
+    __slots__ = ('mode', 'digests', 'page_rows', 'edges', 'student_info', 'stat')
+
+    def __init__(self, mode, digests, page_rows, edges, student_info, stat=None):
+        self.mode = mode
+        self.digests = digests
+        self.page_rows = page_rows
+        self.edges = edges
+        self.student_info = student_info
+        self.stat = stat
+
+
+# Re-parses a reissued PDF, extracting only the pages whose content digest isn't in the
+# previous PageState; the first page's layout and student info are reused while its digest
+# is unchanged. Pages are matched by digest, so inserted or reordered pages still reuse
+# their rows. Returns (schedule, state, pages_parsed), schedule and state are None on error.
+def extract_incremental(pdf_path, previous=None, cancel_event=None, mode='anchored'):
+    if not pdf_path or not os.path.exists(pdf_path):
+        logger.error(f"PDF file not found: {pdf_path}")
+        return None, None, 0
+
+    import pdfplumber
+    from pdfminer.pdfparser import PDFSyntaxError
+    from pdfplumber.utils.exceptions import MalformedPDFException, PdfminerException
+
+    stat = file_stat(pdf_path)
+    try:
+        with span("extract.incremental", mode=mode) as fields, pdfplumber.open(pdf_path) as pdf:
+            if not pdf.pages:
+                logger.error("PDF contains no pages")
+                return None, None, 0
+            digests = [page_content_digest(page) for page in pdf.pages]
+            if previous is not None and previous.mode == mode and previous.digests[:1] == digests[:1]:
+                edges, student_info = previous.edges, previous.student_info
+                known = dict(zip(previous.digests, previous.page_rows))
+            else:
+                edges, student_info = read_first_page(pdf.pages[0], mode)
+                known = {}
+
+            page_rows = []
+            debug = logger.isEnabledFor(logging.DEBUG)
+            for page, digest in zip(pdf.pages, digests):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ExtractionCancelled(pdf_path)
+                rows = known.get(digest)
+                if rows is None:
+                    try:
+                        rows = extract_page_rows(page, edges)
+                    finally:
+                        page.close()
+                    known[digest] = rows
+                    fields['parsed'] = fields.get('parsed', 0) + 1
+                elif debug:
+                    logger.debug(f"Page {page.page_number} unchanged, reusing {len(rows)} rows")
+                page_rows.append(rows)
+            fields['pages'] = len(digests)
+    except (PdfminerException, MalformedPDFException, PDFSyntaxError, IOError, OSError):
+        logger.exception("Error reading PDF")
+        return None, None, 0
+
+    rows = [row for rows_on_page in page_rows for row in rows_on_page]
+    if not rows and not student_info[1]:
+        logger.warning("No meaningful course data or student name found - PDF may not be a valid schedule")
+        return None, None, fields.get('parsed', 0)
+    state = PageState(mode, digests, page_rows, edges, student_info, stat)
+    return build_schedule(rows, student_info), state, fields.get('parsed', 0)
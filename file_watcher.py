@@ -0,0 +1,106 @@
+import logging
+import os
+
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+
+logger = logging.getLogger(__name__)
+
+DEBOUNCE_MS = 750
+
+
+def _pdf_snapshot(directory):
+    snapshot = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.lower().endswith('.pdf'):
+                    stat = entry.stat()
+                    snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        logger.exception(f"Could not scan watched directory: {directory}")
+    return snapshot
+
+
+# Watches the open schedule file, and optionally a directory, for reissued PDFs.
+# Downloads and editors write a file in several steps, so changes are collected until
+# nothing has changed for debounce_ms; then schedule_changed fires once for the open file
+# if it changed, and once for the newest new or modified PDF in the directory.
+class ScheduleWatcher(QObject):
+    schedule_changed = Signal(str)
+
+    def __init__(self, parent=None, debounce_ms=DEBOUNCE_MS):
+        super().__init__(parent)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.on_file_changed)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self.flush)
+        self.file_path = ""
+        self.directory = ""
+        self.snapshot = {}
+        self.file_changed = False
+        self.directory_changes = set()
+
+    def watch_file(self, path):
+        if self.file_path and self.file_path != path:
+            self.watcher.removePath(self.file_path)
+        self.file_path = path or ""
+        if self.file_path and os.path.exists(self.file_path):
+            self.watcher.addPath(self.file_path)
+
+    def watch_directory(self, directory):
+        if self.directory and self.directory != directory:
+            self.watcher.removePath(self.directory)
+        self.directory = directory or ""
+        self.snapshot = {}
+        if self.directory and os.path.isdir(self.directory):
+            self.snapshot = _pdf_snapshot(self.directory)
+            self.watcher.addPath(self.directory)
+
+    def stop(self):
+        self.timer.stop()
+        paths = self.watcher.files() + self.watcher.directories()
+        if paths:
+            self.watcher.removePaths(paths)
+        self.file_path = ""
+        self.directory = ""
+        self.snapshot = {}
+        self.file_changed = False
+        self.directory_changes.clear()
+
+    def on_file_changed(self, path):
+        if path == self.file_path:
+            self.file_changed = True
+            self.timer.start()
+
+    def on_directory_changed(self, directory):
+        if directory != self.directory:
+            return
+        snapshot = _pdf_snapshot(directory)
+        self.directory_changes.update(path for path, stat in snapshot.items() if self.snapshot.get(path) != stat)
+        self.snapshot = snapshot
+        if self.directory_changes:
+            self.timer.start()
+
+    def flush(self):
+        # A file replaced by a rename drops off the watch list, so it is added back
+        if self.file_path and os.path.exists(self.file_path) and self.file_path not in self.watcher.files():
+            self.watcher.addPath(self.file_path)
+
+        changed = []
+        if self.file_changed and os.path.exists(self.file_path):
+            changed.append(self.file_path)
+        existing = [path for path in self.directory_changes if path in self.snapshot and os.path.exists(path)]
+        if existing:
+            newest = max(existing, key=lambda path: self.snapshot[path][1])
+            if os.path.normcase(os.path.abspath(newest)) != os.path.normcase(os.path.abspath(self.file_path)):
+                changed.append(newest)
+            elif not changed:
+                changed.append(self.file_path)
+        self.file_changed = False
+        self.directory_changes.clear()
+        for path in changed:
+            logger.info(f"Watched schedule changed: {path}")
+            self.schedule_changed.emit(path)
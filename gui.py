@@ -0,0 +1,1305 @@
+import logging
+import os
+import sys
+import threading
+import time
+from PySide6.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QTableView, QVBoxLayout, QLabel,
+    QPushButton, QHeaderView, QHBoxLayout, QMessageBox, QFileDialog, QDialog,
+    QProgressDialog, QMenuBar, QAbstractItemView, QLineEdit, QTableWidget, QTableWidgetItem, QTabBar,
+    QListWidget, QListWidgetItem, QComboBox, QCheckBox
+)
+from PySide6.QtCore import Qt, QThread, Signal, QObject, QEvent, QTimer
+from PySide6.QtGui import QIcon, QFont
+
+from app_config import (
+    get_config_dir, get_icon_path, get_parse_cache, get_search_index, load_last_pdf_path, load_recent_settings,
+    load_watch_settings, save_last_pdf_path, save_search_index, save_watch_settings, store_schedule
+)
+from extraction import (ExtractionCancelled, default_workers, extract_from_pdf, extract_incremental, extract_with_state,
+                        file_stat)
+from file_watcher import ScheduleWatcher
+from instrumentation import LoadProfiler, span, span_log
+from log_config import LOG_FILE
+from models import DAYS, PERIOD_LABELS
+from recent_schedules import RecentSchedules, adjacent_pdf, neighbour_pdfs
+from schedule_view import CourseBlockDelegate, ScheduleTableModel
+from startup_trace import StartupTrace
+
+logger = logging.getLogger(__name__)
+
+
+# Course details dialog
+class CourseDetailsWindow(QDialog):
+    def __init__(self, course, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Course Details')
+        self.setGeometry(700, 400, 400, 300)
+
+        layout = QVBoxLayout(self)
+
+        course_code = QLabel(f"Course Code: {course.code}")
+        course_name = QLabel(f"Course Name: {course.name}")
+        credits_label = QLabel(f"Credits: {course.credits}")
+        section = QLabel(f"Section: {course.section}")
+        activity = QLabel(f"Activity: {course.activity}")
+        building = QLabel(f"Building: {course.building}")
+        room = QLabel(f"Room: {course.room}")
+        staff = QLabel(f"Staff: {course.staff}")
+
+        for label in [course_code, course_name, credits_label, section, activity, building, room, staff]:
+            label.setFont(QFont("Arial", 10))
+            layout.addWidget(label)
+
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        layout.addWidget(close_btn)
+
+
+# Search across every indexed schedule; the index answers as you type
+class SearchDialog(QDialog):
+    COLUMNS = ('Student ID', 'Student', 'Code', 'Course', 'Sec', 'Activity', 'Location', 'Staff')
+    RESULT_LIMIT = 500
+
+    open_requested = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Search Schedules')
+        self.resize(900, 500)
+        self.index = get_search_index()
+        self.index_worker = None
+
+        layout = QVBoxLayout(self)
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("Course code, course name, staff, room or student, e.g. cs 210 saleh")
+        layout.addWidget(self.query_edit)
+
+        self.results = QTableWidget(0, len(self.COLUMNS))
+        self.results.setHorizontalHeaderLabels(self.COLUMNS)
+        self.results.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.results.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.results.verticalHeader().hide()
+        self.results.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.results.horizontalHeader().setStretchLastSection(True)
+        self.results.cellDoubleClicked.connect(self.open_result)
+        layout.addWidget(self.results)
+
+        bottom = QHBoxLayout()
+        self.status_label = QLabel()
+        bottom.addWidget(self.status_label, 1)
+        self.add_folder_btn = QPushButton("Add Folder to Index...")
+        self.add_folder_btn.clicked.connect(self.choose_folder)
+        bottom.addWidget(self.add_folder_btn)
+        layout.addLayout(bottom)
+
+        # Waits for a pause in typing so each keystroke doesn't run its own query
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.run_search)
+        self.query_edit.textChanged.connect(self.search_timer.start)
+        self.hit_files = []
+        self.show_index_size()
+
+    def show_index_size(self):
+        self.status_label.setText(f"{self.index.student_count} students, {len(self.index)} course rows indexed. "
+                                  f"Double-click a result to open that schedule.")
+
+    def run_search(self):
+        query = self.query_edit.text()
+        if not query.strip():
+            self.results.setRowCount(0)
+            self.show_index_size()
+            return
+        start = time.perf_counter()
+        hits, total, students = self.index.search(query, self.RESULT_LIMIT)
+        query_ms = (time.perf_counter() - start) * 1000
+        self.results.setUpdatesEnabled(False)
+        self.results.setRowCount(len(hits))
+        self.hit_files = [hit['file'] for hit in hits]
+        for row, hit in enumerate(hits):
+            values = (hit['student_id'], hit['student_name'], hit['code'], hit['name'], hit['section'],
+                      hit['activity'], " ".join(f"{hit['building']} {hit['room']}".split()),
+                      " ".join(hit['staff'].split()))
+            for column, value in enumerate(values):
+                self.results.setItem(row, column, QTableWidgetItem(value))
+        self.results.setUpdatesEnabled(True)
+        shown = f", showing the best {len(hits)}" if len(hits) < total else ""
+        self.status_label.setText(f"{total} rows for {students} students{shown} ({query_ms:.1f} ms)")
+
+    def open_result(self, row, _column):
+        if 0 <= row < len(self.hit_files):
+            self.open_requested.emit(self.hit_files[row])
+
+    def choose_folder(self):
+        directory = QFileDialog.getExistingDirectory(self, "Select Folder of Schedules")
+        if not directory or self.index_worker is not None:
+            return
+        self.add_folder_btn.setEnabled(False)
+        self.status_label.setText(f"Indexing {directory}...")
+        worker = IndexWorker(directory, self.index, self)
+        worker.progress.connect(lambda done, total: self.status_label.setText(f"Indexing... {done} of {total} files"))
+        worker.indexed.connect(self.on_indexed)
+        worker.finished.connect(worker.deleteLater)
+        self.index_worker = worker
+        worker.start()
+
+    def on_indexed(self, indexed, failed):
+        self.index_worker = None
+        self.add_folder_btn.setEnabled(True)
+        logger.info(f"Indexed {indexed} schedules, {failed} failed")
+        self.run_search()
+        if not self.query_edit.text().strip():
+            self.status_label.setText(f"Indexed {indexed} schedules ({failed} failed). " + self.status_label.text())
+
+    def closeEvent(self, event):
+        if self.index_worker is not None:
+            self.index_worker.wait()
+        super().closeEvent(event)
+
+
+# Plans next semester from a course offerings list: the chosen courses' conflict-free section
+# combinations are ranked by the chosen preference, and picking one shows it in the window
+class PlanDialog(QDialog):
+    RANKINGS = (('Fewest days on campus', 'compact'), ('Fewest gaps', 'no-gaps'), ('Latest starts', 'late'))
+
+    plan_selected = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Plan Sections')
+        self.resize(760, 600)
+        self.offerings = []
+        self.plans = []
+        self.extraction_worker = None
+        self.plan_worker = None
+
+        layout = QVBoxLayout(self)
+        source = QHBoxLayout()
+        self.source_label = QLabel("Open the registrar's course offerings (PDF or CSV) to plan from.")
+        self.source_label.setWordWrap(True)
+        source.addWidget(self.source_label, 1)
+        self.open_btn = QPushButton("Open Offerings...")
+        self.open_btn.clicked.connect(self.choose_offerings)
+        source.addWidget(self.open_btn)
+        layout.addLayout(source)
+
+        self.course_filter = QLineEdit()
+        self.course_filter.setPlaceholderText("Filter courses, then tick the ones to take")
+        self.course_filter.textChanged.connect(self.filter_courses)
+        layout.addWidget(self.course_filter)
+        self.course_list = QListWidget()
+        layout.addWidget(self.course_list, 1)
+
+        limits = QHBoxLayout()
+        limits.addWidget(QLabel("Classes from"))
+        self.earliest_box = QComboBox()
+        self.earliest_box.addItems(PERIOD_LABELS)
+        limits.addWidget(self.earliest_box)
+        limits.addWidget(QLabel("to"))
+        self.latest_box = QComboBox()
+        self.latest_box.addItems(PERIOD_LABELS)
+        self.latest_box.setCurrentIndex(len(PERIOD_LABELS) - 1)
+        limits.addWidget(self.latest_box)
+        limits.addSpacing(12)
+        limits.addWidget(QLabel("Days off:"))
+        self.day_off_boxes = []
+        for day in DAYS:
+            box = QCheckBox(day[:3])
+            self.day_off_boxes.append(box)
+            limits.addWidget(box)
+        limits.addStretch()
+        layout.addLayout(limits)
+
+        ranking = QHBoxLayout()
+        ranking.addWidget(QLabel("Rank by"))
+        self.ranking_box = QComboBox()
+        for label, preset in self.RANKINGS:
+            self.ranking_box.addItem(label, preset)
+        ranking.addWidget(self.ranking_box)
+        ranking.addStretch()
+        self.plan_btn = QPushButton("Find Schedules")
+        self.plan_btn.clicked.connect(self.run_plan)
+        ranking.addWidget(self.plan_btn)
+        layout.addLayout(ranking)
+
+        self.results = QListWidget()
+        self.results.currentRowChanged.connect(self.select_plan)
+        layout.addWidget(self.results, 1)
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+    def choose_offerings(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Select Course Offerings", "",
+                                              "Offerings (*.pdf *.csv);;PDF Files (*.pdf);;CSV Files (*.csv)")
+        if path:
+            self.load_offerings(path)
+
+    # A CSV is read right away; a PDF comes from the parse cache or is parsed on a worker
+    def load_offerings(self, path):
+        from planner import load_offerings
+
+        if self.extraction_worker is not None:
+            self.extraction_worker.cancel()
+            self.extraction_worker = None
+        cached = None if path.lower().endswith('.csv') else get_parse_cache().get(path)
+        if cached is None and not path.lower().endswith('.csv'):
+            worker = ExtractionWorker(path, parent=self)
+            worker.extracted.connect(self.on_offerings_extracted)
+            worker.finished.connect(worker.deleteLater)
+            self.extraction_worker = worker
+            self.source_label.setText(f"Reading {path}...")
+            worker.start()
+            return
+        try:
+            self.set_offerings(path, cached.courses if cached is not None else load_offerings(path))
+        except (OSError, ValueError):
+            logger.exception(f"Could not read offerings {path}")
+            QMessageBox.warning(self, "Plan Sections", f"Could not read course offerings from\n{path}")
+
+    def on_offerings_extracted(self, path, schedule):
+        if self.sender() is not self.extraction_worker:
+            return
+        self.extraction_worker = None
+        if not schedule:
+            self.source_label.setText("Open the registrar's course offerings (PDF or CSV) to plan from.")
+            QMessageBox.warning(self, "Plan Sections", f"No course rows found in\n{path}")
+            return
+        get_parse_cache().put(path, schedule)
+        self.set_offerings(path, schedule.courses)
+
+    def set_offerings(self, path, rows):
+        from planner import course_catalog, unique_offerings
+
+        self.offerings = unique_offerings(rows)
+        self.course_list.clear()
+        for code, name, sections in course_catalog(self.offerings):
+            item = QListWidgetItem(f"{code}  {name}  ({sections} sections)")
+            item.setData(Qt.ItemDataRole.UserRole, code)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Unchecked)
+            self.course_list.addItem(item)
+        self.filter_courses(self.course_filter.text())
+        self.source_label.setText(f"{os.path.basename(path)}: {self.course_list.count()} courses, "
+                                  f"{len(self.offerings)} section rows")
+
+    def filter_courses(self, text):
+        words = text.lower().split()
+        for i in range(self.course_list.count()):
+            item = self.course_list.item(i)
+            item.setHidden(not all(word in item.text().lower() for word in words))
+
+    def chosen_codes(self):
+        return [self.course_list.item(i).data(Qt.ItemDataRole.UserRole) for i in range(self.course_list.count())
+                if self.course_list.item(i).checkState() == Qt.CheckState.Checked]
+
+    def run_plan(self):
+        from planner import Preferences
+
+        codes = self.chosen_codes()
+        if not codes or self.plan_worker is not None:
+            if not codes:
+                self.status_label.setText("Tick the courses to plan first.")
+            return
+        earliest = self.earliest_box.currentIndex() + 1
+        latest = max(earliest, self.latest_box.currentIndex() + 1)
+        free_days = tuple(day for day, box in enumerate(self.day_off_boxes) if box.isChecked())
+        prefs = Preferences.preset(self.ranking_box.currentData(), earliest=earliest, latest=latest,
+                                   free_days=free_days)
+        self.plan_btn.setEnabled(False)
+        self.status_label.setText(f"Planning {len(codes)} courses...")
+        worker = PlanWorker(self.offerings, codes, prefs, self)
+        worker.planned.connect(self.on_planned)
+        worker.finished.connect(worker.deleteLater)
+        self.plan_worker = worker
+        worker.start()
+
+    def on_planned(self, plans, stats, error):
+        self.plan_worker = None
+        self.plan_btn.setEnabled(True)
+        self.plans = plans
+        self.results.clear()
+        if error:
+            self.status_label.setText(error)
+            return
+        for rank, plan in enumerate(plans, start=1):
+            self.results.addItem(f"{rank}. {plan.summary()}")
+        if not plans:
+            self.status_label.setText("No conflict-free combination of these courses fits the limits.")
+            return
+        self.status_label.setText(f"Best {len(plans)} of {stats['complete']} conflict-free combinations found "
+                                  f"in {stats['ms']:.0f} ms. Select one to show it.")
+        self.results.setCurrentRow(0)
+
+    def select_plan(self, row):
+        if 0 <= row < len(self.plans):
+            self.plan_selected.emit(self.plans[row].to_schedule(row + 1))
+
+    def closeEvent(self, event):
+        if self.extraction_worker is not None:
+            self.extraction_worker.cancel()
+            self.extraction_worker.wait()
+        if self.plan_worker is not None:
+            self.plan_worker.wait()
+        super().closeEvent(event)
+
+
+# Runs the section planner off the GUI thread
+class PlanWorker(QThread):
+    planned = Signal(object, object, str)
+
+    def __init__(self, offerings, codes, prefs, parent=None):
+        super().__init__(parent)
+        self.offerings = offerings
+        self.codes = codes
+        self.prefs = prefs
+
+    def run(self):
+        from planner import plan_schedules
+
+        try:
+            plans, stats = plan_schedules(self.offerings, self.codes, self.prefs)
+        except ValueError as exc:
+            self.planned.emit([], {}, str(exc))
+            return
+        self.planned.emit(plans, stats, "")
+
+
+# Parses the PDFs of a folder that aren't indexed yet, or changed since, on a process pool
+# and adds them to the search index
+class IndexWorker(QThread):
+    progress = Signal(int, int)
+    indexed = Signal(int, int)
+
+    def __init__(self, directory, index, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self.index = index
+
+    def run(self):
+        from batch import iter_pdf_files, parse_files
+        from models import StudentSchedule
+
+        indexed = failed = 0
+        try:
+            stale = [path for path in iter_pdf_files(self.directory, recursive=True) if not self.index.is_current(path)]
+            for done, (path, record, error, _) in enumerate(parse_files(stale, default_workers()), 1):
+                if error:
+                    failed += 1
+                    logger.warning(f"Could not index {path}: {error}")
+                else:
+                    self.index.add_schedule(path, StudentSchedule.from_dict(record))
+                    indexed += 1
+                self.progress.emit(done, len(stale))
+            if indexed:
+                self.index.save()
+        except (IOError, OSError):
+            logger.exception(f"Indexing {self.directory} failed")
+        self.indexed.emit(indexed, failed)
+
+
+# Runs extract_from_pdf off the GUI thread and reports back through signals. With keep_state
+# the parse also records the file's PageState, in self.state once extracted is emitted.
+class ExtractionWorker(QThread):
+    page_progress = Signal(int, int)
+    extracted = Signal(str, object)
+    cancelled = Signal(str)
+
+    def __init__(self, pdf_path, profiler=None, parent=None, keep_state=False):
+        super().__init__(parent)
+        self.pdf_path = pdf_path
+        self.profiler = profiler or LoadProfiler()
+        self.cancel_event = threading.Event()
+        self.keep_state = keep_state
+        self.state = None
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            with self.profiler.capture("extract_from_pdf"):
+                result, self.state = extract_with_state(self.pdf_path, self.page_progress.emit, self.cancel_event,
+                                                        workers=default_workers(), keep_state=self.keep_state)
+        except ExtractionCancelled:
+            logger.info(f"PDF extraction cancelled: {self.pdf_path}")
+            self.cancelled.emit(self.pdf_path)
+            return
+        except Exception:
+            # Whatever went wrong, the window waiting on this worker has to hear back
+            logger.exception("PDF extraction failed")
+            result = None
+        self.extracted.emit(self.pdf_path, result)
+
+
+# Re-parses a watched schedule off the GUI thread, reusing the rows of unchanged pages
+class RefreshWorker(QThread):
+    refreshed = Signal(str, object, object, int)
+
+    def __init__(self, pdf_path, previous_state, parent=None):
+        super().__init__(parent)
+        self.pdf_path = pdf_path
+        self.previous_state = previous_state
+
+    def run(self):
+        try:
+            schedule, state, pages_parsed = extract_incremental(self.pdf_path, self.previous_state)
+        except Exception:
+            logger.exception("Schedule refresh failed")
+            schedule, state, pages_parsed = None, None, 0
+        self.refreshed.emit(self.pdf_path, schedule, state, pages_parsed)
+
+
+# Parses the files the user is likely to open next into the parse cache, one at a time
+# and at low priority, so opening one of them is a cache hit
+class PrefetchWorker(QThread):
+    parsed = Signal(str, object)
+
+    def __init__(self, paths, parent=None):
+        super().__init__(parent)
+        self.paths = paths
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        for path in self.paths:
+            if self.cancel_event.is_set():
+                return
+            try:
+                schedule = extract_from_pdf(path, cancel_event=self.cancel_event)
+            except ExtractionCancelled:
+                return
+            except Exception:
+                logger.exception(f"Pre-parsing {path} failed")
+                continue
+            if schedule:
+                self.parsed.emit(path, schedule)
+
+
+# Main Application Window
+class MainWindow(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle('Schedule Manager')
+        self.setGeometry(600, 350, 700, 520)
+
+        icon_path = get_icon_path()
+        if icon_path:
+            self.setWindowIcon(QIcon(icon_path))
+        else:
+            logger.warning("Application is running without icon")
+
+        central = QWidget()
+        self.setCentralWidget(central)
+        layout = QVBoxLayout(central)
+
+        # Student Info Labels
+        self.label1 = QLabel('Student ID: ')
+        self.label2 = QLabel('Student Name: ')
+        self.label3 = QLabel('Advisor: ')
+        self.label4 = QLabel('Department: ')
+        self.label5 = QLabel('Major: ')
+        self.label6 = QLabel('Semester: ')
+        font = QFont("Times New Roman", 11)
+        for labl in [self.label1, self.label2, self.label3, self.label4, self.label5, self.label6]:
+            labl.setFont(font)
+
+        labels_layout = QHBoxLayout()
+        left_labels = QVBoxLayout()
+        right_labels = QVBoxLayout()
+        left_labels.addWidget(self.label2)
+        left_labels.addWidget(self.label1)
+        left_labels.addWidget(self.label3)
+        right_labels.addWidget(self.label4)
+        right_labels.addWidget(self.label5)
+        right_labels.addWidget(self.label6)
+        labels_layout.addLayout(left_labels)
+        labels_layout.addLayout(right_labels)
+        layout.addLayout(labels_layout)
+
+        # Time conflict warning, only shown when two courses share a slot
+        self.conflict_label = QLabel()
+        self.conflict_label.setObjectName("conflictLabel")
+        self.conflict_label.setWordWrap(True)
+        self.conflict_label.hide()
+        layout.addWidget(self.conflict_label)
+
+        # What changed since an earlier version of the schedule, shown while cells are highlighted
+        self.changes_label = QLabel()
+        self.changes_label.setObjectName("changesLabel")
+        self.changes_label.setWordWrap(True)
+        self.changes_label.hide()
+        layout.addWidget(self.changes_label)
+
+        # Recently viewed schedules, one tab each; each keeps its own table model so switching
+        # back to one swaps its model in without parsing or re-indexing anything
+        max_entries, max_bytes, self.prefetch_count = load_recent_settings()
+        self.recent = RecentSchedules(max_entries, max_bytes)
+        self.prefetch_workers = set()
+        self.tab_bar = QTabBar()
+        self.tab_bar.setTabsClosable(True)
+        self.tab_bar.setExpanding(False)
+        self.tab_bar.setDocumentMode(True)
+        self.tab_bar.currentChanged.connect(self.on_tab_selected)
+        self.tab_bar.tabCloseRequested.connect(self.close_tab)
+        self.tab_bar.hide()
+        layout.addWidget(self.tab_bar)
+
+        # The Schedule Table
+        self.schedule_model = ScheduleTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.schedule_model)
+        self.course_delegate = CourseBlockDelegate(self.table)
+        self.course_delegate.details_requested.connect(self.show_course_details)
+        self.table.setItemDelegate(self.course_delegate)
+        self.table.setMouseTracking(True)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        h_header = self.table.horizontalHeader()
+        h_header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        v_header = self.table.verticalHeader()
+        v_header.setMinimumSectionSize(90)
+        v_header.setDefaultSectionSize(90)
+        layout.addWidget(self.table)
+
+        # Load PDF Button
+        btn_layout = QHBoxLayout()
+        load_pdf_btn = QPushButton("📂 Choose Your Schedule File")
+        load_pdf_btn.clicked.connect(self.choose_pdf_file)
+        btn_layout.addStretch()
+        btn_layout.addWidget(load_pdf_btn)
+        layout.addLayout(btn_layout)
+
+        # Menu Bar
+        menubar = self.menuBar()
+        watch_menu = menubar.addMenu('Watch')
+        self.watch_action = watch_menu.addAction('Reload Schedule When It Changes')
+        self.watch_action.setCheckable(True)
+        watch_folder_action = watch_menu.addAction('Watch Folder...')
+        watch_folder_action.triggered.connect(self.choose_watch_dir)
+        self.clear_watch_folder_action = watch_menu.addAction('Stop Watching Folder')
+        self.clear_watch_folder_action.triggered.connect(lambda: self.set_watch_dir(""))
+        export_menu = menubar.addMenu('Export')
+        export_ics_action = export_menu.addAction('Calendar (.ics)...')
+        export_ics_action.triggered.connect(lambda: self.export_schedule('ics'))
+        export_csv_action = export_menu.addAction('Spreadsheet (.csv)...')
+        export_csv_action.triggered.connect(lambda: self.export_schedule('csv'))
+        go_menu = menubar.addMenu('Go')
+        next_action = go_menu.addAction('Next Schedule in Folder')
+        next_action.setShortcut('Alt+Right')
+        next_action.triggered.connect(lambda: self.open_adjacent(1))
+        previous_action = go_menu.addAction('Previous Schedule in Folder')
+        previous_action.setShortcut('Alt+Left')
+        previous_action.triggered.connect(lambda: self.open_adjacent(-1))
+        close_tab_action = go_menu.addAction('Close Tab')
+        close_tab_action.setShortcut('Ctrl+W')
+        close_tab_action.triggered.connect(lambda: self.close_tab(self.tab_bar.currentIndex()))
+        search_menu = menubar.addMenu('Search')
+        search_action = search_menu.addAction('Find in Schedules...')
+        search_action.setShortcut('Ctrl+F')
+        search_action.triggered.connect(self.show_search)
+        plan_menu = menubar.addMenu('Plan')
+        plan_action = plan_menu.addAction('Plan Sections...')
+        plan_action.setShortcut('Ctrl+P')
+        plan_action.triggered.connect(self.show_planner)
+        compare_menu = menubar.addMenu('Compare')
+        compare_action = compare_menu.addAction('Compare With Earlier Version...')
+        compare_action.triggered.connect(self.choose_compare_file)
+        clear_changes_action = compare_menu.addAction('Clear Change Highlights')
+        clear_changes_action.triggered.connect(lambda: self.show_changes(None))
+        help_menu = menubar.addMenu('Help')
+        about_action = help_menu.addAction('About')
+        about_action.triggered.connect(self.show_about)
+
+        self.setStyleSheet("""
+            QWidget {
+                background-color: #1e1e1e;
+                color: white;
+                font-family: 'Segoe UI', Arial, sans-serif;
+            }
+            QHeaderView::section {
+                background-color: #2d2d2d;
+                padding: 6px;
+                border: none;
+                color: white;
+            }
+            QTableView {
+                gridline-color: #444;
+                selection-background-color: #3a86ff;
+                selection-color: white;
+            }
+            QPushButton {
+                background-color: #3a86ff;
+                border: none;
+                border-radius: 8px;
+                padding: 8px 14px;
+                color: white;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #2663d3;
+            }
+            QLabel {
+                color: white;
+            }
+            QLabel#conflictLabel {
+                color: #FF6B6B;
+                font-weight: bold;
+            }
+            QLabel#changesLabel {
+                color: #FFB020;
+                font-weight: bold;
+            }
+        """)
+
+        self.course_window = None
+        self.search_dialog = None
+        self.plan_dialog = None
+        # The planned schedule on show, if any: it has no file, so it is kept out of the recent
+        # schedules and gets a tab of its own
+        self.plan_model = None
+        self.current_courses = None
+        self.extraction_worker = None
+        self.extraction_progress = None
+        self.remember_extracted_path = False
+        self.compare_worker = None
+        self.load_started = None
+        self.load_profiler = LoadProfiler()
+
+        # Opt-in watch mode: reissued schedules are re-parsed page by page and only the
+        # changed cells are updated. Per open tab: the PageState of its last parse, if it was
+        # parsed in this session, and the file_stat of the version on show.
+        self.current_pdf_path = ""
+        self.page_states = {}
+        self.file_stats = {}
+        self.refresh_worker = None
+        self.refresh_pending = False
+        self.watcher = ScheduleWatcher(self)
+        self.watcher.schedule_changed.connect(self.on_watched_schedule_changed)
+        watch_enabled, self.watch_dir = load_watch_settings()
+        self.clear_watch_folder_action.setEnabled(bool(self.watch_dir))
+        self.watch_action.setChecked(watch_enabled)
+        self.watch_action.toggled.connect(self.set_watch_enabled)
+        if watch_enabled:
+            self.watcher.watch_directory(self.watch_dir)
+
+    # Load last used PDF
+    def load_initial_schedule(self):
+        last_pdf_path = load_last_pdf_path()
+        if last_pdf_path and os.path.exists(last_pdf_path):
+            logger.info("Loading last used PDF file")
+            self.load_schedule_file(last_pdf_path)
+            return True
+        return False
+
+    # With a path the schedule gets a table model of its own, kept with it among the recent
+    # schedules; without one the current model is reused
+    def show_schedule(self, schedule, pdf_path=None):
+        if pdf_path is not None:
+            self.set_schedule_model(ScheduleTableModel(self))
+        self.current_courses = schedule
+        self.update_labels(schedule)
+        self.populate_schedule(schedule)
+        if pdf_path is not None:
+            self.release_models(self.recent.put(pdf_path, schedule, self.schedule_model))
+
+    # Shows a recent schedule as it was left: its model goes back into the table
+    def show_recent(self, entry):
+        self.set_schedule_model(entry.model)
+        self.current_courses = entry.schedule
+        self.update_labels(entry.schedule)
+        self.update_conflict_label()
+        self.update_changes_label()
+
+    # A planned schedule replaces the previous plan; showing it leaves the current file
+    def show_plan(self, schedule=None):
+        if self.extraction_worker is not None:
+            self.extraction_worker.cancel()
+            self.finish_extraction()
+        if schedule is not None:
+            old = self.plan_model
+            self.plan_model = ScheduleTableModel(self)
+            self.plan_model.set_schedule(schedule)
+            if old is not None and old is not self.schedule_model:
+                old.deleteLater()
+        self.set_schedule_model(self.plan_model)
+        self.current_courses = self.plan_model.schedule
+        self.update_labels(self.current_courses)
+        self.update_conflict_label()
+        self.update_changes_label()
+        self.set_current_file("")
+
+    def set_schedule_model(self, model):
+        old = self.schedule_model
+        if model is old:
+            return
+        self.schedule_model = model
+        self.table.setModel(model)
+        if not self.recent.holds_model(old) and old is not self.plan_model:
+            old.deleteLater()
+        self.update_table_row_heights()
+
+    def release_models(self, entries):
+        for entry in entries:
+            if entry.model is not self.schedule_model:
+                entry.model.deleteLater()
+
+    # Load a schedule from the recent schedules, the parse cache, or parse it on a worker thread
+    def load_schedule_file(self, pdf_path, remember=False):
+        pdf_path = os.path.abspath(pdf_path)
+        self.load_started = time.perf_counter()
+        self.cancel_prefetch()
+        if self.extraction_worker is not None:
+            self.extraction_worker.cancel()
+            self.finish_extraction()
+
+        entry = self.recent.get(pdf_path)
+        if entry is not None:
+            with span("gui.show_recent", courses=len(entry.schedule.courses)):
+                self.show_recent(entry)
+            self.finish_load("recent", entry.schedule)
+            self.set_current_file(pdf_path)
+            if remember:
+                save_last_pdf_path(pdf_path)
+            self.start_prefetch(pdf_path)
+            return
+
+        with span("gui.parse_cache_get") as fields:
+            cached = get_parse_cache().get(pdf_path)
+            fields['hit'] = cached is not None
+        if cached is not None:
+            logger.info("Loaded schedule from parse cache")
+            with self.load_profiler.capture("show cached schedule"):
+                self.show_schedule(cached, pdf_path)
+            self.finish_load("cache", cached)
+            self.set_current_file(pdf_path)
+            if remember:
+                save_last_pdf_path(pdf_path)
+            self.start_prefetch(pdf_path)
+            return
+
+        worker = ExtractionWorker(pdf_path, self.load_profiler, self, keep_state=self.watch_action.isChecked())
+        worker.page_progress.connect(self.on_extraction_progress)
+        worker.extracted.connect(self.on_extraction_finished)
+        worker.cancelled.connect(self.on_extraction_cancelled)
+        worker.finished.connect(worker.deleteLater)
+
+        progress = QProgressDialog("Extracting schedule data...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("Processing PDF")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        progress.canceled.connect(worker.cancel)
+
+        self.extraction_worker = worker
+        self.extraction_progress = progress
+        self.remember_extracted_path = remember
+        worker.start()
+        progress.show()
+
+    def on_extraction_progress(self, pages_done, total_pages):
+        if self.sender() is not self.extraction_worker or self.extraction_progress is None:
+            return
+        self.extraction_progress.setMaximum(total_pages)
+        self.extraction_progress.setValue(pages_done)
+
+    def finish_extraction(self):
+        if self.extraction_progress is not None:
+            self.extraction_progress.canceled.disconnect()
+            self.extraction_progress.close()
+            self.extraction_progress.deleteLater()
+        self.extraction_progress = None
+        self.extraction_worker = None
+
+    def on_extraction_finished(self, pdf_path, schedule):
+        if self.sender() is not self.extraction_worker:
+            return
+        remember = self.remember_extracted_path
+        state = self.extraction_worker.state
+        self.finish_extraction()
+        if schedule:
+            get_parse_cache().put(pdf_path, schedule)
+            store_schedule(pdf_path, schedule)
+            with self.load_profiler.capture("show schedule"):
+                self.show_schedule(schedule, pdf_path)
+            self.finish_load("pdf", schedule)
+            self.set_current_file(pdf_path, state)
+            if remember:
+                save_last_pdf_path(pdf_path)
+                logger.info("Successfully loaded new PDF file")
+            self.start_prefetch(pdf_path)
+        else:
+            self.finish_load("failed", None)
+            logger.warning(f"Failed to extract data from PDF file: {pdf_path}")
+            QMessageBox.warning(self, "Error",
+                                 "Could not extract data from this PDF file.\nPlease make sure it's a valid Schedule PDF.")
+
+    def on_extraction_cancelled(self, pdf_path):
+        if self.sender() is not self.extraction_worker:
+            return
+        self.finish_extraction()
+
+    # Records how long the whole load took, from picking the file to the filled table
+    def finish_load(self, source, schedule):
+        if self.load_started is not None:
+            span_log.record("gui.load", time.perf_counter() - self.load_started,
+                            {'source': source, 'courses': len(schedule.courses) if schedule else 0})
+            self.load_started = None
+        self.load_profiler.finish()
+
+    def closeEvent(self, event):
+        self.watcher.stop()
+        if self.extraction_worker is not None:
+            self.extraction_worker.cancel()
+            self.extraction_worker.wait()
+        if self.refresh_worker is not None:
+            self.refresh_worker.wait()
+        if self.compare_worker is not None:
+            self.compare_worker.cancel()
+            self.compare_worker.wait()
+        for worker in list(self.prefetch_workers):
+            worker.cancel()
+            worker.wait()
+        if self.search_dialog is not None:
+            self.search_dialog.close()
+        if self.plan_dialog is not None:
+            self.plan_dialog.close()
+        save_search_index()
+        super().closeEvent(event)
+
+    # state is the PageState of a parse that just produced the file's schedule. A schedule
+    # from the parse cache or the recent schedules is the file's current version, unless the
+    # file changed while its tab was in the background; only then is it re-parsed.
+    def set_current_file(self, pdf_path, state=None):
+        self.current_pdf_path = pdf_path
+        if state is not None:
+            self.page_states[pdf_path] = state
+            self.file_stats[pdf_path] = state.stat
+        elif pdf_path and pdf_path not in self.file_stats:
+            self.file_stats[pdf_path] = file_stat(pdf_path)
+        self.sync_tabs()
+        if self.watch_action.isChecked():
+            self.watcher.watch_file(pdf_path)
+            if pdf_path and file_stat(pdf_path) != self.file_stats.get(pdf_path):
+                self.start_refresh()
+
+    def set_watch_enabled(self, enabled):
+        if enabled:
+            self.watcher.watch_directory(self.watch_dir)
+            if self.current_pdf_path:
+                self.set_current_file(self.current_pdf_path)
+            logger.info("Watch mode enabled")
+        else:
+            self.watcher.stop()
+            logger.info("Watch mode disabled")
+        save_watch_settings(enabled, self.watch_dir)
+
+    def choose_watch_dir(self):
+        directory = QFileDialog.getExistingDirectory(self, "Select Folder to Watch", self.watch_dir)
+        if directory:
+            self.set_watch_dir(directory)
+            self.watch_action.setChecked(True)
+
+    def set_watch_dir(self, directory):
+        self.watch_dir = directory
+        self.clear_watch_folder_action.setEnabled(bool(directory))
+        if self.watch_action.isChecked():
+            self.watcher.watch_directory(directory)
+        save_watch_settings(self.watch_action.isChecked(), directory)
+
+    # The open file was rewritten: refresh it in place. Any other PDF comes from the
+    # watched folder and is opened like a newly chosen file.
+    def on_watched_schedule_changed(self, pdf_path):
+        if pdf_path != self.current_pdf_path:
+            logger.info(f"New schedule in watched folder: {pdf_path}")
+            self.load_schedule_file(pdf_path, remember=True)
+            return
+        self.start_refresh()
+
+    # Re-parses the open file unless its size and modification time are those of the version
+    # on show. Without a PageState from this session every page is parsed.
+    def start_refresh(self):
+        if self.refresh_worker is not None:
+            self.refresh_pending = True
+            return
+        self.refresh_pending = False
+        pdf_path = self.current_pdf_path
+        if file_stat(pdf_path) == self.file_stats.get(pdf_path):
+            logger.debug(f"Watched schedule unchanged on disk: {pdf_path}")
+            return
+        worker = RefreshWorker(pdf_path, self.page_states.get(pdf_path), self)
+        worker.refreshed.connect(self.on_refresh_finished)
+        worker.finished.connect(worker.deleteLater)
+        self.refresh_worker = worker
+        worker.start()
+
+    def on_refresh_finished(self, pdf_path, schedule, state, pages_parsed):
+        self.refresh_worker = None
+        if pdf_path == self.current_pdf_path and schedule is not None:
+            self.page_states[pdf_path] = state
+            self.file_stats[pdf_path] = state.stat
+            get_parse_cache().put(pdf_path, schedule)
+            with span("gui.refresh_schedule", pages=len(state.digests), pages_parsed=pages_parsed) as fields:
+                previous = self.current_courses
+                self.current_courses = schedule
+                self.update_labels(schedule)
+                changed = self.schedule_model.update_schedule(schedule)
+                self.update_conflict_label()
+                fields['cells_changed'] = len(changed)
+            # A reissue that moved anything is highlighted against the version it replaced
+            if changed and previous is not None:
+                self.show_changes(previous, "the previous version")
+            self.recent.update(pdf_path, schedule)
+            self.sync_tabs()
+            if changed:
+                store_schedule(pdf_path, schedule)
+            logger.info(f"Refreshed {pdf_path}: {pages_parsed} of {len(state.digests)} pages re-parsed, "
+                         f"{len(changed)} cells changed")
+        elif schedule is None:
+            logger.warning(f"Could not re-parse watched schedule: {pdf_path}")
+        if self.refresh_pending and self.current_pdf_path:
+            self.start_refresh()
+
+    # One tab per recent schedule in the order they were first opened, plus one for the plan
+    # with an empty path; tabs of schedules that dropped out of the recent schedules go away
+    def sync_tabs(self):
+        bar = self.tab_bar
+        bar.blockSignals(True)
+        try:
+            for i in reversed(range(bar.count())):
+                path = bar.tabData(i)
+                if path not in self.recent and (path or self.plan_model is None):
+                    bar.removeTab(i)
+            for states in (self.page_states, self.file_stats):
+                for path in [path for path in states if path not in self.recent]:
+                    del states[path]
+            shown = {bar.tabData(i) for i in range(bar.count())}
+            for path in self.recent.paths():
+                if path not in shown:
+                    i = bar.addTab("")
+                    bar.setTabData(i, path)
+                    bar.setTabToolTip(i, path)
+            if self.plan_model is not None and "" not in shown:
+                i = bar.addTab("")
+                bar.setTabData(i, "")
+                bar.setTabToolTip(i, "Planned schedule, not saved")
+            for i in range(bar.count()):
+                path = bar.tabData(i)
+                schedule = self.recent.peek(path).schedule if path else self.plan_model.schedule
+                bar.setTabText(i, schedule.student_name or os.path.basename(path))
+                if path == self.current_pdf_path:
+                    bar.setCurrentIndex(i)
+        finally:
+            bar.blockSignals(False)
+        bar.setVisible(bar.count() > 0)
+
+    def on_tab_selected(self, index):
+        path = self.tab_bar.tabData(index)
+        if path == "" and self.current_pdf_path:
+            self.show_plan()
+        elif path and path != self.current_pdf_path:
+            self.load_schedule_file(path, remember=True)
+
+    def close_tab(self, index):
+        path = self.tab_bar.tabData(index)
+        if path is None or self.tab_bar.count() <= 1:
+            return
+        if path == self.current_pdf_path:
+            self.tab_bar.setCurrentIndex(index + 1 if index + 1 < self.tab_bar.count() else index - 1)
+        if path:
+            entry = self.recent.remove(path)
+            if entry is not None:
+                self.release_models([entry])
+        else:
+            model, self.plan_model = self.plan_model, None
+            if model is not self.schedule_model:
+                model.deleteLater()
+        self.sync_tabs()
+
+    def open_adjacent(self, step):
+        if self.current_pdf_path:
+            path = adjacent_pdf(self.current_pdf_path, step)
+            if path:
+                self.load_schedule_file(path, remember=True)
+
+    # Pre-parses the files next to the one just opened unless they're already cached
+    def start_prefetch(self, pdf_path):
+        if self.prefetch_count <= 0:
+            return
+        cache = get_parse_cache()
+        paths = [path for path in neighbour_pdfs(pdf_path, self.prefetch_count)
+                 if path not in self.recent and not cache.has(path)]
+        if not paths:
+            return
+        worker = PrefetchWorker(paths, self)
+        worker.parsed.connect(self.on_prefetched)
+        worker.finished.connect(lambda: self.prefetch_workers.discard(worker))
+        worker.finished.connect(worker.deleteLater)
+        self.prefetch_workers.add(worker)
+        worker.start(QThread.Priority.LowPriority)
+
+    # A file opened for real takes the CPU; what was pre-parsed so far is kept
+    def cancel_prefetch(self):
+        for worker in self.prefetch_workers:
+            worker.cancel()
+
+    def on_prefetched(self, pdf_path, schedule):
+        get_parse_cache().put(pdf_path, schedule)
+        store_schedule(pdf_path, schedule)
+        logger.info(f"Pre-parsed {pdf_path}")
+
+    # Update th student info labels
+    def update_labels(self, schedule):
+        with span("gui.update_labels"):
+            self.label1.setText(f'Student ID: {schedule.student_id}')
+            self.label2.setText(f'Student Name: {schedule.student_name}')
+            self.label3.setText(f'Advisor: {schedule.advisor}')
+            self.label4.setText(f'Department: {schedule.department}')
+            self.label5.setText(f'Major: {schedule.major}')
+            self.label6.setText(f'Semester: {schedule.semester}')
+
+    # Filling the schedule table
+    def populate_schedule(self, schedule):
+        with span("gui.populate_schedule", courses=len(schedule.courses)):
+            self.schedule_model.set_schedule(schedule)
+            self.update_conflict_label()
+            self.update_changes_label()
+        logger.info("Schedule populated successfully")
+
+    # Lists every group of clashing courses with the slots they share
+    def update_conflict_label(self):
+        model = self.schedule_model
+        clashes = {}
+        for (row, column), indexes in sorted(model.conflicts.items(), key=lambda item: (item[0][1], item[0][0])):
+            codes = " / ".join(model.schedule.courses[i].code for i in indexes)
+            clashes.setdefault(codes, []).append(f"{DAYS[column]} {PERIOD_LABELS[row]}")
+        if not clashes:
+            self.conflict_label.hide()
+            return
+        summary = "; ".join(f"{codes} ({', '.join(slots)})" for codes, slots in clashes.items())
+        text = f"⚠ Time conflicts: {summary}"
+        # A refresh that leaves the clashes as they were doesn't log them again. The warning
+        # only counts them: a synthetic or cohort-sized schedule can clash in hundreds of slots.
+        if text != self.conflict_label.text() or self.conflict_label.isHidden():
+            logger.warning(f"Schedule has {len(clashes)} groups of clashing courses in {len(model.conflicts)} slots")
+            logger.debug(f"Time conflicts: {summary}")
+        self.conflict_label.setText(text)
+        self.conflict_label.show()
+
+    def choose_compare_file(self):
+        if self.current_courses is None:
+            QMessageBox.information(self, "Compare", "Open a schedule first, then pick its earlier version.")
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Select Earlier Version", os.path.dirname(self.current_pdf_path),
+                                              "PDF Files (*.pdf)")
+        if path:
+            self.compare_with_file(path)
+
+    # The earlier version comes from the parse cache or is parsed on a worker thread
+    def compare_with_file(self, path):
+        if self.compare_worker is not None:
+            self.compare_worker.cancel()
+            self.compare_worker = None
+        cached = get_parse_cache().get(path)
+        if cached is not None:
+            self.compare_with(cached, path)
+            return
+        worker = ExtractionWorker(path, parent=self)
+        worker.extracted.connect(self.on_compare_extracted)
+        worker.finished.connect(worker.deleteLater)
+        self.compare_worker = worker
+        self.changes_label.setText(f"Reading {os.path.basename(path)}...")
+        self.changes_label.show()
+        worker.start()
+
+    def on_compare_extracted(self, path, schedule):
+        if self.sender() is not self.compare_worker:
+            return
+        self.compare_worker = None
+        if not schedule:
+            self.update_changes_label()
+            QMessageBox.warning(self, "Compare", f"Could not extract data from\n{path}")
+            return
+        get_parse_cache().put(path, schedule)
+        self.compare_with(schedule, path)
+
+    def compare_with(self, earlier, path):
+        if not self.show_changes(earlier, os.path.basename(path)):
+            QMessageBox.information(self, "Compare", f"No changes since {os.path.basename(path)}.")
+
+    # Highlights what changed from an earlier version to the schedule on show and returns the
+    # changes; None clears the highlights
+    def show_changes(self, earlier, source=""):
+        from schedule_diff import change_summary, changed_cells, diff_schedules
+
+        model = self.schedule_model
+        changes = []
+        if earlier is not None and model.schedule is not None:
+            changes = diff_schedules(earlier, model.schedule)
+        summary = f"Changes since {source}: {change_summary(changes)}" if changes else ""
+        model.set_changes(changed_cells(changes), summary)
+        if changes:
+            logger.info(summary)
+        self.update_changes_label()
+        return changes
+
+    def update_changes_label(self):
+        summary = self.schedule_model.change_summary
+        self.changes_label.setText(summary)
+        self.changes_label.setVisible(bool(summary))
+
+    # course details dialog
+    def show_course_details(self, course):
+        try:
+            if self.course_window and self.course_window.isVisible():
+                self.course_window.close()
+            self.course_window = CourseDetailsWindow(course, self)
+            self.course_window.show()
+        except (AttributeError, TypeError):
+            logger.exception("Error showing course details")
+            QMessageBox.critical(self, "Error", "Failed to show course details (see log).")
+
+    def show_search(self):
+        if self.search_dialog is None:
+            self.search_dialog = SearchDialog(self)
+            self.search_dialog.open_requested.connect(lambda path: self.load_schedule_file(path, remember=True))
+        self.search_dialog.show()
+        self.search_dialog.raise_()
+        self.search_dialog.query_edit.setFocus()
+
+    def show_planner(self):
+        if self.plan_dialog is None:
+            self.plan_dialog = PlanDialog(self)
+            self.plan_dialog.plan_selected.connect(self.show_plan)
+        self.plan_dialog.show()
+        self.plan_dialog.raise_()
+
+    def changeEvent(self, event):
+        if event.type() == event.Type.WindowStateChange:
+            self.update_table_row_heights()
+        super().changeEvent(event)
+
+    def update_table_row_heights(self):
+        try:
+            v_header = self.table.verticalHeader()
+            if self.isMaximized():
+                v_header.setSectionResizeMode(QHeaderView.ResizeMode.Custom)
+                for row in range(self.schedule_model.rowCount()):
+                    self.table.setRowHeight(row, 120)
+            else:
+                v_header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        except AttributeError:
+            logger.exception("Error updating table row heights")
+
+    # Handling the PDF selection
+    def choose_pdf_file(self):
+        try:
+            selected_file_path, _ = QFileDialog.getOpenFileName(self, "Select Schedule PDF", "", "PDF Files (*.pdf)")
+            if selected_file_path:
+                self.load_schedule_file(selected_file_path, remember=True)
+        except (ValueError, TypeError, OSError):
+            logger.exception("Error in choose_pdf_file")
+            QMessageBox.critical(self, "Error", "An unexpected error occurred while choosing the PDF file.")
+
+    # Writes the shown schedule as an iCalendar file or CSV, with the period times and term
+    # dates from config.json
+    def export_schedule(self, fmt):
+        schedule = self.schedule_model.schedule
+        if schedule is None:
+            QMessageBox.information(self, "Export", "Load a schedule first.")
+            return
+        from export import calendar_settings, export_schedule
+
+        base = os.path.splitext(self.current_pdf_path)[0] if self.current_pdf_path else "schedule"
+        file_filter = "iCalendar Files (*.ics)" if fmt == 'ics' else "CSV Files (*.csv)"
+        path, _ = QFileDialog.getSaveFileName(self, "Export Schedule", f"{base}.{fmt}", file_filter)
+        if not path:
+            return
+        if not path.lower().endswith(f".{fmt}"):
+            path += f".{fmt}"
+        try:
+            with span("gui.export", format=fmt, courses=len(schedule.courses)):
+                export_schedule(path, schedule, calendar_settings())
+            logger.info(f"Exported schedule to {path}")
+        except (OSError, ValueError):
+            logger.exception("Schedule export failed")
+            QMessageBox.critical(self, "Error", "Failed to export the schedule (see log).")
+
+    def show_about(self):
+        dlg = AboutDialog(self)
+        dlg.exec()
+
+
+class AboutDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("About Schedule Manager")
+        self.setFixedSize(300, 200)
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Schedule Manager"))
+        layout.addWidget(QLabel("Version 1.0.0"))
+        layout.addWidget(QLabel("University Schedule Management App"))
+        layout.addWidget(QLabel("© 2025 Juad Al-Mrhoon"))
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        layout.addWidget(close_btn)
+
+
+# Marks the first paint of the schedule table in the startup trace, then prints the report
+# when --startup-trace is on
+class FirstPaintProbe(QObject):
+    def __init__(self, trace, parent=None):
+        super().__init__(parent)
+        self.trace = trace
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint:
+            watched.removeEventFilter(self)
+            self.trace.mark("first paint of schedule table")
+            QTimer.singleShot(0, self.trace.report)
+        return False
+
+
+# GUI entry point
+def run_gui(trace=None, profiler=None):
+    trace = trace or StartupTrace()
+    try:
+        with trace.span("create QApplication"):
+            app = QApplication(sys.argv)
+            app.setApplicationName("Schedule Manager")
+            app.setApplicationVersion("1.0.0")
+            app.setOrganizationName("Jawad")
+
+        logger.info("Schedule Manager application starting...")
+
+        with trace.span("build main window"):
+            window = MainWindow()
+        if profiler is not None:
+            window.load_profiler = profiler
+        window.first_paint_probe = FirstPaintProbe(trace, window)
+        window.table.viewport().installEventFilter(window.first_paint_probe)
+        with trace.span("show main window"):
+            window.show()
+        logger.info("Application window shown successfully")
+
+        with trace.span("load initial schedule"):
+            has_schedule = window.load_initial_schedule()
+        if not has_schedule:
+            logger.info("No previous schedule found, prompting for PDF file")
+            default_file_path, _ = QFileDialog.getOpenFileName(None, "Select Schedule PDF", "", "PDF Files (*.pdf)")
+            if default_file_path:
+                window.load_schedule_file(default_file_path, remember=True)
+
+        return app.exec()
+    except (SystemExit, KeyboardInterrupt):
+        return 0
+    except (ValueError, TypeError, RuntimeError):
+        logger.exception("Application failed to start")
+        QMessageBox.critical(None, "Fatal Error",
+                             "The application encountered a fatal error and must close.\n"
+                             f"See {os.path.join(get_config_dir(), LOG_FILE)} for details.")
+        return 1
@@ -0,0 +1,170 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+SPAN_LOG_FILE = 'schedule_timings.jsonl'
+SPAN_LOG_MAX_BYTES = 1024 * 1024
+SPAN_LOG_BACKUP_COUNT = 3
+PROFILE_REPORT_FILE = 'schedule_profile.txt'
+
+
+# Timed spans written as JSON lines, one record per span with its duration and whatever
+# counts the caller attached. Per span totals are appended when the log is closed.
+# Nothing is written until configure() names a file. Like the app log, lines are queued
+# and written by a listener thread to a file that rotates by size, so a span never waits
+# on the disk; the file is opened on the first span.
+class SpanLog:
+    def __init__(self):
+        self.path = None
+        self.queue = None
+        self.listener = None
+        self.handler = None
+        self.totals = {}
+        self.lock = threading.Lock()
+
+    def configure(self, path, max_bytes=SPAN_LOG_MAX_BYTES, backup_count=SPAN_LOG_BACKUP_COUNT):
+        self.close()
+        try:
+            self.handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+        except OSError:
+            logger.exception(f"Could not open span log {path}")
+            return
+        self.handler.setFormatter(logging.Formatter('%(message)s'))
+        self.queue = queue.SimpleQueue()
+        self.listener = logging.handlers.QueueListener(self.queue, self.handler)
+        self.listener.start()
+        self.path = path
+
+    @contextmanager
+    def span(self, name, **fields):
+        begin = time.perf_counter()
+        try:
+            yield fields
+        except BaseException as exc:
+            fields['error'] = type(exc).__name__
+            raise
+        finally:
+            self.record(name, time.perf_counter() - begin, fields)
+
+    def record(self, name, seconds, fields=None):
+        ms = seconds * 1000
+        with self.lock:
+            count, total, longest = self.totals.get(name, (0, 0.0, 0.0))
+            self.totals[name] = (count + 1, total + ms, max(longest, ms))
+            if self.path is None:
+                return
+            entry = {'ts': round(time.time(), 3), 'span': name, 'ms': round(ms, 3),
+                     'thread': threading.current_thread().name}
+            if fields:
+                entry.update(fields)
+            self.write(entry)
+
+    def write(self, entry):
+        try:
+            line = json.dumps(entry)
+        except (TypeError, ValueError):
+            logger.exception("Could not write timing span")
+            return
+        self.queue.put(logging.makeLogRecord({'msg': line, 'levelno': logging.INFO, 'levelname': 'INFO'}))
+
+    def close(self):
+        with self.lock:
+            if self.path is not None and self.totals:
+                for name, (count, total, longest) in self.totals.items():
+                    self.write({'ts': round(time.time(), 3), 'summary': name, 'count': count,
+                                'total_ms': round(total, 3), 'max_ms': round(longest, 3)})
+            self.totals = {}
+            if self.listener is not None:
+                self.listener.stop()
+                self.handler.close()
+            self.path = self.queue = self.listener = self.handler = None
+
+
+span_log = SpanLog()
+span = span_log.span
+
+
+# Spans are only written to a file when asked for, with --startup-trace or --profile-load
+# or "span_log": true in config.json; the file lives in the config directory
+def configure_span_log(enabled=False):
+    from app_config import get_config_dir, load_config
+
+    if enabled or load_config().get('span_log') is True:
+        span_log.configure(os.path.join(get_config_dir(), SPAN_LOG_FILE))
+
+
+# Opt-in cProfile and tracemalloc capture of a single schedule load. Every captured section
+# (extraction on the worker thread, then building the view) is appended to a text report
+# with its top functions by cumulative time and top allocation sites, and the raw profile
+# is dumped next to it for pstats or snakeviz. Does nothing unless enabled; the profiling
+# modules are only imported once a capture starts. The report goes to the config directory
+# unless report_path names a file.
+class LoadProfiler:
+    def __init__(self, enabled=False, report_path=None, limit=30):
+        self.enabled = enabled
+        self.report_path = report_path
+        self.limit = limit
+        self.sections = 0
+
+    @contextmanager
+    def capture(self, label):
+        if not self.enabled:
+            yield
+            return
+        import cProfile
+        import tracemalloc
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        else:
+            tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        begin = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - begin
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+            self.write_section(label, elapsed, peak, profiler, snapshot)
+
+    def write_section(self, label, elapsed, peak, profiler, snapshot):
+        import pstats
+
+        if self.report_path is None:
+            from app_config import get_config_dir
+            self.report_path = os.path.join(get_config_dir(), PROFILE_REPORT_FILE)
+        base, _ = os.path.splitext(self.report_path)
+        dump_path = f"{base}-{self.sections + 1}.prof"
+        try:
+            profiler.dump_stats(dump_path)
+            with open(self.report_path, 'w' if self.sections == 0 else 'a', encoding='utf-8') as f:
+                f.write(f"== {label}: {elapsed * 1000:.1f} ms wall, peak traced memory "
+                        f"{peak / (1024 * 1024):.2f} MB (raw profile: {dump_path})\n\n")
+                pstats.Stats(profiler, stream=f).sort_stats('cumulative').print_stats(self.limit)
+                f.write("Top allocation sites:\n")
+                for stat in snapshot.statistics('lineno')[:15]:
+                    f.write(f"  {stat}\n")
+                f.write("\n")
+        except OSError:
+            logger.exception("Could not write load profile")
+        self.sections += 1
+
+    # Stops capturing once the load being profiled has been shown
+    def finish(self):
+        if self.enabled:
+            self.enabled = False
+            logger.info(f"Load profile written to {self.report_path}")
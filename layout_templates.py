@@ -0,0 +1,277 @@
+import json
+import logging
+import os
+
+from extraction import cluster_positions, locate_table_layout
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_FILE = "layout_templates.json"
+
+# Student info labels in reading order; fields mapped to None are skipped
+INFO_LABELS = [
+    (('Student', 'Name'), 'name'), (('Department',), 'department'), (('Classification',), None),
+    (('Student', 'ID'), 'id'), (('Major',), 'major'), (('Stream',), None),
+    (('Advisor', 'Name'), 'advisor'), (('Semester',), 'semester'),
+]
+# Order of the fields in the tuple parse_student_info returns
+INFO_FIELDS = ('id', 'name', 'advisor', 'department', 'major', 'semester')
+
+# How far a page may be from a template and still match it, in points
+RULE_TOLERANCE = 1.5
+SIZE_TOLERANCE = 1.0
+
+# The registrar's schedule report, measured from its PDFs. The student info block moves
+# down when the report has an extra title line, so its lines are found from the label
+# column at label_x rather than stored as absolute positions.
+KNOWN_TEMPLATES = [
+    {
+        'name': 'registrar',
+        'page_size': [842.04, 594.96],
+        'rules': [20.5, 70.0, 111.0, 199.9, 240.0, 270.0, 289.0, 300.0, 336.0, 373.0, 378.0, 433.0, 468.7,
+                  505.0, 542.0, 556.0, 578.0, 614.0, 645.1, 689.0, 734.0, 747.1, 822.4],
+        'label_font': 'Arial-BoldMT',
+        'label_x': 36.4,
+        'edges': [19.9, 70.0, 240.0, 270.0, 300.0, 336.0, 372.9, 433.0, 469.0, 505.0, 541.9, 578.0, 614.0,
+                  689.0, 747.1, 822.0],
+        'fields': {
+            'name': [0, 105.5, 348.3], 'department': [0, 406.2, 611.4],
+            'id': [1, 88.9, 348.3], 'major': [1, 379.1, 611.4],
+            'advisor': [2, 104.0, 348.3], 'semester': [2, 397.0, 842.04],
+        },
+    },
+]
+
+
+def _font_name(fontname):
+    # Embedded fonts are subset-tagged ('BCDFEE+Arial-BoldMT'), the tag differs per file
+    return fontname.split('+', 1)[-1]
+
+
+# What a template is recognised by: the page size, the x positions of every vertical rule on
+# the first page and the fonts used. Only the rules and the character list are needed, both
+# of which the page has parsed anyway, so matching costs far less than locating the header.
+class PageSignature:
+    __slots__ = ('size', 'rules', 'fonts')
+
+    def __init__(self, page):
+        self.size = (page.width, page.height)
+        self.rules = cluster_positions(edge['x0'] for edge in page.vertical_edges)
+        self.fonts = {_font_name(char['fontname']) for char in page.chars}
+
+
+# One known registrar layout: fixed column edges for the course table, and the student info
+# fields as (info line, x0, x1) boxes, info lines being the rows of the label column
+class LayoutTemplate:
+    __slots__ = ('name', 'page_size', 'rules', 'label_font', 'label_x', 'edges', 'fields')
+
+    def __init__(self, name, page_size, rules, label_font, label_x, edges, fields):
+        self.name = name
+        self.page_size = page_size
+        self.rules = rules
+        self.label_font = label_font
+        self.label_x = label_x
+        self.edges = edges
+        self.fields = fields
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['name'], tuple(data['page_size']), list(data['rules']), data['label_font'],
+                   data['label_x'], list(data['edges']), {key: tuple(box) for key, box in data['fields'].items()})
+
+    def to_dict(self):
+        return {
+            'name': self.name, 'page_size': list(self.page_size), 'rules': self.rules,
+            'label_font': self.label_font, 'label_x': self.label_x, 'edges': self.edges,
+            'fields': {key: list(box) for key, box in self.fields.items()},
+        }
+
+    def matches(self, signature):
+        if any(abs(a - b) > SIZE_TOLERANCE for a, b in zip(self.page_size, signature.size)):
+            return False
+        if len(self.rules) != len(signature.rules):
+            return False
+        if any(abs(a - b) > RULE_TOLERANCE for a, b in zip(self.rules, signature.rules)):
+            return False
+        return self.label_font in signature.fonts
+
+    # Student info in parse_student_info's order, read straight from the characters in
+    # each field's box instead of extracting and splitting the text of the info block
+    def read_student_info(self, page):
+        from pdfplumber.utils import extract_text
+
+        # The info block is the first thing on the page, so its lines are the topmost ones
+        # starting with a label character
+        line_count = max(line for line, _, _ in self.fields.values()) + 1
+        line_tops = cluster_positions(
+            char['top'] for char in page.chars
+            if abs(char['x0'] - self.label_x) <= RULE_TOLERANCE and char['text'].strip()
+            and _font_name(char['fontname']) == self.label_font
+        )[:line_count]
+        bottom = line_tops[-1] + 3 if line_tops else 0
+        values = dict.fromkeys(INFO_FIELDS, "")
+        boxes = {key: box for key, box in self.fields.items() if box[0] < len(line_tops)}
+        chars = {key: [] for key in boxes}
+        for char in page.chars:
+            if char['top'] > bottom:
+                continue
+            h_mid = (char['x0'] + char['x1']) / 2
+            for key, (line, x0, x1) in boxes.items():
+                if x0 <= h_mid < x1 and abs(char['top'] - line_tops[line]) <= 3:
+                    chars[key].append(char)
+                    break
+        for key, field_chars in chars.items():
+            values[key] = extract_text(field_chars).strip()
+        return tuple(values[key] for key in INFO_FIELDS)
+
+
+_templates = None
+
+
+def _templates_path():
+    from app_config import get_config_dir
+    return os.path.join(get_config_dir(), TEMPLATES_FILE)
+
+
+# The built-in templates followed by any learned ones in the config directory
+def load_templates():
+    global _templates
+    if _templates is None:
+        _templates = [LayoutTemplate.from_dict(data) for data in KNOWN_TEMPLATES]
+        path = _templates_path()
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    _templates.extend(LayoutTemplate.from_dict(data) for data in json.load(f))
+            except (json.JSONDecodeError, IOError, OSError, KeyError, TypeError):
+                logger.exception("Ignoring unreadable layout templates file")
+    return _templates
+
+
+# Hash of the learned templates file. It is part of the parse caches' and the search index's
+# version, so learning or changing a template drops the results parsed without it.
+def templates_fingerprint():
+    from parse_cache import file_digest
+
+    try:
+        return file_digest(_templates_path())[:16]
+    except FileNotFoundError:
+        return "builtin"
+    except OSError:
+        logger.exception("Could not read the layout templates file")
+        return "unreadable"
+
+
+# Adds a template to this process only, e.g. one learned from a sample file
+def register_template(template):
+    load_templates().append(template)
+
+
+# Learned templates are appended to the file in the config directory
+def save_template(template):
+    path = _templates_path()
+    learned = []
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            learned = [data for data in json.load(f) if data.get('name') != template.name]
+    learned.append(template.to_dict())
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(learned, f, indent=2)
+    global _templates
+    _templates = None
+    from app_config import reset_parse_caches
+    reset_parse_caches()
+
+
+def match_template(page):
+    templates = load_templates()
+    if not templates:
+        return None
+    signature = PageSignature(page)
+    return next((template for template in templates if template.matches(signature)), None)
+
+
+# Builds a template from the first page of a sample PDF: the column edges from its table
+# header and a box per info field, from the end of the field's label to the next label
+def learn_template(page, name):
+    layout = locate_table_layout(page)
+    if layout is None:
+        return None
+    edges, header_top = layout
+    words = page.crop((0, 0, page.width, header_top)).extract_words(extra_attrs=['fontname'])
+    lines = []
+    for word in sorted(words, key=lambda w: (w['top'], w['x0'])):
+        if lines and abs(word['top'] - lines[-1][0]['top']) <= 2:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+
+    fields = {}
+    label_x = label_font = None
+    line_index = 0
+    for line in lines:
+        texts = [w['text'] for w in line]
+        found = []
+        for label, key in INFO_LABELS:
+            n = len(label)
+            for i in range(len(line) - n):
+                if tuple(texts[i:i + n]) == label and texts[i + n] == ':':
+                    found.append((line[i], line[i + n], key))
+                    break
+        if not found:
+            continue
+        found.sort(key=lambda item: item[0]['x0'])
+        if label_x is None:
+            label_x = round(found[0][0]['x0'], 1)
+            label_font = _font_name(found[0][0]['fontname'])
+        for i, (_, colon, key) in enumerate(found):
+            if key is not None:
+                x1 = found[i + 1][0]['x0'] if i + 1 < len(found) else page.width
+                fields[key] = (line_index, round(colon['x1'], 1), round(x1, 1))
+        line_index += 1
+    if label_x is None:
+        return None
+
+    signature = PageSignature(page)
+    return LayoutTemplate(name, tuple(round(v, 2) for v in signature.size), [round(x, 1) for x in signature.rules],
+                          label_font, label_x, [round(x, 1) for x in edges], fields)
+
+
+def build_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='schedule.py templates',
+                                     description='Check which layout template schedule PDFs match, or learn a new one.')
+    parser.add_argument('paths', nargs='+', help='schedule PDFs')
+    parser.add_argument('--learn', metavar='NAME',
+                        help='learn the layout of the first PDF as template NAME and save it in the config directory')
+    return parser
+
+
+def templates_main(argv):
+    import sys
+    import pdfplumber
+
+    args = build_parser().parse_args(argv)
+    for path in args.paths:
+        try:
+            with pdfplumber.open(path) as pdf:
+                if not pdf.pages:
+                    print(f"{path}: no pages", file=sys.stderr)
+                    continue
+                page = pdf.pages[0]
+                if args.learn:
+                    template = learn_template(page, args.learn)
+                    if template is None:
+                        print(f"{path}: no schedule table header or student info found", file=sys.stderr)
+                        return 1
+                    save_template(template)
+                    print(f"Learned template '{template.name}' from {path}: {len(template.edges) - 1} columns, "
+                          f"fields {', '.join(sorted(template.fields))}")
+                    return 0
+                template = match_template(page)
+                print(f"{path}: {template.name if template else 'no known template'}")
+        except (IOError, OSError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            return 1
+    return 0
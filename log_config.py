@@ -0,0 +1,124 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+LOG_FILE = 'schedule_app.log'
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+LOG_LEVELS_ENV = 'SCHEDULE_LOG_LEVELS'
+
+logger = logging.getLogger(__name__)
+
+_listener = None
+_handlers = ()
+_levels = {}
+_worker_queue = None
+_worker_listener = None
+
+
+# "DEBUG" or "extraction=DEBUG,gui=WARNING": a bare level is the root level, name=LEVEL
+# sets the level of one subsystem logger
+def parse_levels(text):
+    levels = {}
+    for item in text.split(','):
+        name, _, level = item.strip().rpartition('=')
+        if level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+# Subsystem levels from config.json ("log_levels": {"extraction": "DEBUG"}), overridden
+# by the SCHEDULE_LOG_LEVELS environment variable
+def configured_levels():
+    from app_config import load_config
+
+    levels = load_config().get('log_levels')
+    levels = {str(name): str(level).upper() for name, level in levels.items()} if isinstance(levels, dict) else {}
+    levels.update(parse_levels(os.environ.get(LOG_LEVELS_ENV, '')))
+    return levels
+
+
+def apply_levels(levels):
+    for name, level in levels.items():
+        try:
+            logging.getLogger(name or None).setLevel(level)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring unknown log level {level!r} for {name or 'root'}")
+
+
+# Records are queued by the calling thread and written by a listener thread, so logging
+# from the GUI thread never waits on the disk. The log rotates by size in the config
+# directory. Safe to call more than once; only the first call sets things up.
+def configure_logging(level=logging.INFO):
+    global _listener, _handlers, _levels
+    if _listener is not None:
+        return _listener
+    from app_config import get_config_dir
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler()]
+    log_path = os.path.join(get_config_dir(), LOG_FILE)
+    file_error = None
+    try:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8', delay=True))
+    except OSError as e:
+        file_error = e
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    _levels = {'': logging.getLevelName(root.level), **configured_levels()}
+    apply_levels(_levels)
+
+    _handlers = tuple(handlers)
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    if file_error is not None:
+        logger.warning(f"Could not open log file {log_path}: {file_error}")
+    return _listener
+
+
+# Writes out whatever is still queued; called at exit
+def stop_logging():
+    global _listener, _worker_listener
+    if _worker_listener is not None:
+        _worker_listener.stop()
+        _worker_listener = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# What a spawned worker process needs to log into this process's log: a multiprocessing
+# queue, drained here into the same handlers, and the levels in effect. None when logging
+# isn't configured here, in which case workers keep logging's default of warnings to stderr.
+def worker_log_setup():
+    global _worker_queue, _worker_listener
+    if _listener is None:
+        return None
+    if _worker_queue is None:
+        import multiprocessing
+
+        _worker_queue = multiprocessing.get_context('spawn').Queue()
+        _worker_listener = logging.handlers.QueueListener(_worker_queue, *_handlers, respect_handler_level=True)
+        _worker_listener.start()
+    return _worker_queue, _levels
+
+
+# Runs in a worker process: every record goes to the parent's queue
+def log_to_queue(log_queue, levels):
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    apply_levels(levels)
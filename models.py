@@ -0,0 +1,194 @@
+from dataclasses import dataclass, field
+
+DAYS = ('Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday')
+DAY_KEYS = ('sun', 'mon', 'tue', 'wed', 'thu')
+PERIOD_COUNT = 15
+ALL_PERIODS = (1 << PERIOD_COUNT) - 1
+
+PERIOD_LABELS = [
+    '7:00', '8:00', '9:00', '10:00', '11:00', '12:20',
+    '1:20', '2:20', '3:30', '4:30', '5:30', '6:30', '7:30', '8:30', '9:30'
+]
+
+# 24-hour (start, end) of every period, the default for calendar export; a 50 minute
+# period from each PERIOD_LABELS start. config.json "period_times" replaces it.
+DEFAULT_PERIOD_TIMES = [
+    ('07:00', '07:50'), ('08:00', '08:50'), ('09:00', '09:50'), ('10:00', '10:50'), ('11:00', '11:50'),
+    ('12:20', '13:10'), ('13:20', '14:10'), ('14:20', '15:10'), ('15:30', '16:20'), ('16:30', '17:20'),
+    ('17:30', '18:20'), ('18:30', '19:20'), ('19:30', '20:20'), ('20:30', '21:20'), ('21:30', '22:20'),
+]
+
+
+# Bitmask of the periods in a registrar cell like '1,2,3'; bit 0 is period 1
+def parse_periods(text):
+    mask = 0
+    for period in str(text or "").split(','):
+        period = period.strip()
+        if period.isdigit() and 1 <= int(period) <= PERIOD_COUNT:
+            mask |= 1 << (int(period) - 1)
+    return mask
+
+
+def mask_to_periods(mask):
+    return [p + 1 for p in range(PERIOD_COUNT) if mask >> p & 1]
+
+
+# Course codes are looked up without spaces and case: "cs210" finds "CS 210"
+def code_key(code):
+    return "".join(code.split()).upper()
+
+
+# One course row of the schedule; day_masks holds one period bitmask per day in DAYS order
+@dataclass(slots=True)
+class Course:
+    code: str
+    name: str = ""
+    credits: str = ""
+    ct: str = ""
+    section: str = ""
+    seq: str = ""
+    activity: str = ""
+    day_masks: tuple = (0, 0, 0, 0, 0)
+    building: str = ""
+    room: str = ""
+    staff: str = ""
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(
+            code=row[0], name=row[1], credits=row[2], ct=row[3], section=row[4], seq=row[5],
+            activity=row[6], day_masks=tuple(parse_periods(cell) for cell in row[7:12]),
+            building=row[12], room=row[13], staff=row[14],
+        )
+
+    @property
+    def location(self):
+        return f"{self.building} {self.room}".strip()
+
+    def periods_on(self, day):
+        return mask_to_periods(self.day_masks[day])
+
+    # (day, period) pairs this course meets in, day is 0-based and period 1-based
+    def meetings(self):
+        for day, mask in enumerate(self.day_masks):
+            for period in mask_to_periods(mask):
+                yield day, period
+
+    def to_dict(self):
+        return {
+            'code': self.code,
+            'name': self.name,
+            'credits': self.credits,
+            'ct': self.ct,
+            'section': self.section,
+            'seq': self.seq,
+            'activity': self.activity,
+            'periods': {key: mask_to_periods(mask) for key, mask in zip(DAY_KEYS, self.day_masks)},
+            'building': self.building,
+            'room': self.room,
+            'staff': self.staff,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        periods = data.get('periods', {})
+        masks = []
+        for key in DAY_KEYS:
+            mask = 0
+            for period in periods.get(key, []):
+                mask |= 1 << (period - 1)
+            masks.append(mask)
+        return cls(
+            code=data['code'], name=data.get('name', ""), credits=data.get('credits', ""),
+            ct=data.get('ct', ""), section=data.get('section', ""), seq=data.get('seq', ""),
+            activity=data.get('activity', ""), day_masks=tuple(masks), building=data.get('building', ""),
+            room=data.get('room', ""), staff=data.get('staff', ""),
+        )
+
+
+# Occupancy of the 15 period x 5 day grid of a list of courses, kept as one period bitmask
+# per day: 'occupied' has a bit for every taken slot and 'clashes' for every slot taken by
+# more than one course, so slot lookups, free periods and conflict checks are bit operations
+class Occupancy:
+    __slots__ = ('courses', 'occupied', 'clashes')
+
+    def __init__(self, courses):
+        self.courses = courses
+        self.occupied = [0] * len(DAYS)
+        self.clashes = [0] * len(DAYS)
+        for course in courses:
+            for day, mask in enumerate(course.day_masks):
+                self.clashes[day] |= self.occupied[day] & mask
+                self.occupied[day] |= mask
+
+    def is_occupied(self, day, period):
+        return bool(self.occupied[day] >> (period - 1) & 1)
+
+    def is_conflict(self, day, period):
+        return bool(self.clashes[day] >> (period - 1) & 1)
+
+    def free_mask(self, day):
+        return ~self.occupied[day] & ALL_PERIODS
+
+    def free_periods(self, day):
+        return mask_to_periods(self.free_mask(day))
+
+    @property
+    def has_conflicts(self):
+        return any(self.clashes)
+
+    # Indexes of the courses meeting in a slot, in schedule order
+    def courses_at(self, day, period):
+        bit = 1 << (period - 1)
+        return [i for i, course in enumerate(self.courses) if course.day_masks[day] & bit]
+
+    # (day, period, course indexes) for every slot with more than one course
+    def conflicts(self):
+        for day, mask in enumerate(self.clashes):
+            for period in mask_to_periods(mask):
+                yield day, period, self.courses_at(day, period)
+
+
+# A student's parsed schedule: the student info block plus the course rows in PDF order
+@dataclass(slots=True)
+class StudentSchedule:
+    student_id: str = ""
+    student_name: str = ""
+    advisor: str = ""
+    department: str = ""
+    major: str = ""
+    semester: str = ""
+    courses: list = field(default_factory=list)
+
+    def student_dict(self):
+        return {
+            'id': self.student_id,
+            'name': self.student_name,
+            'advisor': self.advisor,
+            'department': self.department,
+            'major': self.major,
+            'semester': self.semester,
+        }
+
+    def to_dict(self):
+        return {'student': self.student_dict(), 'courses': [course.to_dict() for course in self.courses]}
+
+    def occupancy(self):
+        return Occupancy(self.courses)
+
+    # Clashing slots as plain data: day key, period and the codes of the courses meeting there
+    def conflicts(self):
+        return [
+            {'day': DAY_KEYS[day], 'period': period, 'courses': [self.courses[i].code for i in indexes]}
+            for day, period, indexes in self.occupancy().conflicts()
+        ]
+
+    @classmethod
+    def from_dict(cls, data):
+        student = data.get('student', {})
+        return cls(
+            student_id=student.get('id', ""), student_name=student.get('name', ""),
+            advisor=student.get('advisor', ""), department=student.get('department', ""),
+            major=student.get('major', ""), semester=student.get('semester', ""),
+            courses=[Course.from_dict(course) for course in data.get('courses', [])],
+        )
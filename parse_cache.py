@@ -0,0 +1,198 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_NAME = "parse_cache"
+INDEX_FILE = "index.json"
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# The cache the cohort commands (batch loads, free, rooms, db, export, render, serve, diff)
+# read through, kept apart from the GUI's so a folder run neither thrashes on the GUI's
+# limits nor evicts the schedules the GUI has open
+COHORT_CACHE_DIR_NAME = "cohort_cache"
+COHORT_MAX_ENTRIES = 10000
+COHORT_MAX_MB = 512
+
+
+# Content hash of a file, read in chunks so big PDFs don't sit in memory
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Persistent cache of extract_from_pdf results.
+# Entries are keyed by the PDF's content hash and size; the last seen size/mtime of each
+# path is remembered so an unchanged file doesn't need to be re-hashed on every launch.
+# The whole cache is dropped when the parser version changes. encode/decode convert
+# results to and from JSON-friendly data.
+# Hits only update recency in memory; the index is written on put, or with autosave off
+# (for loads of thousands of files) only when flush() is called.
+class ParseCache:
+    def __init__(self, base_dir, parser_version, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES,
+                 encode=None, decode=None, dir_name=CACHE_DIR_NAME, autosave=True):
+        self.cache_dir = os.path.join(base_dir, dir_name)
+        self.parser_version = parser_version
+        self.encode = encode
+        self.decode = decode
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.autosave = autosave
+        self.dirty = False
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.index = self._load_index()
+
+    def _index_path(self):
+        return os.path.join(self.cache_dir, INDEX_FILE)
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _empty_index(self):
+        return {"parser_version": self.parser_version, "entries": {}, "files": {}}
+
+    def _load_index(self):
+        try:
+            with open(self._index_path(), 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return self._empty_index()
+        except (json.JSONDecodeError, IOError, OSError):
+            logger.exception("Parse cache index is unreadable, starting empty")
+            self._remove_entry_files()
+            return self._empty_index()
+
+        if not isinstance(index, dict) or index.get("parser_version") != self.parser_version:
+            logger.info("Parser version changed, invalidating parse cache")
+            self._remove_entry_files()
+            return self._empty_index()
+        index.setdefault("entries", {})
+        index.setdefault("files", {})
+        return index
+
+    def _save_index(self):
+        tmp_path = self._index_path() + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, separators=(',', ':'))
+            os.replace(tmp_path, self._index_path())
+            self.dirty = False
+        except (IOError, OSError):
+            logger.exception("Failed to save parse cache index")
+
+    # Writes the index if anything changed since it was last saved
+    def flush(self):
+        if self.dirty:
+            self._save_index()
+
+    def _remove_entry_files(self):
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(".json") and name != INDEX_FILE:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    logger.warning(f"Could not remove stale cache file: {name}")
+
+    # Cache key for a path, re-hashing only when size/mtime differ from the last visit
+    def _key_for(self, pdf_path):
+        st = os.stat(pdf_path)
+        path_key = os.path.normcase(os.path.abspath(pdf_path))
+        seen = self.index["files"].get(path_key)
+        if seen and seen["size"] == st.st_size and seen["mtime_ns"] == st.st_mtime_ns:
+            return seen["key"]
+        key = f"{file_digest(pdf_path)}-{st.st_size}"
+        self.index["files"][path_key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "key": key}
+        self.dirty = True
+        return key
+
+    # Content hash key of a PDF, the key its result is cached under
+    def content_key(self, pdf_path):
+        return self._key_for(pdf_path)
+
+    # Whether a result for the file is cached, without reading it
+    def has(self, pdf_path):
+        try:
+            return self._key_for(pdf_path) in self.index["entries"]
+        except (IOError, OSError):
+            return False
+
+    def get(self, pdf_path):
+        try:
+            key = self._key_for(pdf_path)
+        except (IOError, OSError):
+            return None
+
+        entry = self.index["entries"].get(key)
+        if entry is None:
+            return None
+        try:
+            with open(self._entry_path(key), 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            if self.decode is not None:
+                result = self.decode(result)
+        except (json.JSONDecodeError, KeyError, TypeError, IOError, OSError):
+            logger.warning(f"Dropping unreadable parse cache entry {key}")
+            self.index["entries"].pop(key, None)
+            self.dirty = True
+            if self.autosave:
+                self._save_index()
+            return None
+
+        entry["last_used"] = time.time()
+        self.dirty = True
+        return result
+
+    def put(self, pdf_path, result):
+        try:
+            key = self._key_for(pdf_path)
+            if self.encode is not None:
+                result = self.encode(result)
+            payload = json.dumps(result, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            tmp_path = self._entry_path(key) + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._entry_path(key))
+        except (TypeError, ValueError, IOError, OSError):
+            logger.exception("Failed to write parse cache entry")
+            return
+
+        self.index["entries"][key] = {"bytes": len(payload), "last_used": time.time()}
+        self._evict()
+        self.dirty = True
+        if self.autosave:
+            self._save_index()
+
+    # Drop least recently used entries until both the count and size limits hold
+    def _evict(self):
+        entries = self.index["entries"]
+        total = sum(e["bytes"] for e in entries.values())
+        by_age = sorted(entries, key=lambda k: entries[k]["last_used"])
+        while by_age and (len(entries) > self.max_entries or total > self.max_bytes):
+            key = by_age.pop(0)
+            total -= entries.pop(key)["bytes"]
+            try:
+                os.remove(self._entry_path(key))
+            except OSError:
+                pass
+
+        live = set(entries)
+        files = self.index["files"]
+        for path_key in [p for p, seen in files.items() if seen["key"] not in live]:
+            del files[path_key]
+
+    def clear(self):
+        self._remove_entry_files()
+        self.index = self._empty_index()
+        self._save_index()
+        logger.info("Parse cache cleared")
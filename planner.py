@@ -0,0 +1,539 @@
+import argparse
+import csv
+import heapq
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+from extraction import EXTRACTION_MODES, extract_from_pdf
+from models import ALL_PERIODS, DAY_KEYS, DAYS, PERIOD_COUNT, Course, StudentSchedule, code_key, mask_to_periods
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP = 10
+DEFAULT_EARLY_BEFORE = 3
+OFFERING_FIELDS = ['code', 'name', 'credits', 'ct', 'section', 'seq', 'activity', *DAY_KEYS, 'building', 'room', 'staff']
+
+# Weights of days on campus, idle periods between classes and early periods in a plan's
+# score, lower scores rank first
+PRESETS = {
+    'compact': (3.0, 1.0, 0.5),
+    'no-gaps': (1.0, 3.0, 0.5),
+    'late': (1.0, 1.0, 3.0),
+}
+
+# The week as one int: day d, period p is bit d * PERIOD_COUNT + p - 1
+DAY_MASKS = tuple(ALL_PERIODS << (day * PERIOD_COUNT) for day in range(len(DAYS)))
+
+
+def week_mask(day_masks):
+    mask = 0
+    for day, periods in enumerate(day_masks):
+        mask |= periods << (day * PERIOD_COUNT)
+    return mask
+
+
+# Bits of the given periods (1-based) on every day
+def periods_mask(periods):
+    mask = 0
+    for period in periods:
+        for day in range(len(DAYS)):
+            mask |= 1 << (day * PERIOD_COUNT + period - 1)
+    return mask
+
+
+# Days with a class, one bit per day
+def day_set(mask):
+    return sum(1 << day for day, day_mask in enumerate(DAY_MASKS) if mask & day_mask)
+
+
+# Periods without a class between the first and last class of each day
+def idle_mask(mask):
+    idle = 0
+    for day in range(len(DAYS)):
+        periods = mask >> (day * PERIOD_COUNT) & ALL_PERIODS
+        if periods:
+            idle |= ((1 << periods.bit_length()) - (periods & -periods) & ~periods) << (day * PERIOD_COUNT)
+    return idle
+
+
+# Days on campus and idle periods between the first and last class of each day
+def days_and_gaps(mask):
+    days = gaps = 0
+    for day in range(len(DAYS)):
+        periods = mask >> (day * PERIOD_COUNT) & ALL_PERIODS
+        if periods:
+            days += 1
+            first = (periods & -periods).bit_length() - 1
+            gaps += periods.bit_length() - first - periods.bit_count()
+    return days, gaps
+
+
+# Hard limits drop sections outright: nothing before `earliest` or after `latest`, nothing on
+# free_days (day indexes). The weights only rank what is left; periods before early_before
+# count as early.
+@dataclass(slots=True)
+class Preferences:
+    earliest: int = 1
+    latest: int = PERIOD_COUNT
+    free_days: tuple = ()
+    early_before: int = DEFAULT_EARLY_BEFORE
+    day_weight: float = PRESETS['compact'][0]
+    gap_weight: float = PRESETS['compact'][1]
+    early_weight: float = PRESETS['compact'][2]
+
+    @classmethod
+    def preset(cls, name, **limits):
+        day_weight, gap_weight, early_weight = PRESETS[name]
+        return cls(day_weight=day_weight, gap_weight=gap_weight, early_weight=early_weight, **limits)
+
+    def forbidden_mask(self):
+        mask = periods_mask(range(1, self.earliest)) | periods_mask(range(self.latest + 1, PERIOD_COUNT + 1))
+        for day in self.free_days:
+            mask |= DAY_MASKS[day]
+        return mask
+
+    def early_mask(self):
+        return periods_mask(range(1, self.early_before))
+
+
+# One way to take a course: a section for each of its activities, e.g. a lecture section with
+# a lab section, or one section that holds both. rows are the offering rows of those sections.
+@dataclass(slots=True)
+class SectionChoice:
+    code: str
+    sections: tuple
+    rows: tuple
+    mask: int
+    days: int = 0
+    early: int = 0
+
+
+@dataclass(slots=True)
+class Plan:
+    choices: tuple
+    mask: int
+    days: int
+    gaps: int
+    early: int
+    score: float
+
+    @property
+    def courses(self):
+        return [row for choice in self.choices for row in choice.rows]
+
+    # Section numbers taken per course code
+    def sections(self):
+        sections = {}
+        for choice in self.choices:
+            sections.setdefault(choice.code, []).extend(choice.sections)
+        return sections
+
+    def summary(self):
+        return (f"{self.days} days, {self.gaps} gaps, {self.early} early periods: "
+                + ", ".join(f"{code} {'/'.join(sections)}" for code, sections in self.sections().items()))
+
+    def to_schedule(self, rank, semester=""):
+        return StudentSchedule(student_name=f"Plan {rank}", semester=semester, courses=self.courses)
+
+    def to_dict(self, rank):
+        return {
+            'rank': rank,
+            'score': self.score,
+            'days': self.days,
+            'gaps': self.gaps,
+            'early': self.early,
+            'sections': self.sections(),
+            'courses': [course.to_dict() for course in self.courses],
+        }
+
+
+def read_offerings_csv(path):
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        missing = {'code', 'section'} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"{path} has no {' or '.join(sorted(missing))} column")
+        return [Course.from_row([(row.get(name) or "").strip() for name in OFFERING_FIELDS])
+                for row in reader if (row.get('code') or "").strip()]
+
+
+# Course rows of an offerings list: a registrar PDF read with the schedule table logic (and
+# the parse cache), or a CSV with the batch export's course columns. The same row listed
+# more than once, as in a batch export of many students, is kept once.
+def load_offerings(path, mode='anchored'):
+    if path.lower().endswith('.csv'):
+        rows = read_offerings_csv(path)
+    else:
+        from app_config import get_parse_cache
+
+        cache = get_parse_cache()
+        schedule = cache.get(path)
+        if schedule is None:
+            schedule = extract_from_pdf(path, mode=mode)
+            if not schedule:
+                raise ValueError(f"No course rows found in {path}")
+            cache.put(path, schedule)
+        rows = schedule.courses
+    return unique_offerings(rows)
+
+
+def unique_offerings(rows):
+    seen = set()
+    offerings = []
+    for row in rows:
+        key = (row.code, row.section, row.seq, row.activity, row.day_masks)
+        if key not in seen:
+            seen.add(key)
+            offerings.append(row)
+    return offerings
+
+
+def offerings_by_code(offerings):
+    by_code = {}
+    for row in offerings:
+        by_code.setdefault(code_key(row.code), []).append(row)
+    return by_code
+
+
+# (code, name, section count) of every offered course, by code
+def course_catalog(offerings):
+    catalog = []
+    for rows in offerings_by_code(offerings).values():
+        name = next((row.name for row in rows if row.name), "")
+        catalog.append((rows[0].code, name, len({row.section for row in rows})))
+    return sorted(catalog)
+
+
+# The parts a course is taken in, each a list of SectionChoice to pick one from. Rows sharing
+# a section number are taken together. When the sections split cleanly by activity, like
+# lecture sections and separate lab sections, each kind is a part of its own and the search
+# pairs them; otherwise the sections are combined here so each activity is covered exactly
+# once. Sections that clash with themselves or touch a forbidden slot are left out, but their
+# activities still have to be covered, so a part can come back empty.
+def course_parts(rows, forbidden=0):
+    code = rows[0].code
+    sections = {}
+    for row in rows:
+        sections.setdefault(row.section, []).append(row)
+    kinds = {frozenset(row.activity for row in section_rows) for section_rows in sections.values()}
+    needed = frozenset(row.activity for row in rows)
+    candidates = []
+    for section, section_rows in sections.items():
+        mask = 0
+        for row in section_rows:
+            row_mask = week_mask(row.day_masks)
+            if mask & row_mask:
+                break
+            mask |= row_mask
+        else:
+            if not mask & forbidden:
+                candidates.append((section, frozenset(row.activity for row in section_rows), tuple(section_rows), mask))
+
+    if sum(len(kind) for kind in kinds) == len(needed):
+        parts = {kind: [] for kind in kinds}
+        for section, kind, section_rows, mask in candidates:
+            parts[kind].append(SectionChoice(code, (section,), section_rows, mask, day_set(mask)))
+        return list(parts.values())
+
+    choices = []
+
+    def cover(start, covered, mask, picked):
+        if covered == needed:
+            choices.append(SectionChoice(code, tuple(c[0] for c in picked),
+                                         tuple(row for c in picked for row in c[2]), mask, day_set(mask)))
+            return
+        for i in range(start, len(candidates)):
+            candidate = candidates[i]
+            if not candidate[1] & covered and not candidate[3] & mask:
+                cover(i + 1, covered | candidate[1], mask | candidate[3], picked + (candidate,))
+
+    cover(0, frozenset(), 0, ())
+    return [choices]
+
+
+# Where each day starts in a week mask. Sets of a part's choices are ints too: bit i is choice i
+DAY_SHIFTS = tuple(day * PERIOD_COUNT for day in range(len(DAYS)))
+REACH_CHUNK = 8
+
+
+# Lookups over the choices of one course part: the choices meeting in each slot, the choices
+# meeting only on a given set of days, each choice's periods per day, and the slots a set of
+# choices reaches, read REACH_CHUNK choices at a time
+class PartTables:
+    def __init__(self, choices):
+        self.all = (1 << len(choices)) - 1
+        self.early = [choice.early for choice in choices]
+        self.meeting = {}
+        self.within = [0] * (1 << len(DAYS))
+        self.day_periods = [[(day, choice.mask >> shift & ALL_PERIODS) for day, shift in enumerate(DAY_SHIFTS)
+                             if choice.mask >> shift & ALL_PERIODS] for choice in choices]
+        for i, choice in enumerate(choices):
+            mask = choice.mask
+            while mask:
+                slot = mask & -mask
+                self.meeting[slot] = self.meeting.get(slot, 0) | 1 << i
+                mask ^= slot
+            for days in range(len(self.within)):
+                if not choice.days & ~days:
+                    self.within[days] |= 1 << i
+        self.reach_tables = []
+        for first in range(0, len(choices), REACH_CHUNK):
+            table = [0]
+            for choice in choices[first:first + REACH_CHUNK]:
+                table += [mask | choice.mask for mask in table]
+            self.reach_tables.append(table)
+
+    # Choices meeting in any slot of mask
+    def clashing(self, mask):
+        bits = 0
+        while mask:
+            slot = mask & -mask
+            bits |= self.meeting.get(slot, 0)
+            mask ^= slot
+        return bits
+
+    # Slots any of the choices meets
+    def reach(self, bits):
+        mask = 0
+        for table in self.reach_tables:
+            if not bits:
+                break
+            mask |= table[bits & (1 << REACH_CHUNK) - 1]
+            bits >>= REACH_CHUNK
+        return mask
+
+    # Most of the given slots one of the choices meets; levels[k] holds the choices meeting at
+    # least k of the slots seen so far
+    def most_met(self, bits, slots):
+        levels = [bits]
+        while slots:
+            slot = slots & -slots
+            slots ^= slot
+            meeting = self.meeting.get(slot, 0) & bits
+            if meeting:
+                top = levels[-1] & meeting
+                for k in range(len(levels) - 1, 0, -1):
+                    levels[k] |= levels[k - 1] & meeting
+                if top:
+                    levels.append(top)
+        return len(levels) - 1
+
+
+# Ranks conflict-free combinations of one SectionChoice per course part. A best-first search
+# over the week bitmasks, split up front by the set of days a plan ends up on so every branch
+# knows its days on campus exactly and only takes choices inside them. Expanding a branch
+# places the part with the fewest choices still fitting and filters the other parts' choices
+# against it, so a branch ends as soon as some part has nothing left. The branch with the
+# lowest bound is expanded next and a complete plan's bound is its exact score, so plans come
+# off the queue best first and the search stops at `top` (0 for every combination).
+# Returns (plans, stats).
+def plan_schedules(offerings, codes, prefs=None, top=DEFAULT_TOP):
+    prefs = prefs or Preferences()
+    start = time.perf_counter()
+    by_code = offerings_by_code(offerings)
+    forbidden = prefs.forbidden_mask()
+    early_mask = prefs.early_mask()
+    day_weight, gap_weight, early_weight = prefs.day_weight, prefs.gap_weight, prefs.early_weight
+
+    options = []
+    for key in dict.fromkeys(code_key(code) for code in codes):
+        rows = by_code.get(key)
+        if not rows:
+            raise ValueError(f"{key} is not in the offerings")
+        for choices in course_parts(rows, forbidden):
+            if not choices:
+                raise ValueError(f"No section of {rows[0].code} fits the time limits")
+            for choice in choices:
+                choice.early = (choice.mask & early_mask).bit_count()
+            # Fewest early periods first, so a part's lowest choice still fitting has the fewest
+            choices.sort(key=lambda choice: choice.early)
+            options.append(choices)
+    tables = [PartTables(choices) for choices in options]
+    # compatible[part][i][other]: the choices of part `other` that don't clash with choice i
+    compatible = [[[table.all & ~table.clashing(choice.mask) for table in tables] for choice in choices]
+                  for choices in options]
+
+    # Best score of a plan on exactly `days` completing `taken` with the `fitting` choices, or
+    # None when some of the days can no longer be reached. Early periods only grow, and the
+    # idle periods so far stay idle unless a choice still fitting covers them, each part
+    # filling at most as many as one of its choices meets. least_gaps is a known minimum.
+    def lower_bound(taken, fitting, days, least_gaps=0):
+        idle = idle_mask(taken)
+        gaps = idle.bit_count()
+        early = (taken & early_mask).bit_count()
+        reachable = taken
+        for part, free in fitting:
+            table = tables[part]
+            early += table.early[(free & -free).bit_length() - 1]
+            reach = table.reach(free)
+            reachable |= reach
+            if reach & idle:
+                gaps -= table.most_met(free, reach & idle)
+        if days & ~day_set(reachable):
+            return None
+        gaps = max(gaps, (idle & ~reachable).bit_count(), least_gaps)
+        return day_weight * days.bit_count() + gap_weight * gaps + early_weight * early
+
+    # Idle periods a completion of `taken` can't avoid: whichever choice a part takes, the
+    # idle periods left that no other part's choices reach stay idle. Each part's best choice
+    # gives a minimum and the largest of them holds. A choice only changes the days it meets.
+    # This costs a pass over every fitting choice, so it runs once a branch comes off the queue.
+    def forced_gaps(taken, fitting):
+        reaches = [tables[part].reach(free) for part, free in fitting]
+        after = [0] * (len(reaches) + 1)
+        for k in range(len(reaches) - 1, -1, -1):
+            after[k] = after[k + 1] | reaches[k]
+        periods = [taken >> shift & ALL_PERIODS for shift in DAY_SHIFTS]
+        idle = idle_mask(taken)
+        most = before = 0
+        for k, (part, free) in enumerate(fitting):
+            others = before | after[k + 1]
+            before |= reaches[k]
+            unfilled = [~(others >> shift) & ALL_PERIODS for shift in DAY_SHIFTS]
+            still_idle = [(idle >> shift & day_unfilled).bit_count()
+                          for shift, day_unfilled in zip(DAY_SHIFTS, unfilled)]
+            least = None
+            day_periods = tables[part].day_periods
+            while free:
+                low = free & -free
+                free ^= low
+                change = 0
+                for day, meets in day_periods[low.bit_length() - 1]:
+                    now = periods[day] | meets
+                    now_idle = (1 << now.bit_length()) - (now & -now) & ~now
+                    change += (now_idle & unfilled[day]).bit_count() - still_idle[day]
+                if least is None or change < least:
+                    least = change
+            most = max(most, least + sum(still_idle))
+        return most
+
+    serial = itertools.count()
+    stats = {'nodes': 0, 'complete': 0, 'cut': 0}
+    plans = []
+    # Branches as (bound, parts left, serial, checked, days, taken, remaining, picked), remaining
+    # holding (part, bitmask of its choices still fitting). Among equal bounds the deepest
+    # branch goes first, finishing plans that tie. A branch is bounded cheaply when it is
+    # queued and checked for forced gaps once it comes off the queue, going back in if those
+    # raise its bound.
+    queue = []
+    for days in range(1, 1 << len(DAYS)) if options else ():
+        remaining = [(part, table.within[days]) for part, table in enumerate(tables)]
+        if all(free for _, free in remaining):
+            bound = lower_bound(0, remaining, days)
+            if bound is not None:
+                queue.append((bound, len(remaining), next(serial), False, days, 0, remaining, ()))
+    heapq.heapify(queue)
+    while queue:
+        bound, left, _, checked, days, mask, remaining, picked = heapq.heappop(queue)
+        if not remaining:
+            days, gaps = days_and_gaps(mask)
+            plans.append(Plan(tuple(sorted(picked, key=lambda c: (c.code, c.sections))), mask, days, gaps,
+                              (mask & early_mask).bit_count(), bound))
+            if len(plans) == top:
+                break
+            continue
+        if not checked:
+            least_gaps = forced_gaps(mask, remaining)
+            if least_gaps:
+                raised = lower_bound(mask, remaining, days, least_gaps)
+                if raised > bound:
+                    heapq.heappush(queue, (raised, left, next(serial), True, days, mask, remaining, picked))
+                    continue
+        i = min(range(len(remaining)), key=lambda j: remaining[j][1].bit_count())
+        part, free = remaining[i]
+        rest = remaining[:i] + remaining[i + 1:]
+        while free:
+            low = free & -free
+            free ^= low
+            index = low.bit_length() - 1
+            stats['nodes'] += 1
+            taken = mask | options[part][index].mask
+            fits = compatible[part][index]
+            fitting = []
+            for other, bits in rest:
+                bits &= fits[other]
+                if not bits:
+                    break
+                fitting.append((other, bits))
+            else:
+                child_bound = lower_bound(taken, fitting, days)
+                if child_bound is None:
+                    continue
+                if not fitting:
+                    stats['complete'] += 1
+                heapq.heappush(queue, (child_bound, len(fitting), next(serial), False, days, taken, fitting,
+                                       picked + (options[part][index],)))
+    stats['cut'] = len(queue)
+    stats['choices'] = [len(choices) for choices in options]
+    stats['ms'] = round((time.perf_counter() - start) * 1000, 3)
+    logger.info(f"Planned {len(options)} course parts: {len(plans)} plans of {stats['complete']} complete, "
+                f"{stats['nodes']} nodes in {stats['ms']} ms")
+    return plans, stats
+
+
+def meeting_text(course):
+    return ", ".join(f"{DAYS[day][:3]} {','.join(str(p) for p in mask_to_periods(mask))}"
+                     for day, mask in enumerate(course.day_masks) if mask)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='schedule.py plan',
+                                     description='Find conflict-free section combinations for a set of courses.')
+    parser.add_argument('offerings', help='course offerings as a registrar PDF or a CSV')
+    parser.add_argument('courses', nargs='*', help='course codes to plan, e.g. "CS 110" MATH111 '
+                                                   '(none lists the offered courses)')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help='number of plans to list')
+    parser.add_argument('--all', action='store_true', help='list every conflict-free combination')
+    parser.add_argument('--prefer', choices=sorted(PRESETS), default='compact',
+                        help='rank by fewest days on campus, fewest gaps or latest starts (default: compact)')
+    parser.add_argument('--earliest', type=int, default=1, help='no classes before this period')
+    parser.add_argument('--latest', type=int, default=PERIOD_COUNT, help='no classes after this period')
+    parser.add_argument('--free-day', action='append', choices=DAY_KEYS, default=[], help='keep this day free')
+    parser.add_argument('--json', action='store_true', help='print the plans as JSON')
+    parser.add_argument('--mode', choices=EXTRACTION_MODES, default='anchored',
+                        help='table extraction mode for a PDF that is not cached (default: anchored)')
+    return parser
+
+
+def plan_main(argv):
+    args = build_parser().parse_args(argv)
+    if not os.path.isfile(args.offerings):
+        print(f"Not found: {args.offerings}", file=sys.stderr)
+        return 2
+    if not 1 <= args.earliest <= args.latest <= PERIOD_COUNT:
+        print(f"--earliest and --latest must be periods 1 to {PERIOD_COUNT}, in order", file=sys.stderr)
+        return 2
+    try:
+        offerings = load_offerings(args.offerings, args.mode)
+    except (OSError, ValueError) as exc:
+        print(f"Could not read offerings: {exc}", file=sys.stderr)
+        return 1
+
+    if not args.courses:
+        for code, name, sections in course_catalog(offerings):
+            print(f"{code:<10} {sections:>3} sections  {name}")
+        return 0
+
+    prefs = Preferences.preset(args.prefer, earliest=args.earliest, latest=args.latest,
+                               free_days=tuple(DAY_KEYS.index(day) for day in args.free_day))
+    try:
+        plans, stats = plan_schedules(offerings, args.courses, prefs, 0 if args.all else args.top)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(f"{len(plans)} plans from {stats['complete']} complete combinations, {stats['nodes']} sections tried "
+          f"in {stats['ms']:.1f} ms", file=sys.stderr)
+    if args.json:
+        print(json.dumps([plan.to_dict(rank) for rank, plan in enumerate(plans, start=1)], indent=2))
+        return 0 if plans else 1
+    for rank, plan in enumerate(plans, start=1):
+        print(f"Plan {rank}: score {plan.score:g}, {plan.days} days, {plan.gaps} gaps, {plan.early} early periods")
+        for course in plan.courses:
+            print(f"    {course.code:<10} sec {course.section:<4} {course.activity:<14} {meeting_text(course):<28} "
+                  f"{course.location}  {' '.join(course.staff.split())}")
+    return 0 if plans else 1
@@ -0,0 +1,137 @@
+import logging
+import os
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 12
+DEFAULT_MAX_MB = 16
+DEFAULT_PREFETCH = 2
+
+# Rough memory cost of a schedule with its table model, measured with tracemalloc: a few KB
+# for the objects themselves plus this much per course row and its grid cells
+BASE_BYTES = 4096
+COURSE_BYTES = 768
+
+
+def estimate_bytes(schedule):
+    return BASE_BYTES + COURSE_BYTES * len(schedule.courses)
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+    except OSError:
+        return None
+
+
+class RecentEntry:
+    __slots__ = ('path', 'schedule', 'model', 'stat', 'size')
+
+    def __init__(self, path, schedule, model, stat):
+        self.path = path
+        self.schedule = schedule
+        self.model = model
+        self.stat = stat
+        self.size = estimate_bytes(schedule)
+
+
+# The schedules viewed most recently, each with the table model that renders it, so going
+# back to one only swaps its model into the view. Bounded by entry count and by estimated
+# memory; the least recently viewed go first, but the newest entry is always kept. An entry
+# whose file changed on disk since it was added is not returned.
+class RecentSchedules:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+
+    def __contains__(self, path):
+        return path in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def paths(self):
+        return list(self.entries)
+
+    def get(self, path):
+        entry = self.entries.get(path)
+        if entry is None or _stat(path) != entry.stat:
+            return None
+        self.entries.move_to_end(path)
+        return entry
+
+    def peek(self, path):
+        return self.entries.get(path)
+
+    def holds_model(self, model):
+        return any(entry.model is model for entry in self.entries.values())
+
+    # Adds or replaces a schedule; returns the entries that had to make room, whose models
+    # the caller can release
+    def put(self, path, schedule, model):
+        evicted = []
+        old = self.entries.pop(path, None)
+        if old is not None:
+            self.bytes -= old.size
+            if old.model is not model:
+                evicted.append(old)
+        entry = RecentEntry(path, schedule, model, _stat(path))
+        self.entries[path] = entry
+        self.bytes += entry.size
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, oldest = self.entries.popitem(last=False)
+            self.bytes -= oldest.size
+            evicted.append(oldest)
+        if evicted and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Recent schedules evicted {[e.path for e in evicted]}, {self.bytes} bytes kept")
+        return evicted
+
+    # A watched file was re-parsed into the entry's own model
+    def update(self, path, schedule):
+        entry = self.entries.get(path)
+        if entry is not None:
+            self.bytes -= entry.size
+            entry.schedule = schedule
+            entry.stat = _stat(path)
+            entry.size = estimate_bytes(schedule)
+            self.bytes += entry.size
+
+    def remove(self, path):
+        entry = self.entries.pop(path, None)
+        if entry is not None:
+            self.bytes -= entry.size
+        return entry
+
+
+# The PDFs of pdf_path's folder in name order, and pdf_path's position among them (-1 if
+# it isn't there)
+def folder_pdfs(pdf_path):
+    directory = os.path.dirname(os.path.abspath(pdf_path))
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.lower().endswith('.pdf'))
+    except OSError:
+        return [], -1
+    name = os.path.basename(pdf_path)
+    paths = [os.path.join(directory, other) for other in names]
+    return paths, names.index(name) if name in names else -1
+
+
+# The PDFs next to pdf_path in its folder, in the order someone stepping through the folder
+# would open them: the following ones first, then the one before
+def neighbour_pdfs(pdf_path, ahead=DEFAULT_PREFETCH, behind=1):
+    paths, i = folder_pdfs(pdf_path)
+    if i < 0:
+        return []
+    return paths[i + 1:i + 1 + ahead] + paths[max(0, i - behind):i][::-1]
+
+
+# The file after (step 1) or before (step -1) pdf_path in its folder, None at either end
+def adjacent_pdf(pdf_path, step):
+    paths, i = folder_pdfs(pdf_path)
+    if i < 0 or not 0 <= i + step < len(paths):
+        return None
+    return paths[i + step]
@@ -0,0 +1,352 @@
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+
+from extraction import default_workers
+from models import DAY_KEYS, DAYS, StudentSchedule
+
+logger = logging.getLogger(__name__)
+
+CHANGE_KINDS = ('course_added', 'course_removed', 'meeting_added', 'meeting_removed', 'meeting_moved',
+                'room_changed', 'staff_changed')
+REPORT_FIELDS = [
+    'status', 'old_file', 'new_file', 'student_id', 'student_name',
+    'change', 'code', 'name', 'section', 'activity', 'old_slots', 'new_slots', 'old', 'new'
+]
+
+# How a changed cell is highlighted: new and moved-in meetings, meetings whose room or staff
+# changed, and slots a meeting left. A cell with more than one keeps the first in this order.
+CELL_ADDED = 'added'
+CELL_CHANGED = 'changed'
+CELL_REMOVED = 'removed'
+CELL_KINDS = (CELL_ADDED, CELL_CHANGED, CELL_REMOVED)
+
+
+def course_key(course):
+    return course.code, course.section, course.activity
+
+
+# Meetings of a schedule per (code, section, activity): {(day, period): (location, staff)},
+# with a None slot for a course row without meetings so its room and staff still compare
+def meeting_map(schedule):
+    courses = {}
+    for course in schedule.courses:
+        slots = courses.setdefault(course_key(course), {})
+        detail = (course.location, " ".join(course.staff.split()))
+        for slot in list(course.meetings()) or [None]:
+            slots.setdefault(slot, detail)
+    return courses
+
+
+# Content hash of a schedule that ignores row order, so a reissue that only shuffles rows or
+# changes the PDF's bytes compares equal without a course by course diff
+def schedule_digest(schedule):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(sorted(
+        (course.code, course.section, course.activity, course.day_masks, course.location,
+         " ".join(course.staff.split())) for course in schedule.courses)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def slot_list(slots):
+    return [[DAY_KEYS[day], period] for day, period in sorted(slot for slot in slots if slot is not None)]
+
+
+def slot_text(slots):
+    return ", ".join(f"{DAYS[DAY_KEYS.index(day)][:3]} {period}" for day, period in slots)
+
+
+# Changes from the old version of a schedule to the new one, as plain dicts ordered by
+# course: added and removed courses, meetings added, removed or moved to other slots, and
+# room and staff changes of the meetings both versions share
+def diff_schedules(old, new):
+    before = meeting_map(old)
+    after = meeting_map(new)
+    names = {course_key(course): course.name for course in old.courses}
+    names.update((course_key(course), course.name) for course in new.courses)
+    changes = []
+    for key in sorted(before.keys() | after.keys()):
+        code, section, activity = key
+        base = {'code': code, 'name': names.get(key, ""), 'section': section, 'activity': activity}
+        if key not in after:
+            changes.append({'change': 'course_removed', **base, 'old_slots': slot_list(before[key])})
+            continue
+        if key not in before:
+            changes.append({'change': 'course_added', **base, 'new_slots': slot_list(after[key])})
+            continue
+        old_slots, new_slots = before[key], after[key]
+        removed = slot_list(old_slots.keys() - new_slots.keys())
+        added = slot_list(new_slots.keys() - old_slots.keys())
+        if removed and added:
+            changes.append({'change': 'meeting_moved', **base, 'old_slots': removed, 'new_slots': added})
+        elif added:
+            changes.append({'change': 'meeting_added', **base, 'new_slots': added})
+        elif removed:
+            changes.append({'change': 'meeting_removed', **base, 'old_slots': removed})
+        for field, change in ((0, 'room_changed'), (1, 'staff_changed')):
+            moves = {}
+            for slot in old_slots.keys() & new_slots.keys():
+                if old_slots[slot][field] != new_slots[slot][field]:
+                    moves.setdefault((old_slots[slot][field], new_slots[slot][field]), []).append(slot)
+            for (old_value, new_value), slots in sorted(moves.items()):
+                changes.append({'change': change, **base, 'new_slots': slot_list(slots),
+                                'old': old_value, 'new': new_value})
+    return changes
+
+
+def change_text(change):
+    label = f"{change['code']} {change['activity']}".strip()
+    kind = change['change']
+    if kind == 'course_added':
+        return f"New: {label} section {change['section']}"
+    if kind == 'course_removed':
+        return f"Dropped: {label} section {change['section']}"
+    if kind == 'meeting_moved':
+        return f"Moved: {label} from {slot_text(change['old_slots'])}"
+    if kind == 'meeting_added':
+        return f"New meeting: {label}"
+    if kind == 'meeting_removed':
+        return f"Meeting removed: {label}"
+    what = 'Room' if kind == 'room_changed' else 'Staff'
+    return f"{what}: {label} {change['old'] or '(none)'} → {change['new'] or '(none)'}"
+
+
+# Grid cells to highlight for a list of changes: {(row, column): (cell kind, text)}, the
+# cells in the new schedule's table (rows are periods, columns days)
+def changed_cells(changes):
+    cells = {}
+    for change in changes:
+        kind = change['change']
+        text = change_text(change)
+        marks = []
+        if kind in ('course_added', 'meeting_added', 'meeting_moved'):
+            marks.append((CELL_ADDED, change['new_slots']))
+        if kind in ('room_changed', 'staff_changed'):
+            marks.append((CELL_CHANGED, change['new_slots']))
+        if kind in ('course_removed', 'meeting_removed', 'meeting_moved'):
+            marks.append((CELL_REMOVED, change['old_slots']))
+        for cell_kind, slots in marks:
+            for day, period in slots:
+                key = (period - 1, DAY_KEYS.index(day))
+                current = cells.get(key)
+                if current is None:
+                    cells[key] = (cell_kind, text)
+                else:
+                    first = min(current[0], cell_kind, key=CELL_KINDS.index)
+                    cells[key] = (first, f"{current[1]}\n{text}")
+    return cells
+
+
+def plural(count, noun):
+    return f"{count} {noun}" if count == 1 or noun == 'staff' else f"{count} {noun}s"
+
+
+# "1 course added", "8 courses removed", "2 staff changed"
+def count_text(count, kind):
+    noun, _, verb = kind.partition('_')
+    return f"{plural(count, noun)} {verb}"
+
+
+def change_summary(changes):
+    counts = Counter(change['change'] for change in changes)
+    return ", ".join(count_text(counts[kind], kind) for kind in CHANGE_KINDS if counts[kind])
+
+
+# One side of a comparison as {name: source}: a directory of PDFs named by their path inside
+# it, a single PDF, or a batch mode .jsonl whose records are already parsed schedules
+def side_entries(path, recursive=False):
+    from batch import iter_pdf_files
+
+    if os.path.isdir(path):
+        return {os.path.relpath(pdf_path, path): pdf_path for pdf_path in iter_pdf_files(path, recursive)}
+    if path.lower().endswith('.jsonl'):
+        entries = {}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    name = os.path.basename(record.get('file') or "") or record['student']['id']
+                    entries[name] = StudentSchedule.from_dict(record)
+        return entries
+    return {os.path.basename(path): path}
+
+
+# Student level outcome: status is 'changed', 'added', 'removed' or 'unchanged'
+class StudentDiff:
+    __slots__ = ('status', 'old_file', 'new_file', 'student', 'changes')
+
+    def __init__(self, status, old_file, new_file, student, changes=()):
+        self.status = status
+        self.old_file = old_file
+        self.new_file = new_file
+        self.student = student
+        self.changes = list(changes)
+
+    def to_record(self):
+        return {'status': self.status, 'old_file': self.old_file, 'new_file': self.new_file,
+                'student': self.student, 'changes': self.changes}
+
+    def csv_rows(self):
+        base = {'status': self.status, 'old_file': self.old_file, 'new_file': self.new_file,
+                'student_id': self.student.get('id', ""), 'student_name': self.student.get('name', "")}
+        if not self.changes:
+            yield base
+        for change in self.changes:
+            row = dict(base)
+            row.update(change)
+            for field in ('old_slots', 'new_slots'):
+                row[field] = "; ".join(f"{day} {period}" for day, period in change.get(field, ()))
+            yield row
+
+
+# Compares two sides. Entries are paired by name first; a PDF pair with the same content hash
+# is unchanged without being parsed, everything else is loaded from the parse cache or
+# parsed on a process pool. Entries left unpaired are then paired by student ID, so renamed
+# files still match. A pair whose schedules hash the same is unchanged; only the rest are
+# diffed course by course. Returns (student diffs, stats, failures).
+def compare_sides(old_entries, new_entries, workers=1):
+    from app_config import get_cohort_cache
+    from batch import load_schedules
+
+    start = time.perf_counter()
+    cache = get_cohort_cache()
+    if len(old_entries) == 1 and len(new_entries) == 1:
+        pairs = [(next(iter(old_entries)), next(iter(new_entries)))]
+    else:
+        pairs = [(name, name) for name in sorted(old_entries.keys() & new_entries.keys())]
+    paired_old = {old for old, _ in pairs}
+    paired_new = {new for _, new in pairs}
+
+    stats = Counter()
+    diffs = []
+    pending = []
+    for old_name, new_name in pairs:
+        old_source, new_source = old_entries[old_name], new_entries[new_name]
+        if isinstance(old_source, str) and isinstance(new_source, str):
+            try:
+                if cache.content_key(old_source) == cache.content_key(new_source):
+                    stats['unchanged'] += 1
+                    stats['same_file'] += 1
+                    continue
+            except OSError:
+                pass
+        pending.append((old_name, new_name))
+
+    skip_old = paired_old - {old for old, _ in pending}
+    skip_new = paired_new - {new for _, new in pending}
+    pdf_paths = [source for name, source in old_entries.items() if isinstance(source, str) and name not in skip_old]
+    pdf_paths += [source for name, source in new_entries.items() if isinstance(source, str) and name not in skip_new]
+    paths, schedules, failures = load_schedules(pdf_paths, workers)
+    loaded = dict(zip(paths, schedules))
+
+    def schedule_of(source):
+        return loaded.get(source) if isinstance(source, str) else source
+
+    def file_of(entries, name):
+        source = entries[name]
+        return source if isinstance(source, str) else name
+
+    # Renamed files: unpaired entries with the same student ID on both sides
+    unpaired_old = {}
+    for name in sorted(old_entries.keys() - paired_old):
+        schedule = schedule_of(old_entries[name])
+        if schedule is not None:
+            unpaired_old.setdefault(schedule.student_id or name, name)
+    for name in sorted(new_entries.keys() - paired_new):
+        schedule = schedule_of(new_entries[name])
+        if schedule is None:
+            continue
+        old_name = unpaired_old.pop(schedule.student_id or name, None)
+        if old_name is None:
+            diffs.append(StudentDiff('added', "", file_of(new_entries, name), schedule.student_dict()))
+        else:
+            pending.append((old_name, name))
+    for old_name in unpaired_old.values():
+        schedule = schedule_of(old_entries[old_name])
+        diffs.append(StudentDiff('removed', file_of(old_entries, old_name), "", schedule.student_dict()))
+
+    for old_name, new_name in pending:
+        old, new = schedule_of(old_entries[old_name]), schedule_of(new_entries[new_name])
+        if old is None or new is None:
+            continue
+        if schedule_digest(old) == schedule_digest(new):
+            stats['unchanged'] += 1
+            continue
+        changes = diff_schedules(old, new)
+        if not changes:
+            stats['unchanged'] += 1
+            continue
+        diffs.append(StudentDiff('changed', file_of(old_entries, old_name), file_of(new_entries, new_name),
+                                 new.student_dict(), changes))
+
+    for diff in diffs:
+        stats[diff.status] += 1
+        stats.update(change['change'] for change in diff.changes)
+    stats['compared'] = stats['unchanged'] + stats['changed']
+    stats['seconds'] = round(time.perf_counter() - start, 3)
+    return diffs, stats, failures
+
+
+def write_report(path, diffs):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            for diff in diffs:
+                writer.writerows(diff.csv_rows())
+        else:
+            for diff in diffs:
+                f.write(json.dumps(diff.to_record(), ensure_ascii=False))
+                f.write('\n')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='schedule.py diff',
+                                     description='Report what changed between two versions of schedules.')
+    parser.add_argument('old', help='earlier version: a schedule PDF, a directory of them or a batch .jsonl')
+    parser.add_argument('new', help='later version, in any of the same forms')
+    parser.add_argument('--out', help='also write the report to this file, .jsonl or .csv')
+    parser.add_argument('--workers', type=int, default=default_workers(), help='parallel worker processes')
+    parser.add_argument('--recursive', action='store_true', help='also scan subdirectories')
+    parser.add_argument('--quiet', action='store_true', help='only print the summary')
+    return parser
+
+
+def diff_main(argv):
+    args = build_parser().parse_args(argv)
+    for path in (args.old, args.new):
+        if not os.path.exists(path):
+            print(f"Not found: {path}", file=sys.stderr)
+            return 2
+    try:
+        old_entries = side_entries(args.old, args.recursive)
+        new_entries = side_entries(args.new, args.recursive)
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"Could not read {exc}", file=sys.stderr)
+        return 2
+
+    diffs, stats, failures = compare_sides(old_entries, new_entries, args.workers)
+    for path, error in failures:
+        print(f"FAIL {path}: {error}", file=sys.stderr)
+    if args.out:
+        write_report(args.out, diffs)
+
+    if not args.quiet:
+        for diff in diffs:
+            who = " ".join(part for part in (diff.student.get('id'), diff.student.get('name')) if part)
+            detail = f": {change_summary(diff.changes)}" if diff.changes else ""
+            print(f"{diff.status:<8} {who or diff.new_file or diff.old_file}{detail}")
+    kinds = ", ".join(count_text(stats[kind], kind) for kind in CHANGE_KINDS if stats[kind])
+    print(f"Compared {plural(stats['compared'], 'student')} in {stats['seconds']:.2f} s: {stats['changed']} changed, "
+          f"{stats['unchanged']} unchanged ({plural(stats['same_file'], 'identical file')}), {stats['added']} added, "
+          f"{stats['removed']} removed, {len(failures)} failed" + (f". {kinds}" if kinds else ""), file=sys.stderr)
+    if args.out:
+        print(f"Report written to {args.out}", file=sys.stderr)
+    logger.info(f"Schedule diff: {stats['changed']} changed, {stats['added']} added, {stats['removed']} removed")
+    return 1 if failures else 0
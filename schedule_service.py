@@ -0,0 +1,465 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from app_config import get_cohort_cache
+from batch import iter_pdf_files, parse_file, result_to_record
+from extraction import EXTRACTION_MODES, default_workers, process_pool
+from models import DAY_KEYS, DAYS, PERIOD_COUNT, PERIOD_LABELS, StudentSchedule, code_key, mask_to_periods
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_RESCAN_SECONDS = 30
+DEFAULT_RESPONSE_ENTRIES = 4096
+DEFAULT_RESPONSE_BYTES = 64 * 1024 * 1024
+MAX_HEADERS = 100
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# size/mtime of every PDF under a directory, to tell new, changed and removed files apart
+def snapshot_pdfs(directory, recursive=False):
+    snapshot = {}
+    for path in iter_pdf_files(directory, recursive):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        snapshot[path] = (st.st_size, st.st_mtime_ns)
+    return snapshot
+
+
+# Encoded JSON response bodies, least recently used dropped first once either limit is hit
+class ResponseCache:
+    def __init__(self, max_entries=DEFAULT_RESPONSE_ENTRIES, max_bytes=DEFAULT_RESPONSE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        body = self.entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old)
+        self.entries[key] = body
+        self.bytes += len(body)
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= len(evicted)
+
+    def stats(self):
+        return {'entries': len(self.entries), 'bytes': self.bytes, 'hits': self.hits, 'misses': self.misses}
+
+
+# Every loaded schedule plus the indexes the endpoints read: sections by course code and by
+# (day, period), each with its headcount, and the number of busy students per slot. The
+# indexes are updated as files are added and removed rather than rebuilt per query, and
+# 'generation' changes with every update so cached responses for older data stop matching.
+class ScheduleCorpus:
+    def __init__(self):
+        self.files = {}
+        self.students = {}
+        self.sections = {}
+        self.codes = {}
+        self.slot_sections = [[set() for _ in range(PERIOD_COUNT)] for _ in DAYS]
+        self.busy = [[0] * PERIOD_COUNT for _ in DAYS]
+        self.generation = 0
+
+    def add(self, path, key, schedule):
+        self.remove(path)
+        self.files[path] = (key, schedule)
+        if schedule.student_id:
+            self.students[schedule.student_id] = path
+        self._index(schedule, 1)
+        self.generation += 1
+
+    def remove(self, path):
+        entry = self.files.pop(path, None)
+        if entry is None:
+            return
+        schedule = entry[1]
+        if self.students.get(schedule.student_id) == path:
+            del self.students[schedule.student_id]
+            other = next((p for p, (_, s) in self.files.items() if s.student_id == schedule.student_id), None)
+            if other is not None:
+                self.students[schedule.student_id] = other
+        self._index(schedule, -1)
+        self.generation += 1
+
+    def _index(self, schedule, delta):
+        for day, mask in enumerate(schedule.occupancy().occupied):
+            for period in mask_to_periods(mask):
+                self.busy[day][period - 1] += delta
+        for course in schedule.courses:
+            key = (course.code, course.section, course.seq, course.activity)
+            entry = self.sections.get(key)
+            if entry is None:
+                if delta < 0:
+                    continue
+                self.sections[key] = entry = [course, 0]
+                self.codes.setdefault(code_key(course.code), set()).add(key)
+                for day, period in course.meetings():
+                    self.slot_sections[day][period - 1].add(key)
+            entry[1] += delta
+            if entry[1] <= 0:
+                del self.sections[key]
+                codes = self.codes[code_key(course.code)]
+                codes.discard(key)
+                if not codes:
+                    del self.codes[code_key(course.code)]
+                for day, period in entry[0].meetings():
+                    self.slot_sections[day][period - 1].discard(key)
+
+    def section_records(self, keys):
+        records = []
+        for key in sorted(keys):
+            course, students = self.sections[key]
+            record = course.to_dict()
+            record['students'] = students
+            records.append(record)
+        return records
+
+
+def _parse_day(text):
+    text = text.lower()
+    if text in DAY_KEYS:
+        return DAY_KEYS.index(text)
+    names = [name.lower() for name in DAYS]
+    if text in names:
+        return names.index(text)
+    raise HttpError(400, f"Unknown day {text!r}, expected one of {', '.join(DAY_KEYS)}")
+
+
+def _parse_period(text):
+    if not text.isdigit() or not 1 <= int(text) <= PERIOD_COUNT:
+        raise HttpError(400, f"Period must be a number from 1 to {PERIOD_COUNT}")
+    return int(text)
+
+
+# Read-only JSON API over the schedules of a directory. Files are loaded from the parse
+# cache or parsed on a process pool in the background, so the event loop only ever serves
+# requests and updates the in-memory corpus; the directory is rescanned for changes.
+#
+#   GET /status                     loading progress and response cache counters
+#   GET /students                   id, name and file of every loaded student
+#   GET /students/<id>              one student's schedule and clashes
+#   GET /courses/<code>             every section of a course with its meetings and headcount
+#   GET /slots                      busy students and sections per day and period
+#   GET /slots/<day>/<period>       sections meeting in one slot, e.g. /slots/mon/3
+class ScheduleService:
+    def __init__(self, directory, workers=None, mode='anchored', recursive=False,
+                 rescan=DEFAULT_RESCAN_SECONDS, response_cache=None):
+        self.directory = directory
+        self.workers = max(1, workers or default_workers())
+        self.mode = mode
+        self.recursive = recursive
+        self.rescan = rescan
+        self.corpus = ScheduleCorpus()
+        self.responses = response_cache or ResponseCache()
+        self.cache = get_cohort_cache()
+        self.snapshot = {}
+        self.failures = {}
+        self.pending = 0
+        self.requests = 0
+        self.pool = None
+        # The parse cache isn't thread safe; all its reads and writes go through this thread
+        self.io = None
+        self.limit = None
+
+    # ---- loading ----
+
+    def read_cached(self, path):
+        try:
+            return self.cache.content_key(path), self.cache.get(path)
+        except OSError:
+            return None, None
+
+    async def load_file(self, path):
+        loop = asyncio.get_running_loop()
+        async with self.limit:
+            try:
+                key, schedule = await loop.run_in_executor(self.io, self.read_cached, path)
+                if key is None:
+                    self.failures[path] = "file could not be read"
+                    return
+                if schedule is None:
+                    pool = self.pool
+                    try:
+                        _, record, error, elapsed_ms = await loop.run_in_executor(pool, parse_file, path, self.mode)
+                    except BrokenProcessPool:
+                        # A worker died (on a malformed PDF, say); later files get a new pool
+                        if pool is self.pool:
+                            logger.warning("Parse worker pool broke, starting a new one")
+                            self.pool = process_pool(self.workers)
+                        raise
+                    if error:
+                        self.failures[path] = error
+                        logger.warning(f"Could not parse {path}: {error}")
+                        return
+                    schedule = StudentSchedule.from_dict(record)
+                    await loop.run_in_executor(self.io, self.cache.put, path, schedule)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"Parsed {path} in {elapsed_ms:.1f} ms")
+                self.failures.pop(path, None)
+                self.corpus.add(path, key, schedule)
+            except Exception as exc:
+                # One unreadable file is reported under /status, the others still load
+                logger.exception(f"Could not load {path}")
+                self.failures[path] = f"{type(exc).__name__}: {exc}"
+            finally:
+                self.pending -= 1
+
+    # Loads new and changed files and drops removed ones
+    async def refresh(self):
+        loop = asyncio.get_running_loop()
+        snapshot = await loop.run_in_executor(self.io, snapshot_pdfs, self.directory, self.recursive)
+        for path in set(self.snapshot) - set(snapshot):
+            self.corpus.remove(path)
+            self.failures.pop(path, None)
+        changed = [path for path, stat in snapshot.items() if self.snapshot.get(path) != stat]
+        self.snapshot = snapshot
+        if not changed:
+            return
+        start = time.perf_counter()
+        self.pending += len(changed)
+        await asyncio.gather(*(self.load_file(path) for path in changed))
+        await loop.run_in_executor(self.io, self.cache.flush)
+        logger.info(f"Loaded {len(changed)} changed files in {time.perf_counter() - start:.2f} s, "
+                    f"{len(self.corpus.files)} schedules in memory")
+
+    async def keep_loaded(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                # A bad file or a parser error must not end the rescans; the last good data
+                # stays served and the next rescan tries again
+                logger.exception(f"Could not scan {self.directory}")
+            if self.rescan <= 0:
+                return
+            await asyncio.sleep(self.rescan)
+
+    # ---- endpoints ----
+
+    def status(self):
+        return {
+            'directory': self.directory,
+            'files': len(self.snapshot),
+            'loaded': len(self.corpus.files),
+            'pending': self.pending,
+            'failed': [{'file': path, 'error': error} for path, error in sorted(self.failures.items())],
+            'generation': self.corpus.generation,
+            'requests': self.requests,
+            'response_cache': self.responses.stats(),
+        }
+
+    def student_list(self):
+        students = [{'id': schedule.student_id, 'name': schedule.student_name, 'file': path}
+                    for path, (_, schedule) in self.corpus.files.items()]
+        students.sort(key=lambda s: (s['id'], s['file']))
+        return {'count': len(students), 'students': students}
+
+    def course(self, code):
+        keys = self.corpus.codes.get(code_key(code))
+        if not keys:
+            raise HttpError(404, f"No course {code!r} in the loaded schedules")
+        sections = self.corpus.section_records(keys)
+        return {'code': sections[0]['code'], 'name': sections[0]['name'], 'sections': sections,
+                'students': sum(section['students'] for section in sections)}
+
+    def slot_grid(self):
+        return {
+            'days': list(DAY_KEYS),
+            'periods': PERIOD_LABELS,
+            'students': len(self.corpus.files),
+            'busy': [list(row) for row in self.corpus.busy],
+            'sections': [[len(keys) for keys in row] for row in self.corpus.slot_sections],
+        }
+
+    def slot(self, day_text, period_text):
+        day = _parse_day(day_text)
+        period = _parse_period(period_text)
+        sections = self.corpus.section_records(self.corpus.slot_sections[day][period - 1])
+        sections.sort(key=lambda s: (s['building'], s['room'], s['code']))
+        return {'day': DAY_KEYS[day], 'period': period, 'time': PERIOD_LABELS[period - 1],
+                'busy_students': self.corpus.busy[day][period - 1], 'sections': sections}
+
+    # A student's response is cached under the content hash of their PDF, so it survives
+    # reloads of an unchanged file; the other responses span the corpus and are cached
+    # per generation
+    def respond(self, target):
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+        if len(parts) == 2 and parts[0] == 'students':
+            path = self.corpus.students.get(parts[1])
+            if path is None:
+                raise HttpError(404, f"No student {parts[1]!r} in the loaded schedules")
+            key, schedule = self.corpus.files[path]
+            cache_key = ('student', key, path)
+            build = lambda: result_to_record(path, schedule)
+        else:
+            if parts == ['status']:
+                return self.encode(self.status())
+            cache_key = (url.path, url.query, self.corpus.generation)
+            query = parse_qs(url.query)
+            if parts == ['students']:
+                build = self.student_list
+            elif len(parts) == 2 and parts[0] == 'courses':
+                build = lambda: self.course(parts[1])
+            elif parts == ['slots'] and not query:
+                build = self.slot_grid
+            elif parts == ['slots'] or (len(parts) == 3 and parts[0] == 'slots'):
+                day, period = parts[1:] if len(parts) == 3 else (query.get('day', [''])[0], query.get('period', [''])[0])
+                build = lambda: self.slot(day, period)
+            else:
+                raise HttpError(404, f"Unknown endpoint {url.path}")
+
+        body = self.responses.get(cache_key)
+        if body is None:
+            body = self.encode(build())
+            self.responses.put(cache_key, body)
+        return body
+
+    @staticmethod
+    def encode(data):
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    # ---- HTTP ----
+
+    # Minimal HTTP/1.1 with keep-alive: GET and HEAD only, request bodies are not read
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.send(writer, 400, self.encode({'error': 'Malformed request line'}), False)
+                    break
+                headers = {}
+                for _ in range(MAX_HEADERS):
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip().lower()
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection') != 'close'
+
+                self.requests += 1
+                start = time.perf_counter()
+                if method not in ('GET', 'HEAD'):
+                    status, body = 405, self.encode({'error': f"{method} is not supported"})
+                else:
+                    try:
+                        status, body = 200, self.respond(target)
+                    except HttpError as e:
+                        status, body = e.status, self.encode({'error': str(e)})
+                await self.send(writer, status, body, keep_alive, head=method == 'HEAD')
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"{method} {target} {status} {(time.perf_counter() - start) * 1000:.2f} ms")
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def send(writer, status, body, keep_alive, head=False):
+        header = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                  f"Content-Type: application/json; charset=utf-8\r\n"
+                  f"Content-Length: {len(body)}\r\n"
+                  f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode('latin-1')
+        writer.write(header if head else header + body)
+        await writer.drain()
+
+    async def run(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        loop = asyncio.get_running_loop()
+        self.pool = process_pool(self.workers)
+        self.io = ThreadPoolExecutor(max_workers=1, thread_name_prefix='parse-cache')
+        self.limit = asyncio.Semaphore(self.workers * 2)
+        stop = asyncio.Event()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, stop.set)
+        except (NotImplementedError, AttributeError, RuntimeError):
+            pass  # no signal handlers on Windows event loops
+
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        loader = asyncio.create_task(self.keep_loaded())
+        print(f"Serving schedules from {self.directory} on http://{host}:{port}/ "
+              f"({self.workers} parse workers, Ctrl+C to stop)", file=sys.stderr)
+        logger.info(f"Schedule service listening on {host}:{port}")
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            loader.cancel()
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.io.shutdown(wait=False)
+            logger.info(f"Schedule service stopped after {self.requests} requests")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='schedule.py serve',
+                                     description='Serve parsed schedules as read-only JSON over local HTTP.')
+    parser.add_argument('--dir', required=True, help='directory of schedule PDFs to serve')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'address to listen on (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--workers', type=int, default=default_workers(), help='parallel parse processes')
+    parser.add_argument('--mode', choices=EXTRACTION_MODES, default='anchored',
+                        help='table extraction mode (default: anchored)')
+    parser.add_argument('--recursive', action='store_true', help='also serve subdirectories')
+    parser.add_argument('--rescan', type=float, default=DEFAULT_RESCAN_SECONDS,
+                        help=f'seconds between directory rescans, 0 to load once (default: {DEFAULT_RESCAN_SECONDS})')
+    parser.add_argument('--cache-entries', type=int, default=DEFAULT_RESPONSE_ENTRIES,
+                        help=f'responses kept in memory (default: {DEFAULT_RESPONSE_ENTRIES})')
+    return parser
+
+
+def serve_main(argv):
+    args = build_parser().parse_args(argv)
+    if not os.path.isdir(args.dir):
+        print(f"Not a directory: {args.dir}", file=sys.stderr)
+        return 2
+    service = ScheduleService(args.dir, args.workers, args.mode, args.recursive, args.rescan,
+                              ResponseCache(max_entries=args.cache_entries))
+    try:
+        asyncio.run(service.run(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Could not start the service: {e}", file=sys.stderr)
+        return 1
+    return 0
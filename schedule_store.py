@@ -0,0 +1,269 @@
+import os
+import sqlite3
+import sys
+import time
+
+from models import DAY_KEYS, DAYS
+
+STORE_FILE = "schedules.sqlite3"
+SCHEMA_VERSION = 1
+
+# A course is the catalogue entry, a section one offering of it with its location and staff;
+# students enroll in sections and every section meets in (day, period) slots. day is 0-based
+# in DAYS order, period is 1-based.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY,
+    source_path TEXT NOT NULL UNIQUE,
+    student_id TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL DEFAULT '',
+    advisor TEXT NOT NULL DEFAULT '',
+    department TEXT NOT NULL DEFAULT '',
+    major TEXT NOT NULL DEFAULT '',
+    semester TEXT NOT NULL DEFAULT '',
+    imported_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS courses (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL DEFAULT '',
+    credits TEXT NOT NULL DEFAULT '',
+    ct TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    course_id INTEGER NOT NULL REFERENCES courses (id),
+    section TEXT NOT NULL,
+    seq TEXT NOT NULL,
+    activity TEXT NOT NULL,
+    building TEXT NOT NULL DEFAULT '',
+    room TEXT NOT NULL DEFAULT '',
+    staff TEXT NOT NULL DEFAULT '',
+    UNIQUE (course_id, section, seq, activity)
+);
+CREATE TABLE IF NOT EXISTS enrollments (
+    student_id INTEGER NOT NULL REFERENCES students (id) ON DELETE CASCADE,
+    section_id INTEGER NOT NULL REFERENCES sections (id),
+    PRIMARY KEY (student_id, section_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meetings (
+    section_id INTEGER NOT NULL REFERENCES sections (id),
+    day INTEGER NOT NULL,
+    period INTEGER NOT NULL,
+    PRIMARY KEY (section_id, day, period)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_students_student_id ON students (student_id);
+CREATE INDEX IF NOT EXISTS idx_sections_location ON sections (building, room);
+CREATE INDEX IF NOT EXISTS idx_sections_staff ON sections (staff);
+CREATE INDEX IF NOT EXISTS idx_enrollments_section ON enrollments (section_id);
+CREATE INDEX IF NOT EXISTS idx_meetings_slot ON meetings (day, period);
+"""
+
+
+# Day index from 'tue', 'Tuesday' or '2'
+def parse_day(text):
+    text = str(text).strip().lower()
+    if text.isdigit() and int(text) < len(DAYS):
+        return int(text)
+    for day, (key, name) in enumerate(zip(DAY_KEYS, DAYS)):
+        if text in (key, name.lower()):
+            return day
+    raise ValueError(f"Unknown day: {text}")
+
+
+# Local SQLite store of parsed schedules for queries across many students.
+# A student is identified by the PDF it was parsed from; saving the same path again
+# replaces that student's enrollments. Sections take the location, staff and meeting
+# slots of the most recent schedule that lists them.
+class ScheduleStore:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise sqlite3.DatabaseError(f"Schedule store {path} has unsupported schema version {version}")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self.conn.close()
+
+    def save_schedule(self, pdf_path, schedule):
+        self.save_schedules([(pdf_path, schedule)])
+
+    # Saves (pdf_path, StudentSchedule) pairs in a single transaction
+    def save_schedules(self, items):
+        now = time.time()
+        course_ids = {}
+        section_ids = {}
+        count = 0
+        with self.conn:
+            cur = self.conn.cursor()
+            for pdf_path, schedule in items:
+                student_id = self._save_student(cur, os.path.abspath(pdf_path), schedule, now)
+                enrollments = []
+                for course in schedule.courses:
+                    course_id = course_ids.get(course.code)
+                    if course_id is None:
+                        course_id = course_ids[course.code] = self._save_course(cur, course)
+                    key = (course_id, course.section, course.seq, course.activity)
+                    section_id = section_ids.get(key)
+                    if section_id is None:
+                        section_id = section_ids[key] = self._save_section(cur, key, course)
+                    enrollments.append((student_id, section_id))
+                cur.executemany("INSERT OR IGNORE INTO enrollments (student_id, section_id) VALUES (?, ?)",
+                                enrollments)
+                count += 1
+        return count
+
+    def _save_student(self, cur, source_path, schedule, now):
+        cur.execute(
+            "INSERT INTO students (source_path, student_id, name, advisor, department, major, semester, imported_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (source_path) DO UPDATE SET student_id = excluded.student_id, name = excluded.name, "
+            "advisor = excluded.advisor, department = excluded.department, major = excluded.major, "
+            "semester = excluded.semester, imported_at = excluded.imported_at",
+            (source_path, schedule.student_id, schedule.student_name, schedule.advisor, schedule.department,
+             schedule.major, schedule.semester, now))
+        student_id = cur.execute("SELECT id FROM students WHERE source_path = ?", (source_path,)).fetchone()[0]
+        cur.execute("DELETE FROM enrollments WHERE student_id = ?", (student_id,))
+        return student_id
+
+    def _save_course(self, cur, course):
+        cur.execute(
+            "INSERT INTO courses (code, name, credits, ct) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (code) DO UPDATE SET name = excluded.name, credits = excluded.credits, ct = excluded.ct",
+            (course.code, course.name, course.credits, course.ct))
+        return cur.execute("SELECT id FROM courses WHERE code = ?", (course.code,)).fetchone()[0]
+
+    def _save_section(self, cur, key, course):
+        cur.execute(
+            "INSERT INTO sections (course_id, section, seq, activity, building, room, staff) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (course_id, section, seq, activity) DO UPDATE SET building = excluded.building, "
+            "room = excluded.room, staff = excluded.staff",
+            (*key, course.building, course.room, course.staff))
+        section_id = cur.execute(
+            "SELECT id FROM sections WHERE course_id = ? AND section = ? AND seq = ? AND activity = ?", key
+        ).fetchone()[0]
+        cur.execute("DELETE FROM meetings WHERE section_id = ?", (section_id,))
+        cur.executemany("INSERT INTO meetings (section_id, day, period) VALUES (?, ?, ?)",
+                        [(section_id, day, period) for day, period in course.meetings()])
+        return section_id
+
+    def counts(self):
+        return {table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('students', 'courses', 'sections', 'enrollments', 'meetings')}
+
+    # Students enrolled in a course, optionally only one section of it
+    def students_in_section(self, code, section=None):
+        sql = ("SELECT st.student_id, st.name, c.code, s.section, s.activity, st.source_path "
+               "FROM courses c JOIN sections s ON s.course_id = c.id "
+               "JOIN enrollments e ON e.section_id = s.id JOIN students st ON st.id = e.student_id "
+               "WHERE c.code = ?")
+        params = [code]
+        if section is not None:
+            sql += " AND s.section = ?"
+            params.append(section)
+        return self.conn.execute(sql + " ORDER BY s.section, st.name", params).fetchall()
+
+    # Students with a class in a building (optionally a room) at one period of a day
+    def students_at(self, building, day, period, room=None):
+        sql = ("SELECT st.student_id, st.name, c.code, s.section, s.room "
+               "FROM meetings m JOIN sections s ON s.id = m.section_id JOIN courses c ON c.id = s.course_id "
+               "JOIN enrollments e ON e.section_id = s.id JOIN students st ON st.id = e.student_id "
+               "WHERE m.day = ? AND m.period = ? AND s.building = ?")
+        params = [day, period, building]
+        if room is not None:
+            sql += " AND s.room = ?"
+            params.append(room)
+        return self.conn.execute(sql + " ORDER BY s.room, c.code, st.name", params).fetchall()
+
+    # Sections taught by a staff member with their meeting slots
+    def staff_sections(self, staff):
+        return self.conn.execute(
+            "SELECT c.code, s.section, s.activity, s.building, s.room, "
+            "GROUP_CONCAT(m.day || ':' || m.period, ' ') "
+            "FROM sections s JOIN courses c ON c.id = s.course_id LEFT JOIN meetings m ON m.section_id = s.id "
+            "WHERE s.staff = ? GROUP BY s.id ORDER BY c.code, s.section", (staff,)).fetchall()
+
+
+def build_parser():
+    import argparse
+    from extraction import default_workers
+
+    parser = argparse.ArgumentParser(prog='schedule.py db', description='Query the local schedule store.')
+    parser.add_argument('--db', help='store file (default: schedules.sqlite3 in the config directory)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('import', help='parse PDFs (or use the parse cache) and add them to the store')
+    add.add_argument('paths', nargs='+', help='schedule PDFs or directories of them')
+    add.add_argument('--workers', type=int, default=default_workers(), help='parallel worker processes')
+    add.add_argument('--recursive', action='store_true', help='also scan subdirectories')
+
+    section = commands.add_parser('section', help='students in a course, or in one section of it')
+    section.add_argument('code', help="course code, e.g. 'CS 110'")
+    section.add_argument('section', nargs='?', help='section number')
+
+    room = commands.add_parser('room', help='students in a building at one period of a day')
+    room.add_argument('building')
+    room.add_argument('--day', required=True, type=parse_day, help="'tue', 'Tuesday' or a 0-based index")
+    room.add_argument('--period', required=True, type=int, help='period number, 1-15')
+    room.add_argument('--room', help='only this room')
+
+    staff = commands.add_parser('staff', help='sections taught by a staff member')
+    staff.add_argument('name')
+
+    commands.add_parser('stats', help='row counts of the store')
+    return parser
+
+
+def _import_paths(store, args):
+    from batch import iter_pdf_files, load_schedules
+
+    pdf_paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            pdf_paths.extend(iter_pdf_files(path, args.recursive))
+        else:
+            pdf_paths.append(path)
+    paths, schedules, failures = load_schedules(pdf_paths, args.workers)
+    for path, error in failures:
+        print(f"FAIL {path}: {error}", file=sys.stderr)
+    start = time.perf_counter()
+    saved = store.save_schedules(zip(paths, schedules))
+    print(f"Saved {saved} schedules in {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def store_main(argv):
+    from app_config import get_config_dir
+
+    args = build_parser().parse_args(argv)
+    store = ScheduleStore(args.db or os.path.join(get_config_dir(), STORE_FILE))
+    try:
+        if args.command == 'import':
+            return _import_paths(store, args)
+        start = time.perf_counter()
+        if args.command == 'section':
+            rows = store.students_in_section(args.code, args.section)
+        elif args.command == 'room':
+            rows = store.students_at(args.building, args.day, args.period, args.room)
+        elif args.command == 'staff':
+            rows = [(code, section, activity, building, room,
+                     ' '.join(f"{DAY_KEYS[int(day)]}{period}" for day, period in
+                              (slot.split(':') for slot in (slots or '').split())))
+                    for code, section, activity, building, room, slots in store.staff_sections(args.name)]
+        else:
+            rows = sorted(store.counts().items())
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for row in rows:
+            print('\t'.join(str(value) for value in row))
+        print(f"{len(rows)} rows in {elapsed_ms:.2f} ms", file=sys.stderr)
+        return 0
+    finally:
+        store.close()
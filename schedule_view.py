@@ -0,0 +1,297 @@
+import logging
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, QRectF, Signal
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QPainter, QPen
+from PySide6.QtWidgets import QStyledItemDelegate, QStyle
+
+from models import DAYS, PERIOD_COUNT, PERIOD_LABELS
+
+logger = logging.getLogger(__name__)
+
+COURSE_COLORS = [
+    "#3FA47A", "#2C3E91", "#C99820", "#8C2F39", "#5C3A8D",
+    "#287D82", "#C65D2E", "#364F6B", "#2E7D4F", "#A44A6E",
+    "#B1761B", "#3B7C88", "#633974"
+]
+
+CourseRole = Qt.ItemDataRole.UserRole + 1
+CourseIndexRole = Qt.ItemDataRole.UserRole + 2
+ConflictRole = Qt.ItemDataRole.UserRole + 3
+
+# Outline color and tag of a cell highlighted by a schedule diff, by cell kind
+CHANGE_STYLES = {
+    'added': ("#4CD964", "New slot"),
+    'changed': ("#FFB020", "Changed"),
+    'removed': ("#FF4D4D", "Was here"),
+}
+
+
+# Table model over a StudentSchedule: rows are periods, columns are days. A cell shows the
+# first course meeting in it; cells with more than one course are listed in conflicts.
+# Cells a schedule diff touched are kept in changes until the schedule is replaced.
+class ScheduleTableModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.schedule = None
+        self.occupancy = None
+        self.cells = {}
+        self.conflicts = {}
+        self.changes = {}
+        self.change_summary = ""
+
+    def set_schedule(self, schedule):
+        self.beginResetModel()
+        self._index(schedule)
+        self.changes = {}
+        self.change_summary = ""
+        self.endResetModel()
+
+    # Highlights the cells of a diff, {(row, column): (cell kind, text)} as built by
+    # schedule_diff.changed_cells; only the cells highlighted before or now are repainted
+    def set_changes(self, changes, summary=""):
+        keys = set(self.changes) | set(changes)
+        self.changes = dict(changes)
+        self.change_summary = summary
+        for row, column in sorted(keys):
+            index = self.index(row, column)
+            self.dataChanged.emit(index, index)
+
+    def change_at(self, row, column):
+        return self.changes.get((row, column))
+
+    def _index(self, schedule):
+        self.schedule = schedule
+        self.occupancy = None
+        self.cells = {}
+        self.conflicts = {}
+        if schedule is not None:
+            self.occupancy = schedule.occupancy()
+            for i, course in enumerate(schedule.courses):
+                for day, period in course.meetings():
+                    self.cells.setdefault((period - 1, day), i)
+            for day, period, indexes in self.occupancy.conflicts():
+                self.conflicts[(period - 1, day)] = indexes
+
+    # What a cell shows: its course, the course's color slot and any clashing courses
+    def _cell_state(self, key):
+        course_index = self.cells.get(key)
+        if course_index is None:
+            return None
+        courses = self.schedule.courses
+        return courses[course_index], course_index, tuple(courses[i] for i in self.conflicts.get(key, ()))
+
+    # Swaps in a new version of the schedule and only signals the cells whose content
+    # changed, so a reissued file repaints a few cells instead of resetting the view.
+    # Returns the changed (row, column) cells.
+    def update_schedule(self, schedule):
+        if self.schedule is None or schedule is None:
+            self.set_schedule(schedule)
+            return list(self.cells)
+        keys = set(self.cells)
+        before = {key: self._cell_state(key) for key in keys}
+        self._index(schedule)
+        keys.update(self.cells)
+        changed = sorted(key for key in keys if self._cell_state(key) != before.get(key))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Schedule update changed {len(changed)} cells: {changed}")
+        for row, column in changed:
+            index = self.index(row, column)
+            self.dataChanged.emit(index, index)
+        return changed
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else PERIOD_COUNT
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(DAYS)
+
+    def course_index_at(self, row, column):
+        return self.cells.get((row, column))
+
+    def course_at(self, row, column):
+        course_index = self.cells.get((row, column))
+        return None if course_index is None else self.schedule.courses[course_index]
+
+    # All courses meeting in a clashing cell, empty for every other cell
+    def conflicting_courses(self, row, column):
+        return [self.schedule.courses[i] for i in self.conflicts.get((row, column), ())]
+
+    # Codes of the courses clashing with the one shown in a cell
+    def clashing_codes(self, row, column):
+        shown = self.cells.get((row, column))
+        return [self.schedule.courses[i].code for i in self.conflicts.get((row, column), ()) if i != shown]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        key = (index.row(), index.column())
+        course_index = self.cells.get(key)
+        change = self.changes.get(key)
+        if course_index is None:
+            return change[1] if change is not None and role == Qt.ItemDataRole.ToolTipRole else None
+        course = self.schedule.courses[course_index]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return course.name
+        if role == Qt.ItemDataRole.ToolTipRole:
+            clashing = self.conflicting_courses(index.row(), index.column())
+            if clashing:
+                text = "Time conflict:\n" + "\n".join(f"{c.code} {c.name} ({c.activity})".strip() for c in clashing)
+            else:
+                text = "\n".join(part for part in (course.name, course.activity, course.location) if part)
+            return f"{text}\n\n{change[1]}" if change is not None else text
+        if role == CourseRole:
+            return course
+        if role == CourseIndexRole:
+            return course_index
+        if role == ConflictRole:
+            return self.conflicting_courses(index.row(), index.column())
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return DAYS[section]
+        return PERIOD_LABELS[section]
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled
+
+
+# Draws one course block: the rounded block in the course's palette color with its name,
+# activity and location (or what it clashes with), plus the details button when asked.
+# Needs no widgets, so the table delegate and the offscreen renderer share it.
+class CourseBlockPainter:
+    BUTTON_SIZE = 22
+    MARGIN = 5
+
+    def __init__(self):
+        self.colors = [QColor(color) for color in COURSE_COLORS]
+        self.name_font = QFont()
+        self.name_font.setPixelSize(14)
+        self.name_font.setBold(True)
+        self.small_font = QFont()
+        self.small_font.setPixelSize(11)
+        self.button_font = QFont()
+        self.button_font.setPixelSize(12)
+        self.button_font.setBold(True)
+        self.name_metrics = QFontMetrics(self.name_font)
+        self.small_metrics = QFontMetrics(self.small_font)
+        self.location_color = QColor("#E8E8E8")
+        self.button_fill = QColor(255, 255, 255, 38)
+        self.button_hover_fill = QColor(255, 255, 255, 89)
+        self.button_pen = QPen(QColor(255, 255, 255, 178), 1)
+        self.conflict_pen = QPen(QColor("#FF4D4D"), 3)
+        self.conflict_color = QColor("#FFD0D0")
+        self.tag_font = QFont()
+        self.tag_font.setPixelSize(10)
+        self.tag_font.setBold(True)
+        self.change_styles = {kind: (QColor(color), tag) for kind, (color, tag) in CHANGE_STYLES.items()}
+
+    def button_rect(self, cell_rect):
+        size = self.BUTTON_SIZE
+        return QRectF(cell_rect.right() - self.MARGIN - size, cell_rect.bottom() - self.MARGIN - size, size, size)
+
+    # Outline of a cell a schedule diff touched, with its tag in the bottom left corner where
+    # the text never reaches
+    def paint_change(self, painter, block, kind, dashed=False):
+        color, tag = self.change_styles[kind]
+        pen = QPen(color, 3)
+        if dashed:
+            pen.setStyle(Qt.PenStyle.DashLine)
+        painter.setPen(pen)
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawRoundedRect(block.adjusted(1, 1, -1, -1), 7, 7)
+        painter.setFont(self.tag_font)
+        painter.setPen(color)
+        painter.drawText(block.adjusted(8, 3, -8, -7), Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignBottom, tag)
+
+    # An empty cell a meeting moved out of or was dropped from
+    def paint_removed(self, painter, rect, text):
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        block = QRectF(rect).adjusted(2, 2, -2, -2)
+        self.paint_change(painter, block, 'removed', dashed=True)
+        painter.setFont(self.small_font)
+        painter.drawText(block.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN),
+                         Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWordWrap, text.split("\n")[0])
+        painter.restore()
+
+    # clashes_with lists the codes of the other courses in the cell; button is None for no
+    # details button, else whether it is hovered; change is the cell's (kind, text) from a
+    # schedule diff, if any
+    def paint(self, painter, rect, course, course_index, clashes_with=None, button=None, change=None):
+        clashing = bool(clashes_with)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        block = QRectF(rect).adjusted(2, 2, -2, -2)
+        painter.setPen(self.conflict_pen if clashing else Qt.PenStyle.NoPen)
+        painter.setBrush(self.colors[course_index % len(self.colors)])
+        painter.drawRoundedRect(block, 8, 8)
+
+        bottom_margin = self.MARGIN + (self.BUTTON_SIZE if button is not None else 0)
+        content = block.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -bottom_margin)
+        flags = Qt.AlignmentFlag.AlignHCenter | Qt.TextFlag.TextWordWrap
+        name_height = min(self.name_metrics.boundingRect(content.toRect(), flags, course.name).height(),
+                          content.height())
+        line_height = self.small_metrics.height()
+        top = content.top() + max(0.0, (content.height() - name_height - 2 * line_height) / 2)
+
+        painter.setPen(Qt.GlobalColor.white)
+        painter.setFont(self.name_font)
+        painter.drawText(QRectF(content.left(), top, content.width(), name_height), flags, course.name)
+        top += name_height
+        painter.setFont(self.small_font)
+        painter.drawText(QRectF(content.left(), top, content.width(), line_height),
+                         Qt.AlignmentFlag.AlignHCenter, course.activity)
+        top += line_height
+        if clashing:
+            painter.setPen(self.conflict_color)
+            painter.drawText(QRectF(content.left(), top, content.width(), line_height),
+                             Qt.AlignmentFlag.AlignHCenter, f"Clashes with {', '.join(clashes_with)}")
+        else:
+            painter.setPen(self.location_color)
+            painter.drawText(QRectF(content.left(), top, content.width(), line_height),
+                             Qt.AlignmentFlag.AlignHCenter, course.location)
+
+        if button is not None:
+            button_rect = self.button_rect(block)
+            painter.setPen(self.button_pen)
+            painter.setBrush(self.button_hover_fill if button else self.button_fill)
+            painter.drawEllipse(button_rect)
+            painter.setPen(Qt.GlobalColor.white)
+            painter.setFont(self.button_font)
+            painter.drawText(button_rect, Qt.AlignmentFlag.AlignCenter, "i")
+        if change is not None:
+            self.paint_change(painter, block, change[0])
+        painter.restore()
+
+
+# Paints the color coded course blocks and handles clicks on their "i" button.
+# Courses are looked up on the model directly to skip a QVariant round trip per paint.
+class CourseBlockDelegate(QStyledItemDelegate):
+    details_requested = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.block_painter = CourseBlockPainter()
+
+    def paint(self, painter, option, index):
+        model = index.model()
+        course_index = model.course_index_at(index.row(), index.column())
+        change = model.change_at(index.row(), index.column())
+        if course_index is None:
+            super().paint(painter, option, index)
+            if change is not None:
+                self.block_painter.paint_removed(painter, option.rect, change[1])
+            return
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        self.block_painter.paint(painter, option.rect, model.schedule.courses[course_index], course_index,
+                                 model.clashing_codes(index.row(), index.column()), button=hovered, change=change)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            course = model.course_at(index.row(), index.column())
+            block = QRectF(option.rect).adjusted(2, 2, -2, -2)
+            if course is not None and self.block_painter.button_rect(block).contains(event.position()):
+                self.details_requested.emit(course)
+                return True
+        return super().editorEvent(event, model, option, index)
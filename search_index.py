@@ -0,0 +1,399 @@
+import argparse
+import heapq
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "search_index.json"
+INDEX_VERSION = 1
+DEFAULT_LIMIT = 50
+
+# Searchable fields of a course row. 'room' covers the building and the room, 'student'
+# the id and name of the student whose schedule lists the row.
+FIELDS = ('code', 'name', 'staff', 'room', 'student')
+# Words people type around what they are looking for ("CS 210 with Dr. Saleh")
+STOP_WORDS = frozenset({'dr', 'prof', 'mr', 'mrs', 'ms', 'with', 'and', 'by', 'in', 'the', 'taking'})
+
+EXACT_WEIGHT = 1.0
+# Term too short for typo matching, and how close a word's trigrams must be to count
+FUZZY_MIN_LENGTH = 3
+FUZZY_THRESHOLD = 0.4
+FUZZY_WEIGHT = 0.5
+
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return _WORD.findall(text.casefold())
+
+
+# Words of each field of one row; a course code is also indexed without its space, so
+# "cs210" and "CS 210" find the same rows
+def row_tokens(row, student):
+    _, code, name, _, _, building, room, staff = row
+    code_words = tokenize(code)
+    if len(code_words) > 1:
+        code_words.append("".join(code_words))
+    return {
+        'code': code_words,
+        'name': tokenize(name),
+        'staff': tokenize(staff),
+        'room': tokenize(building) + tokenize(room),
+        'student': tokenize(student[3]) + tokenize(student[4]),
+    }
+
+
+def trigrams(token):
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# Query words as (fields, word). "staff:saleh" searches one field; other words search them
+# all, minus stop words
+def parse_query(query):
+    terms = []
+    for word in query.split():
+        field, sep, value = word.partition(':')
+        if sep and field.lower() in FIELDS:
+            terms.extend(((field.lower(),), token) for token in tokenize(value))
+        else:
+            terms.extend((FIELDS, token) for token in tokenize(word) if token not in STOP_WORDS)
+    return terms
+
+
+# In-memory inverted index over the course rows of many parsed schedules.
+# Each field maps its words to the ids of the rows containing them, in id order since rows
+# are only ever appended. A query word matches a field's words exactly, by prefix (a binary
+# search in the field's sorted vocabulary) or, failing both for words of three letters or
+# more, by trigram similarity to catch typos. Every query word has to match a row; rows are
+# ranked by how closely they matched. Re-indexing or removing a file drops its rows in
+# place, and the index is compacted when it is saved.
+class SearchIndex:
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        # students: [path, size, mtime_ns, student id, student name], None once removed
+        self.students = []
+        self.student_ids = {}
+        self.student_rows = {}
+        # rows: (student index, code, name, section, activity, building, room, staff)
+        self.rows = []
+        self.removed_rows = 0
+        self.postings = {field: {} for field in FIELDS}
+        # Trigram -> words, per field; built on the first typo lookup in that field
+        self.trigrams = {}
+        self.vocab = {field: [] for field in FIELDS}
+        self.vocab_dirty = set()
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.rows) - self.removed_rows
+
+    @property
+    def student_count(self):
+        return len(self.student_ids)
+
+    # ---- building ----
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+            return st.st_size, st.st_mtime_ns
+        except OSError:
+            return 0, 0
+
+    # Whether the index already holds this file as it is on disk
+    def is_current(self, pdf_path):
+        path = os.path.abspath(pdf_path)
+        with self.lock:
+            index = self.student_ids.get(path)
+            return index is not None and tuple(self.students[index][1:3]) == self._stat(path)
+
+    def _add_token(self, field, token, row_id):
+        postings = self.postings[field]
+        rows = postings.get(token)
+        if rows is None:
+            postings[token] = [row_id]
+            self.vocab_dirty.add(field)
+            grams = self.trigrams.get(field)
+            if grams is not None:
+                for gram in trigrams(token):
+                    grams.setdefault(gram, []).append(token)
+        elif rows[-1] != row_id:
+            rows.append(row_id)
+
+    def _index_row(self, row_id):
+        row = self.rows[row_id]
+        for field, tokens in row_tokens(row, self.students[row[0]]).items():
+            for token in tokens:
+                self._add_token(field, token, row_id)
+
+    def add_schedule(self, pdf_path, schedule):
+        path = os.path.abspath(pdf_path)
+        size, mtime_ns = self._stat(path)
+        with self.lock:
+            self._remove(path)
+            student_index = len(self.students)
+            self.students.append([path, size, mtime_ns, schedule.student_id, schedule.student_name])
+            self.student_ids[path] = student_index
+            first = len(self.rows)
+            for course in schedule.courses:
+                self.rows.append((student_index, course.code, course.name, course.section, course.activity,
+                                  course.building, course.room, course.staff))
+                self._index_row(len(self.rows) - 1)
+            self.student_rows[student_index] = (first, len(self.rows))
+            self.dirty = True
+
+    def remove(self, pdf_path):
+        with self.lock:
+            return self._remove(os.path.abspath(pdf_path))
+
+    def _remove(self, path):
+        index = self.student_ids.pop(path, None)
+        if index is None:
+            return False
+        first, end = self.student_rows.pop(index)
+        for row_id in range(first, end):
+            self.rows[row_id] = None
+        self.removed_rows += end - first
+        self.students[index] = None
+        self.dirty = True
+        return True
+
+    # Drops removed rows and students, renumbering the rest
+    def compact(self):
+        with self.lock:
+            if not self.removed_rows and all(self.students):
+                return
+            students, rows = self.students, self.rows
+            self._reset()
+            new_index = {}
+            for old, student in enumerate(students):
+                if student is not None:
+                    new_index[old] = len(self.students)
+                    self.student_ids[student[0]] = len(self.students)
+                    self.students.append(student)
+            spans = {}
+            for row in rows:
+                if row is None:
+                    continue
+                student_index = new_index[row[0]]
+                self.rows.append((student_index, *row[1:]))
+                first, _ = spans.get(student_index, (len(self.rows) - 1, 0))
+                spans[student_index] = (first, len(self.rows))
+                self._index_row(len(self.rows) - 1)
+            self.student_rows = {index: spans.get(index, (0, 0)) for index in range(len(self.students))}
+            self.dirty = True
+
+    # ---- querying ----
+
+    def _sorted_vocab(self, field):
+        if field in self.vocab_dirty:
+            self.vocab[field] = sorted(self.postings[field])
+            self.vocab_dirty.discard(field)
+        return self.vocab[field]
+
+    def _trigram_index(self, field):
+        grams = self.trigrams.get(field)
+        if grams is None:
+            self.trigrams[field] = grams = {}
+            for token in self.postings[field]:
+                for gram in trigrams(token):
+                    grams.setdefault(gram, []).append(token)
+        return grams
+
+    # {token: weight} for the words of a field a query word matches
+    def _match_tokens(self, field, term):
+        vocab = self._sorted_vocab(field)
+        matched = {}
+        i = bisect_left(vocab, term)
+        while i < len(vocab) and vocab[i].startswith(term):
+            token = vocab[i]
+            matched[token] = EXACT_WEIGHT if token == term else 0.5 + 0.5 * len(term) / len(token)
+            i += 1
+        if not matched and len(term) >= FUZZY_MIN_LENGTH:
+            grams = trigrams(term)
+            index = self._trigram_index(field)
+            shared = {}
+            for gram in grams:
+                for token in index.get(gram, ()):
+                    shared[token] = shared.get(token, 0) + 1
+            for token, count in shared.items():
+                similarity = count / (len(grams) + len(token) - count)
+                if similarity >= FUZZY_THRESHOLD:
+                    matched[token] = FUZZY_WEIGHT * similarity
+        return matched
+
+    # {row id: weight} of the rows a query word matches in any of its fields
+    def _match_rows(self, fields, term):
+        rows = {}
+        for field in fields:
+            postings = self.postings[field]
+            for token, weight in self._match_tokens(field, term).items():
+                for row_id in postings[token]:
+                    if rows.get(row_id, 0.0) < weight:
+                        rows[row_id] = weight
+        return rows
+
+    # Best matching rows first as (hits, total matching rows, matching students); a hit is a
+    # dict of the student and course fields plus its score
+    def search(self, query, limit=DEFAULT_LIMIT):
+        terms = parse_query(query)
+        if not terms:
+            return [], 0, 0
+        with self.lock:
+            matches = sorted((self._match_rows(fields, term) for fields, term in terms), key=len)
+            scores = matches[0]
+            for rows in matches[1:]:
+                scores = {row_id: score + rows[row_id] for row_id, score in scores.items() if row_id in rows}
+                if not scores:
+                    break
+            live = {row_id: score for row_id, score in scores.items() if self.rows[row_id] is not None}
+            students = len({self.rows[row_id][0] for row_id in live})
+            # Ties go to the row indexed first
+            best = heapq.nlargest(limit, live, key=lambda row_id: (live[row_id], -row_id))
+            hits = [self._hit(row_id, live[row_id]) for row_id in best]
+        return hits, len(live), students
+
+    def _hit(self, row_id, score):
+        student_index, code, name, section, activity, building, room, staff = self.rows[row_id]
+        path, _, _, student_id, student_name = self.students[student_index]
+        return {
+            'score': round(score, 3), 'file': path, 'student_id': student_id, 'student_name': student_name,
+            'code': code, 'name': name, 'section': section, 'activity': activity,
+            'building': building, 'room': room, 'staff': staff,
+        }
+
+    # ---- persistence ----
+
+    # The postings are stored as they are so loading doesn't re-tokenize every row. The rows
+    # come from parsed schedules, so the index carries the parse caches' version and is
+    # dropped with them when the parser or a learned template changes.
+    def save(self, path=None):
+        from app_config import parse_cache_version
+
+        path = path or self.path
+        with self.lock:
+            self.compact()
+            data = {
+                'version': INDEX_VERSION,
+                'parser_version': parse_cache_version(),
+                'students': self.students,
+                'rows': self.rows,
+                'spans': [self.student_rows[i] for i in range(len(self.students))],
+                'postings': self.postings,
+            }
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, path)
+            self.dirty = False
+
+    @classmethod
+    def load(cls, path):
+        from app_config import parse_cache_version
+
+        index = cls(path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return index
+        except (json.JSONDecodeError, IOError, OSError):
+            logger.exception("Search index is unreadable, starting empty")
+            return index
+        if data.get('version') != INDEX_VERSION or data.get('parser_version') != parse_cache_version():
+            logger.info("Search index is from another version, starting empty")
+            return index
+
+        try:
+            index.students = data['students']
+            index.rows = data['rows']
+            index.student_rows = {i: tuple(span) for i, span in enumerate(data['spans'])}
+            index.postings = {field: data['postings'].get(field, {}) for field in FIELDS}
+        except (KeyError, TypeError, AttributeError):
+            logger.exception("Search index is malformed, starting empty")
+            return cls(path)
+        index.student_ids = {student[0]: i for i, student in enumerate(index.students)}
+        index.vocab_dirty = set(FIELDS)
+        return index
+
+
+def build_parser():
+    from extraction import default_workers
+
+    parser = argparse.ArgumentParser(prog='schedule.py search',
+                                     description='Search course codes, names, staff and rooms across schedules.')
+    parser.add_argument('query', nargs='*', help="words to find, e.g. 'cs 210 saleh' or 'staff:saleh room:wing'")
+    parser.add_argument('--add', nargs='+', metavar='PATH', help='index schedule PDFs or directories of them first')
+    parser.add_argument('--recursive', action='store_true', help='also index subdirectories')
+    parser.add_argument('--workers', type=int, default=default_workers(), help='parallel worker processes')
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help=f'rows to show (default: {DEFAULT_LIMIT})')
+    parser.add_argument('--json', action='store_true', help='print the hits as JSON lines')
+    parser.add_argument('--clear', action='store_true', help='empty the index first')
+    parser.add_argument('--index', help='index file (default: search_index.json in the config directory)')
+    return parser
+
+
+def _add_paths(index, args):
+    from batch import iter_pdf_files, load_schedules
+
+    pdf_paths = []
+    for path in args.add:
+        pdf_paths.extend(iter_pdf_files(path, args.recursive) if os.path.isdir(path) else [path])
+    stale = [path for path in pdf_paths if not index.is_current(path)]
+    start = time.perf_counter()
+    paths, schedules, failures = load_schedules(stale, args.workers)
+    for path, error in failures:
+        print(f"FAIL {path}: {error}", file=sys.stderr)
+    for path, schedule in zip(paths, schedules):
+        index.add_schedule(path, schedule)
+    index.save()
+    print(f"Indexed {len(paths)} schedules ({len(pdf_paths) - len(stale)} unchanged) in "
+          f"{time.perf_counter() - start:.2f} s: {index.student_count} students, {len(index)} course rows",
+          file=sys.stderr)
+    return failures
+
+
+def search_main(argv):
+    from app_config import get_config_dir
+
+    args = build_parser().parse_args(argv)
+    start = time.perf_counter()
+    index = SearchIndex.load(args.index or os.path.join(get_config_dir(), INDEX_FILE))
+    load_ms = (time.perf_counter() - start) * 1000
+    if args.clear:
+        index = SearchIndex(index.path)
+        index.save()
+    failures = _add_paths(index, args) if args.add else []
+    if not args.query:
+        if not args.add and not args.clear:
+            print(f"{index.student_count} students, {len(index)} course rows in {index.path} "
+                  f"(loaded in {load_ms:.1f} ms)", file=sys.stderr)
+        return 1 if failures else 0
+
+    start = time.perf_counter()
+    hits, total, students = index.search(" ".join(args.query), args.limit)
+    query_ms = (time.perf_counter() - start) * 1000
+    for hit in hits:
+        if args.json:
+            print(json.dumps(hit, ensure_ascii=False))
+        else:
+            location = " ".join(f"{hit['building']} {hit['room']}".split())
+            staff = " ".join(hit['staff'].split())
+            print(f"{hit['student_id']:<12} {hit['student_name'][:24]:<24} {hit['code']:<10} "
+                  f"sec {hit['section']:<4} {hit['activity'][:11]:<11} {location[:30]:<30} {staff}")
+    print(f"{total} matching rows for {students} students, showing {len(hits)} "
+          f"(query {query_ms:.2f} ms, index loaded in {load_ms:.1f} ms)", file=sys.stderr)
+    return 1 if failures else 0
@@ -0,0 +1,52 @@
+import sys
+import time
+from contextlib import contextmanager
+
+# Modules whose presence after startup means the cold start path pulled in more than it should
+HEAVY_MODULES = ['pdfplumber', 'pdfminer', 'PIL']
+
+
+# Records timed startup spans relative to process entry. Spans are always timed and passed
+# on to the span log as 'startup.<label>'; the console report is only printed when enabled.
+class StartupTrace:
+    def __init__(self, enabled=False, start=None, span_log=None):
+        self.enabled = enabled
+        self.start = time.perf_counter() if start is None else start
+        self.span_log = span_log
+        self.spans = []
+        self.reported = False
+
+    @contextmanager
+    def span(self, label):
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.spans.append((label, begin, end))
+            if self.span_log is not None:
+                self.span_log.record(f"startup.{label}", end - begin,
+                                     {'since_entry_ms': round((end - self.start) * 1000, 3)})
+
+    def mark(self, label):
+        now = time.perf_counter()
+        self.spans.append((label, now, now))
+        if self.span_log is not None:
+            self.span_log.record(f"startup.{label}", now - self.start)
+
+    def report(self, stream=None):
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        stream = stream or sys.stderr
+        print("Startup trace (ms since entry / duration):", file=stream)
+        for label, begin, end in self.spans:
+            offset = (begin - self.start) * 1000
+            duration = (end - begin) * 1000
+            if duration:
+                print(f"  {offset:9.1f}  {duration:9.1f}  {label}", file=stream)
+            else:
+                print(f"  {offset:9.1f}  {'':>9}  {label}", file=stream)
+        loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        print(f"  PDF stack loaded: {', '.join(loaded) if loaded else 'no'}", file=stream)
+        stream.flush()
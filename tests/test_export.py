@@ -0,0 +1,101 @@
+import io
+import os
+from datetime import date
+
+import pytest
+
+from batch import OutputPaths
+from export import _fold, _ics_text, calendar_settings, csv_rows, first_meeting_date, meeting_blocks, write_ics
+from models import Course, StudentSchedule
+
+
+def unfold(text):
+    return text.replace('\r\n ', '')
+
+
+def test_short_lines_are_not_folded():
+    assert _fold("SUMMARY:CS 110") == "SUMMARY:CS 110"
+    assert _fold("X" * 75) == "X" * 75
+
+
+def test_long_lines_fold_at_75_octets():
+    line = "DESCRIPTION:" + "a" * 200
+    folded = _fold(line)
+    parts = folded.split('\r\n')
+    assert len(parts[0].encode('utf-8')) == 75
+    assert all(part.startswith(' ') and len(part.encode('utf-8')) <= 75 for part in parts[1:])
+    assert unfold(folded) == line
+
+
+def test_folding_never_splits_a_utf8_sequence():
+    line = "SUMMARY:" + "مقرر" * 40
+    folded = _fold(line)
+    for part in folded.split('\r\n'):
+        assert len(part.encode('utf-8')) <= 75
+        part.encode('utf-8').decode('utf-8')
+    assert unfold(folded) == line
+
+
+def test_text_values_are_escaped():
+    assert _ics_text("a,b;c\\d\ne") == "a\\,b\\;c\\\\d\\ne"
+
+
+def test_meeting_blocks_join_consecutive_periods():
+    course = Course("CS 110", day_masks=(0b1011, 0, 1 << 14, 0, 0))
+    assert list(meeting_blocks(course)) == [(0, 1, 2), (0, 4, 4), (2, 15, 15)]
+
+
+def test_first_meeting_date_starts_on_or_after_the_term():
+    monday = date(2026, 9, 7)
+    assert first_meeting_date(monday, 1) == monday
+    assert first_meeting_date(monday, 0) == date(2026, 9, 13)
+
+
+def test_calendar_has_one_event_per_block():
+    settings = calendar_settings(term_start=date(2026, 9, 6), weeks=10)
+    schedule = StudentSchedule(student_id="1", courses=[
+        Course("CS 110", "Programming " * 10, section="3", day_masks=(0b11, 0, 0b11, 0, 0),
+               building="B1", room="12")])
+    out = io.StringIO(newline='')
+    write_ics(out, schedule, settings)
+    text = out.getvalue()
+    assert all(len(line.encode('utf-8')) <= 75 for line in text.split('\r\n'))
+    lines = unfold(text).split('\r\n')
+    assert lines.count('BEGIN:VEVENT') == 2
+    assert 'DTSTART:20260906T070000' in lines
+    assert 'RRULE:FREQ=WEEKLY;COUNT=10' in lines
+    assert 'LOCATION:B1 12' in lines
+
+
+def test_wrapped_cells_are_written_on_one_line():
+    settings = calendar_settings(term_start=date(2026, 9, 6), weeks=10)
+    schedule = StudentSchedule(student_id="1", courses=[
+        Course("CS 110", "Intro to\nProgramming", day_masks=(0b1, 0, 0, 0, 0), building="Wing 6 - Ground\nFloor",
+               room="616,617\n618", staff="Dr\nX")])
+    out = io.StringIO(newline='')
+    write_ics(out, schedule, settings)
+    lines = unfold(out.getvalue()).split('\r\n')
+    assert 'SUMMARY:CS 110 Intro to Programming' in lines
+    assert 'LOCATION:Wing 6 - Ground Floor 616\\,617 618' in lines
+    assert 'DESCRIPTION:Staff: Dr X' in lines
+    row = next(csv_rows(schedule, settings))
+    assert (row['name'], row['building'], row['room'], row['staff']) == (
+        "Intro to Programming", "Wing 6 - Ground Floor", "616,617 618", "Dr X")
+
+
+def test_output_paths_mirror_subfolders(tmp_path):
+    root = tmp_path / "in"
+    targets = OutputPaths(str(tmp_path / "out"), '.ics')
+    first = targets.target(str(root / "s1" / "x.pdf"), str(root))
+    second = targets.target(str(root / "s2" / "x.pdf"), str(root))
+    assert first != second
+    assert first == os.path.join(str(tmp_path / "out"), "s1", "x.ics")
+    assert (tmp_path / "out" / "s2").is_dir()
+
+
+def test_output_paths_refuse_a_second_writer(tmp_path):
+    targets = OutputPaths(str(tmp_path / "out"), '.png')
+    targets.target(str(tmp_path / "a" / "x.pdf"))
+    assert targets.target(str(tmp_path / "a" / "x.pdf")).endswith("x.png")
+    with pytest.raises(ValueError):
+        targets.target(str(tmp_path / "b" / "x.pdf"))
@@ -0,0 +1,45 @@
+from models import ALL_PERIODS, Course, Occupancy, StudentSchedule, mask_to_periods, parse_periods
+
+
+def course(code, **periods):
+    days = ('sun', 'mon', 'tue', 'wed', 'thu')
+    return Course(code, day_masks=tuple(parse_periods(periods.get(day, "")) for day in days))
+
+
+def test_parse_periods_ignores_junk():
+    assert parse_periods("1, 2,15") == 0b100000000000011
+    assert parse_periods("0,16,x,") == 0
+    assert mask_to_periods(parse_periods("3,1")) == [1, 3]
+
+
+def test_occupied_and_free_slots():
+    occupancy = Occupancy([course("CS 110", sun="1,2"), course("MATH 101", sun="4", tue="1")])
+    assert occupancy.is_occupied(0, 1) and occupancy.is_occupied(0, 4) and occupancy.is_occupied(2, 1)
+    assert not occupancy.is_occupied(0, 3)
+    assert occupancy.free_periods(0) == [3] + list(range(5, 16))
+    assert occupancy.free_mask(1) == ALL_PERIODS
+    assert not occupancy.has_conflicts
+    assert list(occupancy.conflicts()) == []
+
+
+def test_clashes_are_found_per_slot():
+    courses = [course("CS 110", mon="2,3"), course("MATH 101", mon="3,4"), course("PHYS 101", mon="3", thu="3")]
+    occupancy = Occupancy(courses)
+    assert occupancy.has_conflicts
+    assert occupancy.is_conflict(1, 3)
+    assert not occupancy.is_conflict(1, 2) and not occupancy.is_conflict(4, 3)
+    assert list(occupancy.conflicts()) == [(1, 3, [0, 1, 2])]
+    assert occupancy.courses_at(1, 4) == [1]
+
+
+def test_schedule_conflicts_as_plain_data():
+    schedule = StudentSchedule(courses=[course("CS 110", wed="5"), course("ENGL 101", wed="5,6")])
+    assert schedule.conflicts() == [{'day': 'wed', 'period': 5, 'courses': ['CS 110', 'ENGL 101']}]
+
+
+def test_schedule_round_trips_through_dicts():
+    schedule = StudentSchedule(student_id="42", student_name="A STUDENT",
+                               courses=[Course("CS 110", "Programming", section="3", activity="Lab",
+                                               day_masks=(0b11, 0, 0b100, 0, 0), building="B1", room="12",
+                                               staff="Dr X")])
+    assert StudentSchedule.from_dict(schedule.to_dict()) == schedule
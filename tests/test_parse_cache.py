@@ -0,0 +1,114 @@
+import json
+import os
+
+from parse_cache import INDEX_FILE, ParseCache
+
+
+def write_pdf(path, text):
+    path.write_bytes(text.encode('utf-8'))
+    return str(path)
+
+
+def index_on_disk(cache):
+    with open(os.path.join(cache.cache_dir, INDEX_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_put_and_get_round_trip(tmp_path):
+    cache = ParseCache(str(tmp_path), 1)
+    pdf = write_pdf(tmp_path / "a.pdf", "first")
+    assert cache.get(pdf) is None
+    cache.put(pdf, {'courses': [1, 2]})
+    assert cache.has(pdf)
+    assert cache.get(pdf) == {'courses': [1, 2]}
+    assert ParseCache(str(tmp_path), 1).get(pdf) == {'courses': [1, 2]}
+
+
+def test_changed_file_misses(tmp_path):
+    cache = ParseCache(str(tmp_path), 1)
+    pdf = write_pdf(tmp_path / "a.pdf", "first")
+    cache.put(pdf, "old")
+    write_pdf(tmp_path / "a.pdf", "second version")
+    assert cache.get(pdf) is None
+
+
+def test_same_content_shares_an_entry(tmp_path):
+    cache = ParseCache(str(tmp_path), 1)
+    first = write_pdf(tmp_path / "a.pdf", "same")
+    second = write_pdf(tmp_path / "b.pdf", "same")
+    cache.put(first, "parsed")
+    assert cache.content_key(first) == cache.content_key(second)
+    assert cache.get(second) == "parsed"
+
+
+def test_parser_version_change_drops_everything(tmp_path):
+    pdf = write_pdf(tmp_path / "a.pdf", "first")
+    ParseCache(str(tmp_path), 1).put(pdf, "parsed")
+    cache = ParseCache(str(tmp_path), 2)
+    assert cache.get(pdf) is None
+    assert [name for name in os.listdir(cache.cache_dir) if name != INDEX_FILE] == []
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ParseCache(str(tmp_path), 1, max_entries=2)
+    a, b, c = (write_pdf(tmp_path / f"{name}.pdf", name) for name in "abc")
+    cache.put(a, "a")
+    cache.put(b, "b")
+    assert cache.get(a) == "a"
+    cache.put(c, "c")
+    assert cache.has(a) and cache.has(c)
+    assert not cache.has(b)
+    assert len(index_on_disk(cache)['entries']) == 2
+
+
+def test_size_limit_evicts(tmp_path):
+    cache = ParseCache(str(tmp_path), 1, max_bytes=30)
+    a, b = (write_pdf(tmp_path / f"{name}.pdf", name) for name in "ab")
+    cache.put(a, "x" * 20)
+    cache.put(b, "y" * 20)
+    assert not cache.has(a)
+    assert cache.get(b) == "y" * 20
+
+
+def test_hits_do_not_write_the_index(tmp_path):
+    cache = ParseCache(str(tmp_path), 1)
+    pdf = write_pdf(tmp_path / "a.pdf", "first")
+    cache.put(pdf, "parsed")
+    index_path = os.path.join(cache.cache_dir, INDEX_FILE)
+    os.remove(index_path)
+    assert cache.get(pdf) == "parsed"
+    assert not os.path.exists(index_path)
+    cache.flush()
+    assert os.path.exists(index_path)
+
+
+def test_without_autosave_the_index_waits_for_flush(tmp_path):
+    cache = ParseCache(str(tmp_path), 1, autosave=False)
+    pdf = write_pdf(tmp_path / "a.pdf", "first")
+    cache.put(pdf, "parsed")
+    assert not os.path.exists(os.path.join(cache.cache_dir, INDEX_FILE))
+    cache.flush()
+    assert ParseCache(str(tmp_path), 1).get(pdf) == "parsed"
+
+
+def test_unreadable_entry_is_dropped(tmp_path):
+    cache = ParseCache(str(tmp_path), 1)
+    pdf = write_pdf(tmp_path / "a.pdf", "first")
+    cache.put(pdf, "parsed")
+    with open(cache._entry_path(cache.content_key(pdf)), 'w', encoding='utf-8') as f:
+        f.write("{not json")
+    assert cache.get(pdf) is None
+    assert not cache.has(pdf)
+
+
+def test_dropping_an_entry_waits_for_flush_without_autosave(tmp_path):
+    cache = ParseCache(str(tmp_path), 1, autosave=False)
+    pdf = write_pdf(tmp_path / "a.pdf", "first")
+    cache.put(pdf, "parsed")
+    cache.flush()
+    with open(cache._entry_path(cache.content_key(pdf)), 'w', encoding='utf-8') as f:
+        f.write("{not json")
+    assert cache.get(pdf) is None
+    assert len(index_on_disk(cache)['entries']) == 1
+    cache.flush()
+    assert index_on_disk(cache)['entries'] == {}
@@ -0,0 +1,88 @@
+import itertools
+import random
+
+import pytest
+
+from models import Course, code_key, parse_periods
+from planner import (PRESETS, Preferences, course_parts, days_and_gaps, offerings_by_code, plan_schedules,
+                     week_mask)
+
+
+# Random offerings: every other course has labs, in sections of their own when separate_labs
+def offerings(courses, sections, seed, separate_labs=False):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(courses):
+        kinds = [('Theoretical', 2, 1, 0)]
+        if i % 2:
+            kinds.append(('Practical', 1, 2, 50 if separate_labs else 0))
+        for activity, meetings, length, first_section in kinds:
+            for section in range(1, sections + 1):
+                days = [0] * 5
+                start = rng.randint(1, 14 - length)
+                for day in rng.sample(range(5), meetings):
+                    days[day] = parse_periods(",".join(str(p) for p in range(start, start + length)))
+                rows.append(Course(f"C {101 + i}", section=str(first_section + section), activity=activity,
+                                   day_masks=tuple(days)))
+    return rows
+
+
+# Every conflict-free combination of the course parts, scored from scratch
+def brute_force_scores(rows, codes, prefs):
+    by_code = offerings_by_code(rows)
+    parts = [part for code in codes for part in course_parts(by_code[code_key(code)], prefs.forbidden_mask())]
+    scores = []
+    for combo in itertools.product(*parts):
+        mask = 0
+        for choice in combo:
+            if mask & choice.mask:
+                break
+            mask |= choice.mask
+        else:
+            days, gaps = days_and_gaps(mask)
+            early = (mask & prefs.early_mask()).bit_count()
+            scores.append(prefs.day_weight * days + prefs.gap_weight * gaps + prefs.early_weight * early)
+    return sorted(scores)
+
+
+def test_days_and_gaps():
+    mask = week_mask((parse_periods("1,4"), 0, parse_periods("2,3"), 0, 0))
+    assert days_and_gaps(mask) == (2, 2)
+
+
+def test_lab_sections_pair_with_lectures():
+    rows = offerings(2, 3, 0, separate_labs=True)
+    parts = course_parts(offerings_by_code(rows)["C102"])
+    assert [len(part) for part in parts] == [3, 3]
+    combined = course_parts(offerings_by_code(offerings(2, 3, 0))["C102"])
+    assert len(combined) == 1
+    assert all(len(choice.rows) == 2 for choice in combined[0])
+
+
+@pytest.mark.parametrize("separate_labs", [False, True])
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("prefer", sorted(PRESETS))
+def test_pruned_search_matches_brute_force(prefer, seed, separate_labs):
+    rows = offerings(4, 4, seed, separate_labs)
+    codes = sorted({row.code for row in rows})
+    prefs = Preferences.preset(prefer, earliest=2 if seed % 2 else 1, free_days=(4,) if seed == 1 else ())
+    expected = brute_force_scores(rows, codes, prefs)
+    assert expected
+
+    every, _ = plan_schedules(rows, codes, prefs, top=0)
+    assert [plan.score for plan in every] == expected
+
+    best, stats = plan_schedules(rows, codes, prefs, top=5)
+    assert [plan.score for plan in best] == expected[:5]
+    assert stats['complete'] <= len(expected)
+    for plan in best:
+        assert plan.score == prefs.day_weight * plan.days + prefs.gap_weight * plan.gaps + prefs.early_weight * plan.early
+        assert (plan.days, plan.gaps) == days_and_gaps(plan.mask)
+
+
+def test_unknown_course_and_impossible_limits():
+    rows = offerings(2, 2, 0)
+    with pytest.raises(ValueError):
+        plan_schedules(rows, ["C 999"])
+    with pytest.raises(ValueError):
+        plan_schedules(rows, ["C 101"], Preferences(free_days=(0, 1, 2, 3, 4)))
@@ -0,0 +1,91 @@
+from models import Course, StudentSchedule, parse_periods
+from schedule_diff import (CELL_ADDED, CELL_CHANGED, CELL_REMOVED, change_summary, changed_cells, compare_sides,
+                           count_text, diff_schedules, schedule_digest)
+
+
+def course(code, section="1", activity="Lecture", room="101", staff="Dr X", **periods):
+    days = ('sun', 'mon', 'tue', 'wed', 'thu')
+    return Course(code, f"{code} name", section=section, activity=activity, building="B1", room=room, staff=staff,
+                  day_masks=tuple(parse_periods(periods.get(day, "")) for day in days))
+
+
+def schedule(student_id, *courses):
+    return StudentSchedule(student_id=student_id, student_name=f"STUDENT {student_id}", courses=list(courses))
+
+
+def kinds(changes):
+    return [(change['change'], change['code'], change['section']) for change in changes]
+
+
+def test_courses_match_by_code_section_and_activity():
+    old = schedule("1", course("CS 110", sun="1"), course("CS 110", activity="Lab", tue="3,4"))
+    new = schedule("1", course("CS 110", section="2", sun="1"), course("CS 110", activity="Lab", tue="3,4"))
+    assert kinds(diff_schedules(old, new)) == [('course_removed', 'CS 110', '1'), ('course_added', 'CS 110', '2')]
+
+
+def test_meetings_added_removed_and_moved():
+    old = schedule("1", course("A 1", sun="1"), course("B 1", mon="2,3"), course("C 1", tue="5"))
+    new = schedule("1", course("A 1", sun="1", wed="1"), course("B 1", mon="2"), course("C 1", thu="6"))
+    changes = diff_schedules(old, new)
+    assert kinds(changes) == [('meeting_added', 'A 1', '1'), ('meeting_removed', 'B 1', '1'),
+                              ('meeting_moved', 'C 1', '1')]
+    assert changes[0]['new_slots'] == [['wed', 1]]
+    assert changes[1]['old_slots'] == [['mon', 3]]
+    assert (changes[2]['old_slots'], changes[2]['new_slots']) == ([['tue', 5]], [['thu', 6]])
+
+
+def test_room_and_staff_changes_on_shared_meetings():
+    old = schedule("1", course("A 1", room="101", staff="Dr X", sun="1,2"))
+    new = schedule("1", course("A 1", room="202", staff="Dr  X", sun="1,2"))
+    changes = diff_schedules(old, new)
+    assert [(c['change'], c['old'], c['new'], c['new_slots']) for c in changes] == [
+        ('room_changed', 'B1 101', 'B1 202', [['sun', 1], ['sun', 2]])]
+    new = schedule("1", course("A 1", staff="Dr Y", sun="1,2"))
+    assert kinds(diff_schedules(old, new)) == [('staff_changed', 'A 1', '1')]
+
+
+def test_reordered_rows_hash_the_same():
+    first = schedule("1", course("A 1", sun="1"), course("B 1", mon="2"))
+    second = schedule("1", course("B 1", mon="2"), course("A 1", sun="1"))
+    assert schedule_digest(first) == schedule_digest(second)
+    assert diff_schedules(first, second) == []
+
+
+def test_changed_cells_mark_the_grid():
+    old = schedule("1", course("A 1", tue="5"), course("B 1", sun="1"))
+    new = schedule("1", course("A 1", thu="6"), course("B 1", room="9", sun="1"), course("C 1", thu="6"))
+    cells = changed_cells(diff_schedules(old, new))
+    assert cells[(4, 2)][0] == CELL_REMOVED
+    assert cells[(0, 0)][0] == CELL_CHANGED
+    kind, text = cells[(5, 4)]
+    assert kind == CELL_ADDED
+    assert text.splitlines() == ["Moved: A 1 Lecture from Tue 5", "New: C 1 Lecture section 1"]
+
+
+def test_summary_counts_are_pluralized():
+    assert count_text(1, 'course_added') == "1 course added"
+    assert count_text(8, 'course_removed') == "8 courses removed"
+    assert count_text(2, 'staff_changed') == "2 staff changed"
+    changes = [{'change': 'room_changed'}, {'change': 'course_added'}, {'change': 'room_changed'}]
+    assert change_summary(changes) == "1 course added, 2 rooms changed"
+
+
+def test_compare_sides_pairs_by_name_then_student_id():
+    old_entries = {
+        "a.pdf": schedule("1", course("A 1", sun="1")),
+        "b.pdf": schedule("2", course("B 1", mon="1")),
+        "old_name.pdf": schedule("3", course("C 1", tue="1")),
+        "gone.pdf": schedule("4", course("D 1", wed="1")),
+    }
+    new_entries = {
+        "a.pdf": schedule("1", course("A 1", sun="2")),
+        "b.pdf": schedule("2", course("B 1", mon="1")),
+        "renamed.pdf": schedule("3", course("C 1", room="7", tue="1")),
+        "new.pdf": schedule("5", course("E 1", thu="1")),
+    }
+    diffs, stats, failures = compare_sides(old_entries, new_entries)
+    assert failures == []
+    outcome = sorted((diff.status, diff.old_file, diff.new_file) for diff in diffs)
+    assert outcome == [('added', "", "new.pdf"), ('changed', "a.pdf", "a.pdf"),
+                       ('changed', "old_name.pdf", "renamed.pdf"), ('removed', "gone.pdf", "")]
+    assert (stats['compared'], stats['unchanged'], stats['meeting_moved'], stats['room_changed']) == (3, 1, 1, 1)
@@ -0,0 +1,103 @@
+import os
+
+from models import Course, StudentSchedule
+from search_index import SearchIndex, parse_query, trigrams
+
+
+def schedule(student_id, name, *courses):
+    return StudentSchedule(student_id=student_id, student_name=name,
+                           courses=[Course(code, title, section="1", building="B1", room=room, staff=staff)
+                                    for code, title, room, staff in courses])
+
+
+def build_index(tmp_path):
+    index = SearchIndex(str(tmp_path / "index.json"))
+    index.add_schedule(str(tmp_path / "a.pdf"), schedule("1001", "SARA ALI",
+                                                         ("CS 210", "Data Structures", "101", "Dr. Saleh"),
+                                                         ("MATH 101", "Calculus", "12", "Dr. Nasser")))
+    index.add_schedule(str(tmp_path / "b.pdf"), schedule("1002", "OMAR HADI",
+                                                         ("CS 211", "Algorithms", "102", "Dr. Salem"),
+                                                         ("PHYS 101", "Physics", "7", "Dr. Saleh")))
+    return index
+
+
+def codes(hits):
+    return [(hit['student_id'], hit['code']) for hit in hits]
+
+
+def test_query_words_and_field_filters():
+    assert parse_query("CS 210 with Dr. Saleh") == [
+        (('code', 'name', 'staff', 'room', 'student'), 'cs'),
+        (('code', 'name', 'staff', 'room', 'student'), '210'),
+        (('code', 'name', 'staff', 'room', 'student'), 'saleh')]
+    assert parse_query("staff:saleh") == [(('staff',), 'saleh')]
+    assert trigrams("cs") == {"$cs", "cs$"}
+
+
+def test_exact_words_must_all_match(tmp_path):
+    index = build_index(tmp_path)
+    hits, total, students = index.search("saleh")
+    assert total == 2 and students == 2
+    hits, total, _ = index.search("cs 210 saleh")
+    assert codes(hits) == [("1001", "CS 210")] and total == 1
+    assert index.search("cs210")[0][0]['code'] == "CS 210"
+
+
+def test_prefix_matches_rank_below_exact_ones(tmp_path):
+    index = build_index(tmp_path)
+    hits, total, _ = index.search("sal")
+    assert total == 3
+    assert all(0.5 < hit['score'] < 1.0 for hit in hits)
+    hits, _, _ = index.search("cs 21")
+    assert sorted(codes(hits)) == [("1001", "CS 210"), ("1002", "CS 211")]
+    hits, _, _ = index.search("salem")
+    assert codes(hits) == [("1002", "CS 211")]
+    assert hits[0]['score'] == 1.0
+
+
+def test_typos_fall_back_to_trigrams(tmp_path):
+    index = build_index(tmp_path)
+    hits, _, _ = index.search("staff:nasr")
+    assert codes(hits) == []
+    hits, _, _ = index.search("calculsu")
+    assert codes(hits) == [("1001", "MATH 101")]
+    assert 0 < hits[0]['score'] < 0.5
+    assert index.search("algoritms")[0][0]['code'] == "CS 211"
+
+
+def test_field_filter_limits_the_search(tmp_path):
+    index = build_index(tmp_path)
+    assert codes(index.search("student:omar")[0]) == [("1002", "CS 211"), ("1002", "PHYS 101")]
+    assert index.search("staff:calculus")[1] == 0
+
+
+def test_reindexing_and_removing_a_file(tmp_path):
+    index = build_index(tmp_path)
+    index.add_schedule(str(tmp_path / "a.pdf"), schedule("1001", "SARA ALI",
+                                                         ("ENGL 101", "English", "5", "Dr. Hana")))
+    assert index.search("saleh")[1] == 1
+    assert index.search("english")[1] == 1
+    assert index.remove(str(tmp_path / "b.pdf"))
+    assert len(index) == 1 and index.student_count == 1
+    assert index.search("algorithms")[1] == 0
+
+
+def test_save_and_load_keep_the_results(tmp_path):
+    index = build_index(tmp_path)
+    index.remove(str(tmp_path / "a.pdf"))
+    index.save()
+    loaded = SearchIndex.load(index.path)
+    assert len(loaded) == 2
+    assert codes(loaded.search("physcs")[0]) == [("1002", "PHYS 101")]
+    assert codes(loaded.search("cs 21")[0]) == [("1002", "CS 211")]
+
+
+def test_learning_a_template_drops_the_saved_index(tmp_path):
+    from app_config import get_config_dir
+    from layout_templates import TEMPLATES_FILE
+
+    index = build_index(tmp_path)
+    index.save()
+    with open(os.path.join(get_config_dir(), TEMPLATES_FILE), 'w', encoding='utf-8') as f:
+        f.write('{"templates": []}')
+    assert len(SearchIndex.load(index.path)) == 0
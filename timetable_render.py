@@ -0,0 +1,268 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+from extraction import EXTRACTION_MODES, default_workers, extract_from_pdf
+from models import DAY_KEYS, DAYS, PERIOD_COUNT, PERIOD_LABELS
+
+logger = logging.getLogger(__name__)
+
+RENDER_FORMATS = ('png', 'pdf')
+DEFAULT_SIZE = (1600, 1100)
+
+# Same colors as the window's style sheet
+BACKGROUND = "#1e1e1e"
+HEADER_BACKGROUND = "#2d2d2d"
+GRID_COLOR = "#444444"
+CONFLICT_TEXT = "#FF6B6B"
+
+
+# QPainter needs a QGuiApplication; without a display the offscreen platform is used, and
+# no widgets are ever created
+def ensure_gui_app():
+    from PySide6.QtGui import QGuiApplication
+
+    app = QGuiApplication.instance()
+    if app is None:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        app = QGuiApplication([sys.argv[0]])
+    return app
+
+
+# Paints a schedule as the window shows it: the student details, then the day x period grid
+# with the same headers, palette and course blocks, minus the details buttons. One renderer
+# is reused for every schedule of a batch so fonts and colors are only set up once.
+class TimetableRenderer:
+    MARGIN = 20
+    HEADER_HEIGHT = 36
+    PERIOD_WIDTH = 80
+
+    def __init__(self, width=DEFAULT_SIZE[0], height=DEFAULT_SIZE[1]):
+        from PySide6.QtGui import QColor, QFont, QPen
+        from schedule_view import CourseBlockPainter, ScheduleTableModel
+
+        self.width = width
+        self.height = height
+        self.block_painter = CourseBlockPainter()
+        self.model = ScheduleTableModel()
+        self.background = QColor(BACKGROUND)
+        self.header_background = QColor(HEADER_BACKGROUND)
+        self.grid_pen = QPen(QColor(GRID_COLOR), 1)
+        self.conflict_color = QColor(CONFLICT_TEXT)
+        self.title_font = QFont()
+        self.title_font.setPixelSize(20)
+        self.title_font.setBold(True)
+        self.info_font = QFont()
+        self.info_font.setPixelSize(14)
+        self.header_font = QFont()
+        self.header_font.setPixelSize(14)
+
+    def info_lines(self, schedule):
+        title = schedule.student_name or "Schedule"
+        if schedule.student_id:
+            title += f" ({schedule.student_id})"
+        details = [f"{label}: {value}" for label, value in (
+            ('Major', schedule.major), ('Department', schedule.department), ('Advisor', schedule.advisor),
+            ('Semester', schedule.semester)) if value]
+        return title, "   ".join(details)
+
+    def draw(self, painter, schedule):
+        from PySide6.QtCore import QRectF, Qt
+
+        self.model.set_schedule(schedule)
+        painter.fillRect(QRectF(0, 0, self.width, self.height), self.background)
+
+        left = top = self.MARGIN
+        title, details = self.info_lines(schedule)
+        painter.setPen(Qt.GlobalColor.white)
+        painter.setFont(self.title_font)
+        painter.drawText(QRectF(left, top, self.width - 2 * left, 28), Qt.AlignmentFlag.AlignVCenter, title)
+        top += 30
+        painter.setFont(self.info_font)
+        painter.drawText(QRectF(left, top, self.width - 2 * left, 22), Qt.AlignmentFlag.AlignVCenter, details)
+        top += 24
+        clashes = schedule.conflicts()
+        if clashes:
+            slots = ", ".join(f"{' / '.join(clash['courses'])} {DAYS[DAY_KEYS.index(clash['day'])]} "
+                              f"{PERIOD_LABELS[clash['period'] - 1]}" for clash in clashes)
+            painter.setPen(self.conflict_color)
+            painter.drawText(QRectF(left, top, self.width - 2 * left, 22), Qt.AlignmentFlag.AlignVCenter,
+                             f"⚠ Time conflicts: {slots}")
+            top += 24
+        top += 6
+
+        grid_width = self.width - 2 * self.MARGIN - self.PERIOD_WIDTH
+        cell_width = grid_width / len(DAYS)
+        cell_height = (self.height - top - self.MARGIN - self.HEADER_HEIGHT) / PERIOD_COUNT
+        grid_left = left + self.PERIOD_WIDTH
+        grid_top = top + self.HEADER_HEIGHT
+
+        painter.setFont(self.header_font)
+        painter.fillRect(QRectF(left, top, self.width - 2 * left, self.HEADER_HEIGHT), self.header_background)
+        painter.fillRect(QRectF(left, grid_top, self.PERIOD_WIDTH, cell_height * PERIOD_COUNT),
+                         self.header_background)
+        painter.setPen(Qt.GlobalColor.white)
+        for day, name in enumerate(DAYS):
+            painter.drawText(QRectF(grid_left + day * cell_width, top, cell_width, self.HEADER_HEIGHT),
+                             Qt.AlignmentFlag.AlignCenter, name)
+        for period, label in enumerate(PERIOD_LABELS):
+            painter.drawText(QRectF(left, grid_top + period * cell_height, self.PERIOD_WIDTH, cell_height),
+                             Qt.AlignmentFlag.AlignCenter, label)
+
+        painter.setPen(self.grid_pen)
+        for day in range(len(DAYS) + 1):
+            x = grid_left + day * cell_width
+            painter.drawLine(x, grid_top, x, grid_top + cell_height * PERIOD_COUNT)
+        for period in range(PERIOD_COUNT + 1):
+            y = grid_top + period * cell_height
+            painter.drawLine(grid_left, y, grid_left + grid_width, y)
+
+        for (row, column), course_index in self.model.cells.items():
+            rect = QRectF(grid_left + column * cell_width, grid_top + row * cell_height, cell_width, cell_height)
+            self.block_painter.paint(painter, rect, schedule.courses[course_index], course_index,
+                                     self.model.clashing_codes(row, column))
+
+    def render_image(self, schedule, path):
+        from PySide6.QtGui import QImage, QPainter
+
+        image = QImage(self.width, self.height, QImage.Format.Format_ARGB32_Premultiplied)
+        painter = QPainter(image)
+        try:
+            self.draw(painter, schedule)
+        finally:
+            painter.end()
+        if not image.save(path):
+            raise OSError(f"Could not write image {path}")
+
+    # One landscape A4 page, the timetable scaled to fit
+    def render_pdf(self, schedule, path):
+        from PySide6.QtGui import QPageLayout, QPageSize, QPainter, QPdfWriter
+
+        writer = QPdfWriter(path)
+        writer.setPageSize(QPageSize(QPageSize.PageSizeId.A4))
+        writer.setPageOrientation(QPageLayout.Orientation.Landscape)
+        writer.setResolution(150)
+        writer.setTitle(self.info_lines(schedule)[0])
+        painter = QPainter()
+        if not painter.begin(writer):
+            raise OSError(f"Could not write PDF {path}")
+        try:
+            scale = min(writer.width() / self.width, writer.height() / self.height)
+            painter.scale(scale, scale)
+            self.draw(painter, schedule)
+        finally:
+            painter.end()
+
+    def render(self, schedule, path):
+        if path.lower().endswith('.pdf'):
+            self.render_pdf(schedule, path)
+        else:
+            self.render_image(schedule, path)
+
+
+_renderer = None
+
+
+# Process pool initializer: every worker gets its own offscreen QGuiApplication
+def init_render_worker():
+    ensure_gui_app()
+
+
+# Process pool entry point: parses the PDF unless its schedule came from the parse cache,
+# then renders it. Returns the schedule so the caller can cache it, with parse and render
+# times in ms.
+def render_file(pdf_path, schedule, out_path, size=DEFAULT_SIZE, mode='anchored'):
+    global _renderer
+    parsed = schedule is None
+    error = None
+    parse_ms = render_ms = 0.0
+    try:
+        if parsed:
+            start = time.perf_counter()
+            schedule = extract_from_pdf(pdf_path, mode=mode)
+            parse_ms = (time.perf_counter() - start) * 1000
+            if not schedule:
+                error = "no schedule data found"
+        if schedule:
+            start = time.perf_counter()
+            if _renderer is None or (_renderer.width, _renderer.height) != tuple(size):
+                _renderer = TimetableRenderer(*size)
+            _renderer.render(schedule, out_path)
+            render_ms = (time.perf_counter() - start) * 1000
+    except Exception as exc:  # a worker must report every failure instead of dying
+        schedule = None
+        error = f"{type(exc).__name__}: {exc}"
+    return pdf_path, out_path, None if error else schedule, parsed, error, parse_ms, render_ms
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='schedule.py render',
+                                     description='Render printable timetables without opening the window.')
+    parser.add_argument('paths', nargs='+', help='schedule PDFs or directories of them')
+    parser.add_argument('--out', default='timetables', help='output directory (default: timetables)')
+    parser.add_argument('--format', choices=RENDER_FORMATS, default='png', help='png image or A4 pdf (default: png)')
+    parser.add_argument('--width', type=int, default=DEFAULT_SIZE[0], help='timetable width in pixels')
+    parser.add_argument('--height', type=int, default=DEFAULT_SIZE[1], help='timetable height in pixels')
+    parser.add_argument('--workers', type=int, default=default_workers(), help='parallel worker processes')
+    parser.add_argument('--mode', choices=EXTRACTION_MODES, default='anchored',
+                        help='table extraction mode for PDFs that are not cached (default: anchored)')
+    parser.add_argument('--recursive', action='store_true', help='also scan subdirectories')
+    parser.add_argument('--quiet', action='store_true', help='only report failures and the summary')
+    return parser
+
+
+def render_main(argv):
+    from app_config import get_cohort_cache
+    from batch import OutputPaths, iter_input_pdfs, run_pool
+
+    args = build_parser().parse_args(argv)
+    for path in args.paths:
+        if not os.path.exists(path):
+            print(f"Not found: {path}", file=sys.stderr)
+            return 2
+    os.makedirs(args.out, exist_ok=True)
+    size = (args.width, args.height)
+    cache = get_cohort_cache()
+
+    rendered = 0
+    failures = []
+    targets = OutputPaths(args.out, f".{args.format}")
+
+    # An input whose output would overwrite another one's is reported instead of rendered
+    def jobs():
+        for pdf_path, root in iter_input_pdfs(args.paths, args.recursive):
+            try:
+                out_path = targets.target(pdf_path, root)
+            except ValueError as e:
+                failures.append((pdf_path, str(e)))
+                print(f"FAIL {pdf_path}: {e}", file=sys.stderr)
+                continue
+            yield pdf_path, cache.get(pdf_path), out_path, size, args.mode
+
+    render_total = 0.0
+    start = time.perf_counter()
+    for pdf_path, out_path, schedule, parsed, error, parse_ms, render_ms in run_pool(
+            render_file, jobs(), args.workers, initializer=init_render_worker):
+        if error:
+            failures.append((pdf_path, error))
+            print(f"FAIL {pdf_path}: {error}", file=sys.stderr)
+            continue
+        if parsed:
+            cache.put(pdf_path, schedule)
+        rendered += 1
+        render_total += render_ms
+        if not args.quiet:
+            parse_note = f"parse {parse_ms:.1f} ms, " if parsed else "cached, "
+            print(f"ok   {pdf_path} -> {out_path} ({parse_note}render {render_ms:.1f} ms)", file=sys.stderr)
+    cache.flush()
+
+    total = time.perf_counter() - start
+    count = rendered + len(failures)
+    rate = count / total if total > 0 else 0.0
+    average = render_total / rendered if rendered else 0.0
+    print(f"Rendered {rendered} of {count} files in {total:.2f} s ({rate:.1f} files/s, "
+          f"{average:.1f} ms per render), {len(failures)} failed, output written to {args.out}", file=sys.stderr)
+    logger.info(f"Render finished: {rendered} rendered, {len(failures)} failed")
+    return 1 if failures else 0
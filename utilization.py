@@ -0,0 +1,221 @@
+import argparse
+import csv
+import html
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+from batch import iter_pdf_files, load_schedules
+from extraction import default_workers
+from models import DAYS, PERIOD_COUNT, PERIOD_LABELS
+
+logger = logging.getLogger(__name__)
+
+_PERIOD_BITS = np.arange(PERIOD_COUNT, dtype=np.uint16)
+SLOTS_PER_WEEK = len(DAYS) * PERIOD_COUNT
+
+
+# Every distinct section across the schedules, as columns. A section shared by many students
+# is kept once, with the number of students enrolled in it; sections without a building or
+# room are left out. Returns (rooms, room_index, masks, headcount): rooms is the sorted list
+# of (building, room) and room_index points into it for each section.
+def section_columns(schedules):
+    sections = {}
+    for schedule in schedules:
+        for course in schedule.courses:
+            if not (course.building or course.room):
+                continue
+            key = (course.code, course.section, course.seq, course.activity)
+            entry = sections.get(key)
+            if entry is None:
+                sections[key] = entry = [(course.building, course.room), course.day_masks, 0]
+            entry[2] += 1
+
+    rooms = sorted({location for location, _, _ in sections.values()})
+    room_ids = {location: i for i, location in enumerate(rooms)}
+    room_index = np.fromiter((room_ids[location] for location, _, _ in sections.values()), dtype=np.int64,
+                             count=len(sections))
+    masks = np.array([masks for _, masks, _ in sections.values()], dtype=np.uint16).reshape(len(sections), len(DAYS))
+    headcount = np.fromiter((count for _, _, count in sections.values()), dtype=np.int64, count=len(sections))
+    return rooms, room_index, masks, headcount
+
+
+# Sections and students per room and (day, period): two rooms x days x periods arrays.
+# More than one section in a slot means the room is double booked.
+class RoomUsage:
+    def __init__(self, rooms, sections, students):
+        self.rooms = rooms
+        self.sections = sections
+        self.students = students
+
+    @classmethod
+    def from_schedules(cls, schedules):
+        rooms, room_index, masks, headcount = section_columns(schedules)
+        meets = (masks[:, :, None] >> _PERIOD_BITS & 1).astype(bool)
+        section, day, period = np.nonzero(meets)
+        slot = (room_index[section] * len(DAYS) + day) * PERIOD_COUNT + period
+        size = len(rooms) * SLOTS_PER_WEEK
+        shape = (len(rooms), len(DAYS), PERIOD_COUNT)
+        sections = np.bincount(slot, minlength=size).reshape(shape)
+        students = np.bincount(slot, weights=headcount[section], minlength=size).astype(np.int64).reshape(shape)
+        return cls(rooms, sections, students)
+
+    def buildings(self):
+        return sorted({building for building, _ in self.rooms})
+
+    # Students per (day, period) summed over each building's rooms: buildings x days x periods
+    def building_load(self):
+        buildings = self.buildings()
+        building_ids = {building: i for i, building in enumerate(buildings)}
+        index = np.array([building_ids[building] for building, _ in self.rooms], dtype=np.int64)
+        load = np.zeros((len(buildings), len(DAYS), PERIOD_COUNT), dtype=np.int64)
+        np.add.at(load, index, self.students)
+        return buildings, load
+
+    # One row per room: slots in use, utilization of the 75 weekly slots, double booked
+    # slots and the busiest slot by headcount. Busiest rooms first.
+    def room_summary(self):
+        used = (self.sections > 0).sum(axis=(1, 2))
+        double_booked = (self.sections > 1).sum(axis=(1, 2))
+        flat = self.students.reshape(len(self.rooms), -1)
+        peak_slot = flat.argmax(axis=1)
+        peak = flat.max(axis=1) if len(self.rooms) else flat.sum(axis=1)
+        rows = []
+        for i in np.argsort(-used, kind='stable'):
+            day, period = divmod(int(peak_slot[i]), PERIOD_COUNT)
+            building, room = self.rooms[i]
+            rows.append({
+                'building': building,
+                'room': room,
+                'slots_used': int(used[i]),
+                'utilization': round(float(used[i]) / SLOTS_PER_WEEK, 4),
+                'double_booked_slots': int(double_booked[i]),
+                'peak_students': int(peak[i]),
+                'peak_day': DAYS[day],
+                'peak_period': period + 1,
+            })
+        return rows
+
+    # Long format, one row per occupied (room, day, period)
+    def slot_rows(self):
+        room, day, period = np.nonzero(self.sections)
+        for r, d, p in zip(room.tolist(), day.tolist(), period.tolist()):
+            building, name = self.rooms[r]
+            yield {
+                'building': building, 'room': name, 'day': DAYS[d], 'period': p + 1, 'time': PERIOD_LABELS[p],
+                'sections': int(self.sections[r, d, p]), 'students': int(self.students[r, d, p]),
+            }
+
+
+SLOT_FIELDS = ['building', 'room', 'day', 'period', 'time', 'sections', 'students']
+SUMMARY_FIELDS = ['building', 'room', 'slots_used', 'utilization', 'double_booked_slots', 'peak_students',
+                  'peak_day', 'peak_period']
+
+
+def write_csv(path, fields, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _heat_color(value, peak):
+    share = value / peak if peak else 0.0
+    # white through amber to red as the slot fills up
+    red = 255
+    green = int(255 - 175 * share)
+    blue = int(255 - 235 * min(1.0, share * 1.5))
+    return f"#{red:02x}{green:02x}{blue:02x}"
+
+
+def _heat_table(title, grid):
+    peak = int(grid.max()) if grid.size else 0
+    out = [f"<h2>{html.escape(title)}</h2>", "<table><tr><th></th>"]
+    out += [f"<th>{html.escape(day)}</th>" for day in DAYS]
+    out.append("</tr>")
+    for period in range(PERIOD_COUNT):
+        out.append(f"<tr><th>{PERIOD_LABELS[period]}</th>")
+        for day in range(len(DAYS)):
+            value = int(grid[day, period])
+            out.append(f'<td style="background:{_heat_color(value, peak)}">{value or ""}</td>')
+        out.append("</tr>")
+    out.append("</table>")
+    return "".join(out)
+
+
+# Self contained HTML page: one students-per-slot heatmap per building, then one per room
+# of the given building (or of the busiest rooms when no building is picked)
+def write_heatmap(path, usage, building=None, max_rooms=20):
+    buildings, load = usage.building_load()
+    parts = ["<!DOCTYPE html><html><head><meta charset='utf-8'><title>Room utilization</title><style>",
+             "body{font-family:sans-serif} table{border-collapse:collapse;margin-bottom:24px}",
+             "td,th{border:1px solid #ccc;padding:3px 8px;text-align:center;font-size:12px}",
+             "</style></head><body><h1>Students per slot</h1>"]
+    for i, name in enumerate(buildings):
+        if building is None or name == building:
+            parts.append(_heat_table(name or "(no building)", load[i]))
+    rooms = [i for i, (name, _) in enumerate(usage.rooms) if building is None or name == building]
+    rooms.sort(key=lambda i: -int(usage.students[i].sum()))
+    for i in rooms[:max_rooms]:
+        parts.append(_heat_table(" ".join(part for part in usage.rooms[i] if part), usage.students[i]))
+    parts.append("</body></html>")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(parts))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='schedule.py rooms',
+                                     description='Room and building utilization across many schedules.')
+    parser.add_argument('paths', nargs='+', help='schedule PDFs or directories of them')
+    parser.add_argument('--csv', help='write per slot counts (building, room, day, period) to this CSV')
+    parser.add_argument('--summary', help='write the per room summary to this CSV')
+    parser.add_argument('--heatmap', help='write an HTML heatmap to this file')
+    parser.add_argument('--building', help='limit the heatmap to one building')
+    parser.add_argument('--top', type=int, default=15, help='rooms to list on the console')
+    parser.add_argument('--workers', type=int, default=default_workers(), help='parallel worker processes')
+    parser.add_argument('--recursive', action='store_true', help='also scan subdirectories')
+    return parser
+
+
+def utilization_main(argv):
+    args = build_parser().parse_args(argv)
+    pdf_paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            pdf_paths.extend(iter_pdf_files(path, args.recursive))
+        elif os.path.isfile(path):
+            pdf_paths.append(path)
+        else:
+            print(f"Not found: {path}", file=sys.stderr)
+            return 2
+
+    _, schedules, failures = load_schedules(pdf_paths, args.workers)
+    for path, error in failures:
+        print(f"FAIL {path}: {error}", file=sys.stderr)
+    if not schedules:
+        print("No schedules loaded", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    usage = RoomUsage.from_schedules(schedules)
+    summary = usage.room_summary()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"Aggregated {len(schedules)} schedules over {len(usage.rooms)} rooms in {elapsed_ms:.1f} ms",
+          file=sys.stderr)
+    logger.info(f"Room utilization over {len(schedules)} schedules, {len(usage.rooms)} rooms")
+
+    if args.csv:
+        write_csv(args.csv, SLOT_FIELDS, usage.slot_rows())
+    if args.summary:
+        write_csv(args.summary, SUMMARY_FIELDS, summary)
+    if args.heatmap:
+        write_heatmap(args.heatmap, usage, args.building)
+
+    for row in summary[:args.top]:
+        print(f"{row['building']} {row['room']}: {row['slots_used']}/{SLOTS_PER_WEEK} slots "
+              f"({row['utilization']:.0%}), peak headcount {row['peak_students']} on {row['peak_day']} "
+              f"period {row['peak_period']}, {row['double_booked_slots']} double booked")
+    return 1 if failures else 0